@@ -0,0 +1,353 @@
+# Comum/armazenamento_colunar.py
+
+"""
+Armazenamento Colunar dos Logs (Nível 4 - formato 'colunar')
+Alternativa ao JSON Lines: cada resposta (ou falha) registrada pela Base vira uma linha
+de uma tabela guardada por COLUNAS, em arquivos binários NumPy particionados no tempo:
+
+    Nivel4/Tempo_Real/colunar/
+        20261018T000000/                 <- uma partição por janela de 'particao_s' segundos
+            esquema.json                 <- tipo (dtype) de cada coluna e limites da partição
+            instante.bin                 <- float64, segundos desde a época
+            id_sensor.bin                <- uint8
+            status.bin                   <- uint8 (1 = OK, 0 = Erro)
+            rssi_uplink_dbm.bin          <- float32 (NaN quando não houve resposta)
+            rssi_downlink_dbm.bin        <- float32
+            contador_pacote.bin          <- int32 (-1 quando não houve resposta)
+            dados.temperatura.bin        <- float64, uma coluna por campo do 'mapeamento_pacote'
+            ...                             (NaN para sensores sem o campo)
+
+Todas as colunas de uma partição têm o mesmo número de linhas; um campo novo é criado
+já preenchido com NaN para as linhas anteriores. Para ler um campo de um sensor,
+ler_colunas() abre só as partições da janela e só as colunas pedidas (np.fromfile) e
+filtra com operações vetorizadas, sem decodificar JSON.
+
+Conversão do histórico em JSON Lines (inclui os segmentos rotacionados):
+    python armazenamento_colunar.py converter Nivel4/Tempo_Real
+"""
+
+# --- Importação de Bibliotecas ---
+import os
+import sys
+import json
+import time
+import argparse
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+PASTA_COLUNAR = 'colunar'
+NOME_ESQUEMA = 'esquema.json'
+PREFIXO_DADOS = 'dados.'
+COLUNAS_BASE = {
+    'instante': '<f8',
+    'id_sensor': 'u1',
+    'status': 'u1',
+    'rssi_uplink_dbm': '<f4',
+    'rssi_downlink_dbm': '<f4',
+    'contador_pacote': '<i4',
+}
+TIPO_CAMPO = '<f8'
+PARAMETROS_PADRAO = {
+    'particao_s': 86400,
+}
+
+
+def _exigir_numpy():
+    if np is None:
+        raise RuntimeError("O formato 'colunar' do Nível 4 requer o NumPy (pip install numpy).")
+
+def _caminho_coluna(pasta_particao, coluna):
+    return os.path.join(pasta_particao, coluna + '.bin')
+
+def _ler_esquema(pasta_particao):
+    try:
+        with open(os.path.join(pasta_particao, NOME_ESQUEMA), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _salvar_esquema(pasta_particao, esquema):
+    caminho = os.path.join(pasta_particao, NOME_ESQUEMA)
+    with open(caminho + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(esquema, f)
+    os.replace(caminho + '.tmp', caminho)
+
+def _linhas_gravadas(pasta_particao, esquema):
+    """Número de linhas completas: a menor coluna (uma gravação interrompida pode deixar sobras)."""
+    linhas = None
+    for coluna, tipo in esquema['colunas'].items():
+        try:
+            tamanho = os.path.getsize(_caminho_coluna(pasta_particao, coluna))
+        except FileNotFoundError:
+            tamanho = 0
+        n = tamanho // np.dtype(tipo).itemsize
+        linhas = n if linhas is None else min(linhas, n)
+    return linhas or 0
+
+
+# ==============================================================================
+# ESCRITA (usada pelo gravador de logs do Nível 3)
+# ==============================================================================
+class TabelaColunar:
+    """
+    Destino de gravação do formato colunar. Recebe lotes de (instante, registro, linha),
+    em que 'registro' junta rede e aplicação: id_sensor, status, rssi_uplink_dbm,
+    rssi_downlink_dbm, contador_pacote e dados (a 'linha' JSON não é usada).
+    """
+
+    def __init__(self, pasta, parametros=None):
+        _exigir_numpy()
+        p = dict(PARAMETROS_PADRAO)
+        p.update(parametros or {})
+        self.pasta = pasta
+        self.particao_s = float(p['particao_s'])
+        self._janela = None
+        self._pasta_particao = None
+        self._esquema = None
+        self._linhas = 0
+        self._arquivos = {}
+        # Quantos itens do último lote já foram gravados (trechos completos de uma partição).
+        self.gravados_no_lote = 0
+
+    def _abrir_particao(self, janela):
+        self.fechar()
+        inicio = janela * self.particao_s
+        self._janela = janela
+        self._pasta_particao = os.path.join(self.pasta, time.strftime('%Y%m%dT%H%M%S', time.localtime(inicio)))
+        os.makedirs(self._pasta_particao, exist_ok=True)
+        self._esquema = _ler_esquema(self._pasta_particao) or {
+            'versao': 1, 'inicio': inicio, 'fim': inicio + self.particao_s, 'colunas': dict(COLUNAS_BASE)}
+        self._linhas = _linhas_gravadas(self._pasta_particao, self._esquema)
+        for coluna, tipo in self._esquema['colunas'].items():
+            self._arquivos[coluna] = self._abrir_coluna(coluna, tipo)
+        _salvar_esquema(self._pasta_particao, self._esquema)
+
+    def _abrir_coluna(self, coluna, tipo):
+        caminho = _caminho_coluna(self._pasta_particao, coluna)
+        arquivo = open(caminho, 'ab')
+        # Alinha a coluna às demais: descarta sobras de uma gravação interrompida e
+        # preenche com o valor "ausente" as linhas que ela ainda não tem (coluna nova).
+        itemsize = np.dtype(tipo).itemsize
+        existentes = os.path.getsize(caminho) // itemsize
+        if existentes > self._linhas:
+            arquivo.truncate(self._linhas * itemsize)
+        elif existentes < self._linhas:
+            np.full(self._linhas - existentes, _valor_ausente(tipo), dtype=tipo).tofile(arquivo)
+        return arquivo
+
+    def gravar_lote(self, itens):
+        self.gravados_no_lote = 0
+        if not itens:
+            return
+        instantes = np.fromiter((i for i, _, _ in itens), dtype=np.float64, count=len(itens))
+        janelas = np.floor(instantes / self.particao_s).astype(np.int64)
+        # Os itens chegam em ordem; cada trecho contínuo da mesma janela é gravado de uma vez.
+        cortes = np.flatnonzero(np.diff(janelas)) + 1
+        for inicio, fim in zip(np.concatenate(([0], cortes)), np.concatenate((cortes, [len(itens)]))):
+            janela = int(janelas[inicio])
+            if janela != self._janela:
+                self._abrir_particao(janela)
+            self._gravar_trecho(instantes[inicio:fim], [r for _, r, _ in itens[inicio:fim]])
+            self.gravados_no_lote = int(fim)
+
+    def _gravar_trecho(self, instantes, registros):
+        n = len(registros)
+        ok = np.fromiter((r.get('status') == 'OK' for r in registros), dtype=bool, count=n)
+        colunas = {
+            'instante': instantes,
+            'id_sensor': [r.get('id_sensor') or 0 for r in registros],
+            'status': ok,
+            'rssi_uplink_dbm': [_ou(r.get('rssi_uplink_dbm'), np.nan) if o else np.nan for r, o in zip(registros, ok)],
+            'rssi_downlink_dbm': [_ou(r.get('rssi_downlink_dbm'), np.nan) if o else np.nan for r, o in zip(registros, ok)],
+            'contador_pacote': [_ou(r.get('contador_pacote'), -1) if o else -1 for r, o in zip(registros, ok)],
+        }
+        campos = {}
+        for i, r in enumerate(registros):
+            for campo, valor in (r.get('dados') or {}).items():
+                if isinstance(valor, (int, float)):
+                    campos.setdefault(PREFIXO_DADOS + campo, {})[i] = valor
+
+        novas = [c for c in campos if c not in self._esquema['colunas']]
+        for coluna in novas:
+            self._esquema['colunas'][coluna] = TIPO_CAMPO
+            self._arquivos[coluna] = self._abrir_coluna(coluna, TIPO_CAMPO)
+        if novas:
+            _salvar_esquema(self._pasta_particao, self._esquema)
+
+        for coluna, tipo in self._esquema['colunas'].items():
+            if coluna in colunas:
+                valores = np.asarray(colunas[coluna], dtype=tipo)
+            else:
+                valores = np.full(n, _valor_ausente(tipo), dtype=tipo)
+                for i, valor in campos.get(coluna, {}).items():
+                    valores[i] = valor
+            valores.tofile(self._arquivos[coluna])
+        self._linhas += n
+
+    def descarregar(self, fsync=False):
+        for arquivo in self._arquivos.values():
+            arquivo.flush()
+            if fsync:
+                os.fsync(arquivo.fileno())
+
+    def fechar(self):
+        for arquivo in self._arquivos.values():
+            arquivo.close()
+        self._arquivos = {}
+        self._janela = None
+
+def _ou(valor, ausente):
+    return ausente if valor is None else valor
+
+def _valor_ausente(tipo):
+    tipo = np.dtype(tipo)
+    if tipo.kind == 'f':
+        return np.nan
+    return -1 if tipo.kind == 'i' else 0
+
+def _tipo_coluna(nome):
+    return COLUNAS_BASE.get(nome, TIPO_CAMPO)
+
+
+# ==============================================================================
+# LEITURA (Níveis 5 e 6)
+# ==============================================================================
+def particoes(pasta, inicio=None, fim=None):
+    """Lista [(pasta_particao, esquema)] das partições que se sobrepõem a [inicio, fim], em ordem."""
+    if not os.path.isdir(pasta):
+        return []
+    encontradas = []
+    for nome in sorted(os.listdir(pasta)):
+        esquema = _ler_esquema(os.path.join(pasta, nome))
+        if esquema is None:
+            continue
+        if (fim is not None and esquema['inicio'] > fim) or (inicio is not None and esquema['fim'] <= inicio):
+            continue
+        encontradas.append((esquema['inicio'], os.path.join(pasta, nome), esquema))
+    encontradas.sort(key=lambda p: p[0])
+    return [(caminho, esquema) for _, caminho, esquema in encontradas]
+
+def campos_disponiveis(pasta, inicio=None, fim=None):
+    """Nomes dos campos de aplicação (sem o prefixo) presentes nas partições da janela."""
+    campos = {}
+    for _, esquema in particoes(pasta, inicio, fim):
+        for coluna in esquema['colunas']:
+            if coluna.startswith(PREFIXO_DADOS):
+                campos[coluna[len(PREFIXO_DADOS):]] = True
+    return list(campos)
+
+def ler_colunas(pasta, colunas, inicio=None, fim=None, ids=None, somente_ok=False):
+    """
+    Lê só as colunas pedidas das partições da janela e retorna {coluna: vetor NumPy}, com as
+    linhas filtradas por [inicio, fim] (segundos desde a época), IDs de sensores e status.
+    'instante' e 'id_sensor' sempre fazem parte do resultado. Campos de aplicação usam o
+    nome com prefixo ('dados.temperatura'); um campo ausente numa partição vira NaN.
+    """
+    _exigir_numpy()
+    nomes = list(dict.fromkeys(['instante', 'id_sensor'] + list(colunas) + (['status'] if somente_ok else [])))
+    partes = {nome: [] for nome in nomes}
+    ids = None if ids is None else np.asarray([int(i) for i in ids])
+    for pasta_particao, esquema in particoes(pasta, inicio, fim):
+        n = _linhas_gravadas(pasta_particao, esquema)
+        if n == 0:
+            continue
+
+        def carregar(nome):
+            tipo = esquema['colunas'].get(nome)
+            if tipo is None:
+                return np.full(n, _valor_ausente(_tipo_coluna(nome)), dtype=_tipo_coluna(nome))
+            return np.fromfile(_caminho_coluna(pasta_particao, nome), dtype=tipo, count=n)
+
+        mascara = np.ones(n, dtype=bool)
+        instantes = carregar('instante')
+        if inicio is not None:
+            mascara &= instantes >= inicio
+        if fim is not None:
+            mascara &= instantes <= fim
+        if ids is not None:
+            mascara &= np.isin(carregar('id_sensor'), ids)
+        if somente_ok:
+            mascara &= carregar('status') == 1
+        if not mascara.any():
+            continue
+        for nome in nomes:
+            partes[nome].append((instantes if nome == 'instante' else carregar(nome))[mascara])
+
+    resultado = {}
+    for nome in nomes:
+        if partes[nome]:
+            resultado[nome] = np.concatenate(partes[nome])
+        else:
+            resultado[nome] = np.empty(0, dtype=_tipo_coluna(nome))
+    return resultado
+
+
+# ==============================================================================
+# CONVERSÃO DO HISTÓRICO EM JSON LINES
+# ==============================================================================
+def registros_combinados(pasta_logs, nome_rede, nome_aplicacao):
+    """
+    Junta os logs de rede e de aplicação em registros únicos (instante, registro), na
+    ordem do log de rede. Cada registro de aplicação é associado ao registro de rede
+    'OK' do mesmo sensor e do mesmo timestamp (são gravados juntos pela Base).
+    """
+    import segmentos_log
+    aplicacao = {}
+    for registro in segmentos_log.ler_registros(pasta_logs, nome_aplicacao):
+        aplicacao.setdefault((registro.get('timestamp'), registro.get('id_sensor')), []).append(registro)
+    for registro in segmentos_log.ler_registros(pasta_logs, nome_rede):
+        instante = segmentos_log.instante_do_timestamp(registro.get('timestamp'))
+        if instante is None:
+            continue
+        combinado = dict(registro, dados={})
+        if registro.get('status') == 'OK':
+            par = aplicacao.get((registro.get('timestamp'), registro.get('id_sensor')))
+            if par:
+                app = par.pop(0)
+                combinado['dados'] = app.get('dados') or {}
+                combinado['contador_pacote'] = app.get('contador_pacote', -1)
+                combinado['tipo_sensor'] = app.get('tipo_sensor')
+        yield instante, combinado
+
+def converter(pasta_logs, nome_rede, nome_aplicacao, parametros=None, lote=65536):
+    """Converte os logs JSON Lines de 'pasta_logs' para '<pasta_logs>/colunar'. Retorna o número de linhas."""
+    tabela = TabelaColunar(os.path.join(pasta_logs, PASTA_COLUNAR), parametros)
+    total = 0
+    itens = []
+    try:
+        for instante, registro in registros_combinados(pasta_logs, nome_rede, nome_aplicacao):
+            itens.append((instante, registro, None))
+            if len(itens) >= lote:
+                tabela.gravar_lote(itens)
+                total += len(itens)
+                itens = []
+        tabela.gravar_lote(itens)
+        total += len(itens)
+        tabela.descarregar(fsync=True)
+    finally:
+        tabela.fechar()
+    return total
+
+
+if __name__ == '__main__':
+    sys.path.append(os.path.dirname(__file__))
+    parser = argparse.ArgumentParser(description="Armazenamento colunar dos logs do Nível 4.")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+    conversao = subcomandos.add_parser('converter', help="Converte os logs JSON Lines (e seus segmentos) para o formato colunar.")
+    conversao.add_argument('pasta_logs', help="Diretório dos logs (ex.: Nivel4/Tempo_Real).")
+    conversao.add_argument('--rede', default='dados_brutos_rede.jsonl')
+    conversao.add_argument('--aplicacao', default='dados_brutos_aplicacao.jsonl')
+    conversao.add_argument('--particao-s', type=float, default=PARAMETROS_PADRAO['particao_s'])
+    args = parser.parse_args()
+
+    pasta_destino = os.path.join(args.pasta_logs, PASTA_COLUNAR)
+    if particoes(pasta_destino):
+        print(f"ERRO: '{pasta_destino}' já tem dados; converter de novo duplicaria os registros. Remova a pasta antes.")
+        sys.exit(1)
+    inicio_conversao = time.perf_counter()
+    linhas = converter(args.pasta_logs, args.rede, args.aplicacao, {'particao_s': args.particao_s})
+    print(f"[Nível 4 - Colunar] {linhas} registro(s) convertido(s) para "
+          f"'{pasta_destino}' em {time.perf_counter() - inicio_conversao:.2f} s.")
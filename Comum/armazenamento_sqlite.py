@@ -0,0 +1,270 @@
+# Comum/armazenamento_sqlite.py
+
+"""
+Armazenamento dos Logs em SQLite (Nível 4 - formato 'sqlite')
+Banco embutido (um único arquivo, sem servidor) com as mesmas informações dos dois logs
+JSON Lines, em duas tabelas indexadas por (id_sensor, instante):
+
+    rede(instante, id_sensor, status, rssi_uplink_dbm, rssi_downlink_dbm)
+    aplicacao(instante, id_sensor, tipo_sensor, contador_pacote, dados)   -- 'dados' em JSON
+
+- 'instante' é guardado em segundos desde a época; o 'timestamp' no formato dos logs é
+  montado na leitura.
+- Escrita: a Base (via gravador de logs) insere os registros em lote, uma transação por
+  descarga. O banco usa o modo WAL: leitores (Níveis 5 e 6) não bloqueiam a escrita.
+- Leitura: consultar() e serie() usam o índice, então a janela de tempo de um sensor é
+  lida em milissegundos mesmo com milhões de linhas.
+
+Importação do histórico em JSON Lines (inclui os segmentos rotacionados):
+    python armazenamento_sqlite.py importar Nivel4/Tempo_Real
+"""
+
+# --- Importação de Bibliotecas ---
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+from datetime import datetime
+
+NOME_BANCO = 'logs.sqlite3'
+FORMATO_TIMESTAMP = '%d-%m-%Y %H:%M:%S'
+PARAMETROS_PADRAO = {
+    'arquivo': NOME_BANCO,
+}
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS rede (
+    instante REAL NOT NULL,
+    id_sensor INTEGER,
+    status TEXT NOT NULL,
+    rssi_uplink_dbm REAL,
+    rssi_downlink_dbm REAL
+);
+CREATE TABLE IF NOT EXISTS aplicacao (
+    instante REAL NOT NULL,
+    id_sensor INTEGER,
+    tipo_sensor TEXT,
+    contador_pacote INTEGER,
+    dados TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_rede_sensor_instante ON rede (id_sensor, instante);
+CREATE INDEX IF NOT EXISTS idx_aplicacao_sensor_instante ON aplicacao (id_sensor, instante);
+"""
+COLUNAS = {
+    'rede': ('instante', 'id_sensor', 'status', 'rssi_uplink_dbm', 'rssi_downlink_dbm'),
+    'aplicacao': ('instante', 'id_sensor', 'tipo_sensor', 'contador_pacote', 'dados'),
+}
+
+
+def caminho_banco(pasta_logs, parametros=None):
+    p = dict(PARAMETROS_PADRAO)
+    p.update(parametros or {})
+    return os.path.join(pasta_logs, p['arquivo'])
+
+
+# ==============================================================================
+# ESCRITA (usada pelo gravador de logs do Nível 3)
+# ==============================================================================
+class BancoLogs:
+    """
+    Destino de gravação do formato 'sqlite'. Recebe lotes de (instante, registro, linha),
+    em que 'registro' junta rede e aplicação (id_sensor, status, rssi_uplink_dbm,
+    rssi_downlink_dbm, tipo_sensor, contador_pacote, dados).
+    A conexão é criada na thread que grava (a do gravador de logs).
+    """
+
+    def __init__(self, caminho, parametros=None):
+        self.caminho = caminho
+        self._conexao = None
+        self._sincronismo = None
+        # O lote só está gravado depois do commit; até lá, uma falha desfaz o lote inteiro.
+        self.gravados_no_lote = 0
+
+    def _conectar(self):
+        if self._conexao is None:
+            os.makedirs(os.path.dirname(self.caminho) or '.', exist_ok=True)
+            self._conexao = sqlite3.connect(self.caminho)
+            self._conexao.execute('PRAGMA journal_mode=WAL')
+            self._conexao.executescript(ESQUEMA)
+        return self._conexao
+
+    def gravar_lote(self, itens):
+        self.gravados_no_lote = 0
+        conexao = self._conectar()
+        rede = []
+        aplicacao = []
+        for instante, registro, _linha in itens:
+            ok = registro.get('status') == 'OK'
+            rede.append((instante, registro.get('id_sensor'), registro.get('status'),
+                         registro.get('rssi_uplink_dbm') if ok else None,
+                         registro.get('rssi_downlink_dbm') if ok else None))
+            if ok and registro.get('dados'):
+                aplicacao.append((instante, registro.get('id_sensor'), registro.get('tipo_sensor'),
+                                  registro.get('contador_pacote'), json.dumps(registro['dados'])))
+        # A transação fica aberta até descarregar(): um commit por descarga, não por registro.
+        try:
+            conexao.executemany('INSERT INTO rede VALUES (?, ?, ?, ?, ?)', rede)
+            conexao.executemany('INSERT INTO aplicacao VALUES (?, ?, ?, ?, ?)', aplicacao)
+        except sqlite3.Error:
+            # Desfaz o lote inteiro: o gravador o mantém no buffer e tenta de novo.
+            conexao.rollback()
+            raise
+
+    def descarregar(self, fsync=False):
+        if self._conexao is None:
+            return
+        # No modo WAL, 'NORMAL' só perde as últimas transações numa queda de energia; 'FULL'
+        # faz o fsync a cada commit (equivale à política 'descarga'/'registro' do gravador).
+        sincronismo = 'FULL' if fsync else 'NORMAL'
+        try:
+            if sincronismo != self._sincronismo:
+                self._conexao.commit()
+                self._conexao.execute(f'PRAGMA synchronous={sincronismo}')
+                self._sincronismo = sincronismo
+            self._conexao.commit()
+        except sqlite3.Error:
+            # Como em gravar_lote: nada do lote fica gravado, e o gravador o repete inteiro.
+            self._conexao.rollback()
+            raise
+
+    def fechar(self):
+        if self._conexao is not None:
+            self._conexao.commit()
+            self._conexao.close()
+            self._conexao = None
+
+
+# ==============================================================================
+# LEITURA (Níveis 5 e 6, teste.py)
+# ==============================================================================
+_local = threading.local()
+
+def _conexao_leitura(caminho):
+    """Conexão somente leitura, uma por thread e por banco (o Flask atende em várias threads)."""
+    conexoes = getattr(_local, 'conexoes', None)
+    if conexoes is None:
+        conexoes = _local.conexoes = {}
+    conexao = conexoes.get(caminho)
+    if conexao is None:
+        if not os.path.exists(caminho):
+            return None
+        conexao = sqlite3.connect(f"file:{os.path.abspath(caminho)}?mode=ro", uri=True)
+        conexoes[caminho] = conexao
+    return conexao
+
+def _filtros(ids, inicio, fim, somente_ok=False):
+    condicoes, parametros = [], []
+    if ids is not None:
+        ids = [int(i) for i in ids]
+        condicoes.append(f"id_sensor IN ({', '.join('?' * len(ids))})")
+        parametros += ids
+    if inicio is not None:
+        condicoes.append('instante >= ?')
+        parametros.append(inicio)
+    if fim is not None:
+        condicoes.append('instante <= ?')
+        parametros.append(fim)
+    if somente_ok:
+        condicoes.append("status = 'OK'")
+    return (' WHERE ' + ' AND '.join(condicoes) if condicoes else ''), parametros
+
+def _formatar(instante):
+    return datetime.fromtimestamp(instante).strftime(FORMATO_TIMESTAMP)
+
+def consultar(caminho, log, ids=None, inicio=None, fim=None, ultimos=None):
+    """
+    Registros do log 'rede' ou 'aplicacao' (dicionários no mesmo formato do JSON Lines),
+    em ordem cronológica. 'ultimos' limita aos N registros mais recentes da consulta.
+    """
+    conexao = _conexao_leitura(caminho)
+    if conexao is None:
+        return []
+    where, parametros = _filtros(ids, inicio, fim)
+    # 'rowid' desempata registros do mesmo instante na ordem em que foram gravados.
+    colunas = ', '.join(COLUNAS[log])
+    sql = f"SELECT {colunas} FROM {log}{where} ORDER BY instante, rowid"
+    if ultimos is not None:
+        sql = (f"SELECT {colunas} FROM (SELECT rowid AS ordem, {colunas} FROM {log}{where} "
+               f"ORDER BY instante DESC, rowid DESC LIMIT ?) ORDER BY instante, ordem")
+        parametros.append(int(ultimos))
+    registros = []
+    for linha in conexao.execute(sql, parametros):
+        registro = {'timestamp': _formatar(linha[0])}
+        registro.update(zip(COLUNAS[log][1:], linha[1:]))
+        if log == 'aplicacao':
+            registro['dados'] = json.loads(registro['dados'])
+        registros.append(registro)
+    return registros
+
+def serie(caminho, log, id_sensor, campos, inicio=None, fim=None):
+    """
+    Série de um sensor: (timestamps, {campo: [valores]}). No log 'rede' os campos são
+    colunas (só comunicações OK); no 'aplicacao', chaves de 'dados' (via json_extract).
+    """
+    conexao = _conexao_leitura(caminho)
+    valores = {campo: [] for campo in campos}
+    if conexao is None:
+        return [], valores
+    where, parametros = _filtros([id_sensor], inicio, fim, somente_ok=(log == 'rede'))
+    if log == 'rede':
+        desconhecidos = [campo for campo in campos if campo not in COLUNAS['rede']]
+        if desconhecidos:
+            raise ValueError(f"Campo(s) de rede desconhecido(s): {desconhecidos}")
+        expressoes = list(campos)
+    else:
+        # Os caminhos JSON vão como parâmetros, antes dos filtros do WHERE.
+        expressoes = ['json_extract(dados, ?)'] * len(campos)
+        parametros = [f'$."{campo}"' for campo in campos] + parametros
+    sql = f"SELECT instante{''.join(', ' + e for e in expressoes)} FROM {log}{where} ORDER BY instante, rowid"
+    timestamps = []
+    for linha in conexao.execute(sql, parametros):
+        timestamps.append(_formatar(linha[0]))
+        for campo, valor in zip(campos, linha[1:]):
+            valores[campo].append(valor)
+    return timestamps, valores
+
+
+# ==============================================================================
+# IMPORTAÇÃO DO HISTÓRICO EM JSON LINES
+# ==============================================================================
+def importar(pasta_logs, nome_rede, nome_aplicacao, caminho=None, lote=65536):
+    """Importa os logs JSON Lines de 'pasta_logs' para o banco. Retorna o número de registros de rede."""
+    from armazenamento_colunar import registros_combinados
+    banco = BancoLogs(caminho or caminho_banco(pasta_logs))
+    total = 0
+    itens = []
+    try:
+        for instante, registro in registros_combinados(pasta_logs, nome_rede, nome_aplicacao):
+            itens.append((instante, registro, None))
+            if len(itens) >= lote:
+                banco.gravar_lote(itens)
+                total += len(itens)
+                itens = []
+        banco.gravar_lote(itens)
+        total += len(itens)
+        banco.descarregar(fsync=True)
+    finally:
+        banco.fechar()
+    return total
+
+
+if __name__ == '__main__':
+    sys.path.append(os.path.dirname(__file__))
+    parser = argparse.ArgumentParser(description="Armazenamento SQLite dos logs do Nível 4.")
+    subcomandos = parser.add_subparsers(dest='comando', required=True)
+    importacao = subcomandos.add_parser('importar', help="Importa os logs JSON Lines (e seus segmentos) para o banco.")
+    importacao.add_argument('pasta_logs', help="Diretório dos logs (ex.: Nivel4/Tempo_Real).")
+    importacao.add_argument('--rede', default='dados_brutos_rede.jsonl')
+    importacao.add_argument('--aplicacao', default='dados_brutos_aplicacao.jsonl')
+    importacao.add_argument('--banco', help=f"Arquivo do banco (padrão: <pasta_logs>/{NOME_BANCO}).")
+    args = parser.parse_args()
+
+    caminho = args.banco or caminho_banco(args.pasta_logs)
+    if os.path.exists(caminho):
+        print(f"ERRO: O banco '{caminho}' já existe; importar de novo duplicaria os registros. Remova-o antes.")
+        sys.exit(1)
+    inicio_importacao = time.perf_counter()
+    registros = importar(args.pasta_logs, args.rede, args.aplicacao, caminho)
+    print(f"[Nível 4 - SQLite] {registros} registro(s) importado(s) para '{caminho}' em {time.perf_counter() - inicio_importacao:.2f} s.")
@@ -0,0 +1,68 @@
+# Comum/cache_yaml.py
+
+"""
+Cache de Arquivos YAML com Recarga Automática
+Os arquivos de configuração (canal_config.yml, sensores_config.yml, configuracoes.yaml)
+são reescritos por outros programas enquanto a simulação roda, mas mudam raramente.
+Em vez de fazer 'yaml.safe_load' a cada ciclo, esta classe mantém o conteúdo em memória
+e só relê o arquivo quando sua "assinatura" (inode, data de modificação e tamanho) muda.
+
+A troca é atômica: o novo conteúdo só substitui o antigo depois de ser lido e validado
+por completo. Se a leitura falhar (por exemplo, um arquivo pela metade), a última versão
+válida continua sendo usada e uma nova tentativa é feita no próximo acesso.
+"""
+
+# --- Importação de Bibliotecas ---
+import os
+import yaml
+
+
+class ConfigYamlEmCache:
+    """
+    Mantém em memória o conteúdo de um arquivo YAML.
+    - 'padrao': valor retornado enquanto o arquivo não existir ou nunca tiver sido lido.
+    - 'transformar': função opcional aplicada ao YAML lido (ex.: extrair só uma seção),
+      executada apenas quando o arquivo muda.
+    """
+
+    def __init__(self, caminho, padrao=None, transformar=None, nome="config"):
+        self.caminho = caminho
+        self.padrao = padrao
+        self.transformar = transformar
+        self.nome = nome
+        self._assinatura = None
+        self._dados = padrao
+
+    def _assinatura_atual(self):
+        try:
+            st = os.stat(self.caminho)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def recarregar_se_mudou(self):
+        """Relê o arquivo se ele mudou desde a última leitura. Retorna True se recarregou."""
+        assinatura = self._assinatura_atual()
+        if assinatura == self._assinatura:
+            return False
+        if assinatura is None:
+            # O arquivo foi removido: volta ao padrão.
+            self._assinatura, self._dados = None, self.padrao
+            return True
+        try:
+            with open(self.caminho, 'r', encoding='utf-8') as f:
+                novos_dados = yaml.safe_load(f)
+            if self.transformar:
+                novos_dados = self.transformar(novos_dados)
+        except Exception as e:
+            print(f"AVISO: Não foi possível ler '{self.caminho}' ({self.nome}). Mantendo a versão anterior. Erro: {e}")
+            return False
+        # Troca atômica: uma única atribuição substitui a referência usada pelos leitores.
+        self._dados = novos_dados if novos_dados is not None else self.padrao
+        self._assinatura = assinatura
+        return True
+
+    def obter(self):
+        """Retorna o conteúdo atual, recarregando o arquivo apenas se ele mudou."""
+        self.recarregar_se_mudou()
+        return self._dados
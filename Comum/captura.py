@@ -0,0 +1,136 @@
+# Comum/captura.py
+
+"""
+Formato de Captura de Pacotes
+Arquivo binário compacto com os pacotes que atravessaram o Nível 2 (Canal), para
+reproduzir depois um padrão de carga (replay) ou analisá-lo offline.
+
+Estrutura do arquivo (inteiros little-endian):
+- Cabeçalho de 32 bytes: assinatura 'TPMCAP\\0\\0', versão (uint16), tamanho do
+  registro fixo (uint16), instante de início da captura em ns desde a época (int64).
+- Registros, um após o outro:
+      comprimento (uint16) | direção (uint8) | ID do link (uint8) | instante (int64) | pacote
+  'comprimento' é o número de bytes do pacote que vem em seguida; 'instante' é contado
+  em ns a partir do início da captura (relógio monotônico). A direção usa os mesmos
+  valores do motor estocástico: 0 = Downlink, 1 = Uplink.
+
+Como os pacotes do projeto têm sempre 52 bytes, todo registro ocupa 64 bytes e o arquivo
+pode ser mapeado em memória como um vetor estruturado NumPy ('abrir_captura()'). A leitura
+sequencial ('ler_registros()') respeita o comprimento de cada registro e não depende do NumPy.
+"""
+
+# --- Importação de Bibliotecas ---
+import os
+import struct
+import time
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ASSINATURA = b'TPMCAP\x00\x00'
+VERSAO = 1
+DIRECAO_DOWNLINK = 0
+DIRECAO_UPLINK = 1
+
+CABECALHO = struct.Struct('<8sHHq12x')
+PREFIXO_REGISTRO = struct.Struct('<HBBq')
+TAMANHO_PACOTE = 52
+TAMANHO_REGISTRO = PREFIXO_REGISTRO.size + TAMANHO_PACOTE
+
+
+def ler_cabecalho(arquivo):
+    """Lê e valida o cabeçalho. Retorna o instante de início da captura (ns desde a época)."""
+    dados = arquivo.read(CABECALHO.size)
+    if len(dados) < CABECALHO.size:
+        raise ValueError("Arquivo de captura sem cabeçalho.")
+    assinatura, versao, _tamanho_registro, inicio_ns = CABECALHO.unpack(dados)
+    if assinatura != ASSINATURA:
+        raise ValueError("O arquivo não é uma captura de pacotes (assinatura inválida).")
+    if versao != VERSAO:
+        raise ValueError(f"Versão de captura {versao} não suportada (esperada: {VERSAO}).")
+    return inicio_ns
+
+
+class GravadorCaptura:
+    """
+    Acrescenta registros a um arquivo de captura. Se o arquivo já existir, a captura
+    continua nele (os instantes seguem a partir do início gravado no cabeçalho).
+    """
+
+    def __init__(self, caminho, tamanho_buffer=64 * 1024):
+        self.caminho = caminho
+        existe = os.path.exists(caminho) and os.path.getsize(caminho) > 0
+        if existe:
+            with open(caminho, 'rb') as f:
+                inicio_ns = ler_cabecalho(f)
+            # Converte o início de relógio de parede para a base do relógio monotônico.
+            self._origem_ns = time.monotonic_ns() - (time.time_ns() - inicio_ns)
+        self._arquivo = open(caminho, 'ab', buffering=tamanho_buffer)
+        if not existe:
+            self._origem_ns = time.monotonic_ns()
+            self._arquivo.write(CABECALHO.pack(ASSINATURA, VERSAO, TAMANHO_REGISTRO, time.time_ns()))
+        self.registros = 0
+
+    def registrar(self, direcao, id_link, pacote):
+        """Acrescenta um pacote com o instante atual. Os dados ficam no buffer até 'descarregar()'."""
+        instante_ns = time.monotonic_ns() - self._origem_ns
+        self._arquivo.write(PREFIXO_REGISTRO.pack(len(pacote), direcao, id_link & 0xFF, instante_ns))
+        self._arquivo.write(pacote)
+        self.registros += 1
+
+    def descarregar(self):
+        self._arquivo.flush()
+
+    def fechar(self):
+        if not self._arquivo.closed:
+            self._arquivo.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
+
+
+def ler_registros(caminho):
+    """Gera (instante_ns, direção, id_link, pacote) para cada registro, na ordem gravada."""
+    with open(caminho, 'rb') as f:
+        ler_cabecalho(f)
+        while True:
+            prefixo = f.read(PREFIXO_REGISTRO.size)
+            if len(prefixo) < PREFIXO_REGISTRO.size:
+                return
+            comprimento, direcao, id_link, instante_ns = PREFIXO_REGISTRO.unpack(prefixo)
+            pacote = f.read(comprimento)
+            if len(pacote) < comprimento:
+                # Registro incompleto no fim do arquivo (captura interrompida no meio da escrita).
+                return
+            yield instante_ns, direcao, id_link, pacote
+
+
+def abrir_captura(caminho):
+    """
+    Mapeia a captura em memória como um vetor estruturado com os campos 'comprimento',
+    'direcao', 'id_link', 'instante_ns' e 'pacote' (matriz N x 52 de uint8), sem copiar
+    o arquivo. Um registro incompleto no fim é ignorado.
+    """
+    if np is None:
+        raise RuntimeError("O mapeamento da captura em memória requer o NumPy (pip install numpy).")
+    with open(caminho, 'rb') as f:
+        ler_cabecalho(f)
+    tipo = np.dtype([
+        ('comprimento', '<u2'),
+        ('direcao', 'u1'),
+        ('id_link', 'u1'),
+        ('instante_ns', '<i8'),
+        ('pacote', 'u1', (TAMANHO_PACOTE,)),
+    ])
+    quantidade = (os.path.getsize(caminho) - CABECALHO.size) // TAMANHO_REGISTRO
+    if quantidade == 0:
+        return np.zeros(0, dtype=tipo)
+    registros = np.memmap(caminho, dtype=tipo, mode='r', offset=CABECALHO.size, shape=(quantidade,))
+    if (registros['comprimento'] != TAMANHO_PACOTE).any():
+        raise ValueError(f"A captura contém pacotes com tamanho diferente de {TAMANHO_PACOTE} bytes. Use 'ler_registros()'.")
+    return registros
@@ -0,0 +1,245 @@
+# Comum/codec_pacote.py
+
+"""
+Codec de Pacotes Pré-compilado
+Transforma um 'mapeamento_pacote' (o "manual" de onde cada campo fica no pacote de
+52 bytes) em um codec pronto para uso, UMA vez, em vez de percorrer o mapeamento e
+fatiar bytes a cada pacote.
+
+Aceita os dois formatos de mapeamento usados no projeto:
+- Nível 1 (sensores_config.yml):  {campo: {posicao_byte, tamanho_bytes, escala}}
+- Nível 3 (configuracoes.yaml):   [{campo, posicao_byte, tamanho_bytes, escala}, ...]
+
+Na compilação, o mapeamento é validado: campos fora do pacote, sobrepostos entre si ou
+sobre os bytes de cabeçalho (RSSI, endereços e contador) geram um ValueError.
+
+Cada codec oferece:
+- codificar(dados, pacote): escreve os campos no pacote (bytearray), lado do Nível 1.
+- decodificar(pacote): retorna {campo: valor}, lado do Nível 3, com um único 'unpack'.
+- decodificar_lote(buffer): decodifica N pacotes de uma vez com NumPy (se instalado),
+  retornando um vetor por campo.
+
+Para análise offline e replay, 'decodificar_uplinks_lote()' decodifica um fluxo inteiro de
+Uplinks capturados (de vários sensores misturados) usando as definições da seção 'nivel1'
+do 'configuracoes.yaml', sem laço Python por pacote. 'abrir_pacotes_brutos()' mapeia
+em memória um arquivo de pacotes de 52 bytes concatenados.
+"""
+
+# --- Importação de Bibliotecas ---
+import math
+import struct
+from functools import lru_cache
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+TAMANHO_PACOTE = 52
+
+# Bytes reservados do cabeçalho: RSSI Downlink (0), RSSI Uplink (2), Destino (8),
+# Remetente (10) e Contador de pacotes (14 e 15).
+BYTES_CABECALHO = {0: 'rssi_downlink', 2: 'rssi_uplink', 8: 'destino', 10: 'remetente', 14: 'contador', 15: 'contador'}
+
+# Tamanhos com código nativo no 'struct' (inteiros com sinal, big-endian).
+CODIGOS_STRUCT = {1: 'b', 2: 'h', 4: 'i', 8: 'q'}
+
+
+def normalizar_mapeamento(mapeamento):
+    """Converte qualquer um dos dois formatos em uma tupla ordenada de (campo, posição, tamanho, escala)."""
+    if isinstance(mapeamento, dict):
+        itens = [dict(instrucoes, campo=campo) for campo, instrucoes in mapeamento.items()]
+    else:
+        itens = list(mapeamento or [])
+    campos = []
+    for instrucao in itens:
+        # Só a escala ausente (ou vazia no YAML) vale 1; 'escala: 0' é rejeitada em validar_campos().
+        escala = instrucao.get('escala', 1)
+        campos.append((
+            str(instrucao['campo']),
+            int(instrucao['posicao_byte']),
+            int(instrucao['tamanho_bytes']),
+            1 if escala is None else escala,
+        ))
+    return tuple(sorted(campos, key=lambda c: c[1]))
+
+
+def validar_campos(campos):
+    """Levanta ValueError se algum campo sair do pacote ou invadir outro campo/cabeçalho."""
+    ocupados = dict(BYTES_CABECALHO)
+    nomes = [c[0] for c in campos]
+    if len(set(nomes)) != len(nomes):
+        raise ValueError(f"Há campos com nomes repetidos no mapeamento: {nomes}.")
+    for campo, posicao, tamanho, escala in campos:
+        if tamanho < 1 or posicao < 0 or posicao + tamanho > TAMANHO_PACOTE:
+            raise ValueError(f"Campo '{campo}' (bytes {posicao}-{posicao + tamanho - 1}) está fora do pacote de {TAMANHO_PACOTE} bytes.")
+        if escala == 0:
+            raise ValueError(f"Campo '{campo}' tem escala 0.")
+        for byte in range(posicao, posicao + tamanho):
+            if byte in ocupados:
+                raise ValueError(f"Campo '{campo}' sobrepõe o byte {byte}, já usado por '{ocupados[byte]}'.")
+            ocupados[byte] = campo
+
+
+class CodecPacote:
+    """Codec de um tipo de sensor. Crie-o com 'obter_codec()', que mantém um cache."""
+
+    def __init__(self, campos):
+        validar_campos(campos)
+        self.campos = campos
+        self.nomes = [c[0] for c in campos]
+        self.escalas = [c[3] for c in campos]
+
+        # Um Struct por campo para a codificação (campos ausentes não são tocados)...
+        self._structs_campo = []
+        for campo, posicao, tamanho, escala in campos:
+            codigo = CODIGOS_STRUCT.get(tamanho, f'{tamanho}s')
+            limite = 1 << (8 * tamanho - 1)
+            self._structs_campo.append((campo, posicao, tamanho, escala, struct.Struct('>' + codigo), -limite, limite - 1))
+
+        # ...e um único Struct do pacote inteiro para a decodificação.
+        formato, cursor = '>', 0
+        for campo, posicao, tamanho, escala in campos:
+            if posicao > cursor:
+                formato += f'{posicao - cursor}x'
+            formato += CODIGOS_STRUCT.get(tamanho, f'{tamanho}s')
+            cursor = posicao + tamanho
+        self._struct_pacote = struct.Struct(formato)
+        self._tamanhos_especiais = [i for i, c in enumerate(campos) if c[2] not in CODIGOS_STRUCT]
+
+        self._dtype = None
+        if np is not None:
+            padroes = [(i, c) for i, c in enumerate(campos) if c[2] in CODIGOS_STRUCT]
+            self._dtype = np.dtype({
+                'names': [c[0] for _, c in padroes],
+                'formats': [f'>i{c[2]}' for _, c in padroes],
+                'offsets': [c[1] for _, c in padroes],
+                'itemsize': TAMANHO_PACOTE,
+            })
+
+    def codificar(self, dados, pacote):
+        """
+        Escreve em 'pacote' (bytearray de 52 bytes) os campos presentes em 'dados'.
+        Valores NaN ou infinitos (ex.: fonte em falha) não são codificados: o campo fica zerado.
+        """
+        for campo, posicao, tamanho, escala, estrutura, minimo, maximo in self._structs_campo:
+            if campo not in dados:
+                continue
+            if not math.isfinite(dados[campo]):
+                print(f"[Codec] AVISO: Valor {dados[campo]} do campo '{campo}' não é um número finito. Campo enviado zerado.")
+                pacote[posicao:posicao + tamanho] = bytes(tamanho)
+                continue
+            valor_int = int(dados[campo] * escala)
+            if not minimo <= valor_int <= maximo:
+                print(f"[Codec] AVISO: Valor {valor_int} do campo '{campo}' não cabe em {tamanho} byte(s). Saturando.")
+                valor_int = max(minimo, min(maximo, valor_int))
+            if tamanho in CODIGOS_STRUCT:
+                estrutura.pack_into(pacote, posicao, valor_int)
+            else:
+                pacote[posicao:posicao + tamanho] = valor_int.to_bytes(tamanho, 'big', signed=True)
+        return pacote
+
+    def decodificar(self, pacote):
+        """Retorna {campo: valor} já dividido pela escala."""
+        brutos = self._struct_pacote.unpack_from(pacote)
+        if self._tamanhos_especiais:
+            brutos = list(brutos)
+            for i in self._tamanhos_especiais:
+                brutos[i] = int.from_bytes(brutos[i], 'big', signed=True)
+        return {nome: float(valor) / escala for nome, valor, escala in zip(self.nomes, brutos, self.escalas)}
+
+    def decodificar_lote(self, buffer):
+        """
+        Decodifica N pacotes contíguos de uma só vez.
+        'buffer' pode ser bytes/bytearray/memoryview com N*52 bytes ou um array NumPy
+        (N, 52) de uint8. Retorna {campo: vetor float64 de tamanho N}.
+        """
+        if np is None:
+            raise RuntimeError("A decodificação em lote requer o NumPy (pip install numpy).")
+        if isinstance(buffer, np.ndarray):
+            matriz = np.ascontiguousarray(buffer, dtype=np.uint8)
+        else:
+            matriz = np.frombuffer(buffer, dtype=np.uint8)
+        matriz = matriz.reshape(-1, TAMANHO_PACOTE)
+        registros = matriz.view(self._dtype).reshape(-1)
+        colunas = {}
+        for campo, posicao, tamanho, escala in self.campos:
+            if tamanho in CODIGOS_STRUCT:
+                valores = registros[campo].astype(np.int64)
+            else:
+                valores = inteiros_big_endian(matriz, posicao, tamanho)
+            colunas[campo] = valores / escala
+        return colunas
+
+
+def inteiros_big_endian(matriz, posicao, tamanho, com_sinal=True):
+    """Combina 'tamanho' colunas de bytes de uma matriz (N, 52) em inteiros big-endian."""
+    valores = np.zeros(matriz.shape[0], dtype=np.int64)
+    for i in range(tamanho):
+        valores = (valores << 8) | matriz[:, posicao + i].astype(np.int64)
+    if com_sinal:
+        limite = 1 << (8 * tamanho - 1)
+        valores = np.where(valores >= limite, valores - (limite << 1), valores)
+    return valores
+
+
+@lru_cache(maxsize=256)
+def _codec_compilado(campos):
+    return CodecPacote(campos)
+
+def obter_codec(mapeamento):
+    """Retorna o codec (em cache) do mapeamento informado. Levanta ValueError se for inválido."""
+    return _codec_compilado(normalizar_mapeamento(mapeamento))
+
+
+# --- Decodificação em Massa (análise offline / replay) ---
+def matriz_pacotes(buffer):
+    """Enxerga um buffer contíguo (bytes, memoryview, memmap ou array) como uma matriz (N, 52) de uint8, sem cópia."""
+    if np is None:
+        raise RuntimeError("A decodificação em massa requer o NumPy (pip install numpy).")
+    if isinstance(buffer, np.ndarray):
+        matriz = buffer if buffer.dtype == np.uint8 else buffer.view(np.uint8)
+    else:
+        matriz = np.frombuffer(buffer, dtype=np.uint8)
+    if matriz.size % TAMANHO_PACOTE:
+        raise ValueError(f"O buffer tem {matriz.size} bytes, que não é múltiplo de {TAMANHO_PACOTE}.")
+    return matriz.reshape(-1, TAMANHO_PACOTE)
+
+def abrir_pacotes_brutos(caminho):
+    """Mapeia em memória um arquivo de pacotes de 52 bytes concatenados, como matriz (N, 52)."""
+    if np is None:
+        raise RuntimeError("A decodificação em massa requer o NumPy (pip install numpy).")
+    return matriz_pacotes(np.memmap(caminho, dtype=np.uint8, mode='r'))
+
+def decodificar_uplinks_lote(pacotes, config_nivel1):
+    """
+    Decodifica N Uplinks de uma só vez e retorna um dicionário de colunas (vetores de tamanho N):
+    - 'rssi_downlink_dbm' e 'rssi_uplink_dbm' (bytes 0 e 2, com sinal),
+    - 'id_sensor' (byte 10) e 'contador_pacote' (bytes 14-15),
+    - uma coluna por campo de 'mapeamento_pacote' de cada sensor em 'config_nivel1'.
+    As linhas de sensores que não têm o campo ficam com NaN. O único laço é sobre os
+    tipos de mapeamento distintos, nunca sobre os pacotes.
+    """
+    matriz = matriz_pacotes(pacotes)
+    colunas = {
+        'rssi_downlink_dbm': matriz[:, 0].view(np.int8).astype(np.float64),
+        'rssi_uplink_dbm': matriz[:, 2].view(np.int8).astype(np.float64),
+        'id_sensor': matriz[:, 10].astype(np.int64),
+        'contador_pacote': inteiros_big_endian(matriz, 14, 2, com_sinal=False),
+    }
+
+    # Agrupa os sensores que compartilham o mesmo mapeamento (mesmo codec em cache).
+    ids_por_codec = {}
+    for id_sensor, config_sensor in (config_nivel1 or {}).items():
+        codec = obter_codec((config_sensor or {}).get('mapeamento_pacote', []))
+        ids_por_codec.setdefault(codec, []).append(int(id_sensor))
+
+    for codec, ids in ids_por_codec.items():
+        linhas = np.flatnonzero(np.isin(colunas['id_sensor'], ids))
+        if not len(linhas) or not codec.campos:
+            continue
+        for campo, valores in codec.decodificar_lote(matriz[linhas]).items():
+            if campo not in colunas:
+                colunas[campo] = np.full(len(matriz), np.nan)
+            colunas[campo][linhas] = valores
+    return colunas
@@ -0,0 +1,161 @@
+# Comum/leitura_logs.py
+
+"""
+Leitura dos Logs do Nível 4 (independente do formato)
+Painéis (Nível 6), análises (Nível 5) e o 'teste.py' pedem "a série de um sensor" ou
+"os últimos registros" sem saber como a Base gravou os logs ('nivel4.formato'):
+- 'jsonl': percorre os segmentos JSON Lines da janela (segmentos_log.py);
+- 'colunar': lê só as colunas pedidas, com filtros vetorizados (armazenamento_colunar.py);
+- 'sqlite': consulta indexada por (id_sensor, instante) (armazenamento_sqlite.py).
+
+Os registros retornados têm sempre o formato dos logs JSON Lines ('timestamp', 'id_sensor',
+'status', 'rssi_*' na rede; 'tipo_sensor', 'contador_pacote', 'dados' na aplicação).
+"""
+
+# --- Importação de Bibliotecas ---
+import os
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.dirname(__file__))
+import segmentos_log
+import armazenamento_colunar
+import armazenamento_sqlite
+from cache_yaml import ConfigYamlEmCache
+
+PASTA_RAIZ = os.path.join(os.path.dirname(__file__), '..')
+CAMINHO_CONFIG_CENTRAL = os.path.join(PASTA_RAIZ, 'Nivel4', 'Parametros', 'configuracoes.yaml')
+LOGS = ('rede', 'aplicacao')
+
+cache_config_nivel4 = ConfigYamlEmCache(CAMINHO_CONFIG_CENTRAL, padrao={},
+                                        transformar=lambda config: (config or {}).get('nivel4') or {}, nome="nivel4")
+
+
+def config_nivel4():
+    """Seção 'nivel4' do 'configuracoes.yaml' (relida apenas quando o arquivo muda)."""
+    return cache_config_nivel4.obter()
+
+def pasta_logs(config_nivel4):
+    return os.path.join(PASTA_RAIZ, config_nivel4.get('diretorio_logs', 'Nivel4/Tempo_Real'))
+
+def nome_arquivo(config_nivel4, log):
+    if log == 'rede':
+        return config_nivel4.get('nome_arquivo_rede', 'dados_brutos_rede.jsonl')
+    return config_nivel4.get('nome_arquivo_aplicacao', 'dados_brutos_aplicacao.jsonl')
+
+def _pasta_colunar(config_nivel4):
+    return os.path.join(pasta_logs(config_nivel4), armazenamento_colunar.PASTA_COLUNAR)
+
+def _caminho_banco(config_nivel4):
+    return armazenamento_sqlite.caminho_banco(pasta_logs(config_nivel4), config_nivel4.get('sqlite'))
+
+def formatar_instante(instante):
+    return datetime.fromtimestamp(instante).strftime(segmentos_log.FORMATO_TIMESTAMP)
+
+
+# ==============================================================================
+# SÉRIE DE UM SENSOR (painéis)
+# ==============================================================================
+def serie_sensor(config_nivel4, log, id_sensor, campos, inicio=None, fim=None):
+    """
+    Série de um sensor no log 'rede' (campos de topo, ex.: 'rssi_uplink_dbm', só
+    comunicações com status OK) ou 'aplicacao' (campos de 'dados', ex.: 'temperatura').
+    Retorna (timestamps, {campo: [valores]}), do mais antigo ao mais recente, com
+    valores ausentes como None. 'inicio'/'fim' em segundos desde a época.
+    """
+    formato = config_nivel4.get('formato', 'jsonl')
+    if formato == 'colunar':
+        return _serie_colunar(config_nivel4, log, id_sensor, campos, inicio, fim)
+    if formato == 'sqlite':
+        return armazenamento_sqlite.serie(_caminho_banco(config_nivel4), log, id_sensor, campos, inicio, fim)
+
+    return serie_de_registros(segmentos_log.ler_registros(pasta_logs(config_nivel4), nome_arquivo(config_nivel4, log),
+                                                         inicio, fim, ids=[id_sensor]), log, campos)
+
+def serie_de_registros(registros, log, campos):
+    """Monta (timestamps, {campo: [valores]}) a partir de registros no formato JSON Lines de um só sensor."""
+    timestamps = []
+    valores = {campo: [] for campo in campos}
+    for registro in registros:
+        if log == 'rede':
+            if registro.get('status') != 'OK':
+                continue
+            origem = registro
+        else:
+            origem = registro.get('dados', {})
+        timestamps.append(registro.get('timestamp', ''))
+        for campo in campos:
+            valores[campo].append(origem.get(campo, None))
+    return timestamps, valores
+
+def _serie_colunar(config_nivel4, log, id_sensor, campos, inicio, fim):
+    nomes = {campo: (campo if log == 'rede' else armazenamento_colunar.PREFIXO_DADOS + campo) for campo in campos}
+    colunas = armazenamento_colunar.ler_colunas(_pasta_colunar(config_nivel4), list(nomes.values()),
+                                                inicio, fim, ids=[id_sensor], somente_ok=True)
+    mascara = None
+    if log == 'aplicacao' and nomes:
+        # Mesmo critério do log JSON Lines: só comunicações com algum dado decodificado.
+        presentes = [~armazenamento_colunar.np.isnan(colunas[nome]) for nome in nomes.values()]
+        mascara = armazenamento_colunar.np.logical_or.reduce(presentes)
+    instantes = colunas['instante'] if mascara is None else colunas['instante'][mascara]
+    valores = {}
+    for campo, nome in nomes.items():
+        coluna = colunas[nome] if mascara is None else colunas[nome][mascara]
+        # RSSI é gravado em float32: arredonda como o log JSON Lines para não exibir '-45.29999'.
+        casas = 2 if log == 'rede' else None
+        valores[campo] = [None if v != v else (round(v, casas) if casas else v) for v in coluna.tolist()]
+    return [formatar_instante(t) for t in instantes.tolist()], valores
+
+
+# ==============================================================================
+# REGISTROS COMPLETOS (análises)
+# ==============================================================================
+def registros(config_nivel4, log, ids=None, inicio=None, fim=None, ultimos=None):
+    """
+    Lista de registros do log 'rede' ou 'aplicacao', em ordem cronológica, filtrados por
+    IDs e janela. 'ultimos' limita aos N mais recentes sem ler o histórico inteiro.
+    """
+    formato = config_nivel4.get('formato', 'jsonl')
+    if formato == 'sqlite':
+        return armazenamento_sqlite.consultar(_caminho_banco(config_nivel4), log, ids, inicio, fim, ultimos)
+    if formato == 'colunar':
+        return _registros_colunar(config_nivel4, log, ids, inicio, fim, ultimos)
+    pasta, nome = pasta_logs(config_nivel4), nome_arquivo(config_nivel4, log)
+    if ultimos is not None:
+        return segmentos_log.ultimos_registros(pasta, nome, ultimos, inicio, fim, ids)
+    return list(segmentos_log.ler_registros(pasta, nome, inicio, fim, ids))
+
+def _registros_colunar(config_nivel4, log, ids, inicio, fim, ultimos):
+    pasta = _pasta_colunar(config_nivel4)
+    if ultimos is not None:
+        # Recua o início da janela uma partição por vez, da mais nova para a mais antiga,
+        # até juntar registros suficientes (em geral basta a partição atual).
+        selecionados = []
+        for _, esquema in reversed(armazenamento_colunar.particoes(pasta, inicio, fim)):
+            janela_inicio = esquema['inicio'] if inicio is None else max(inicio, esquema['inicio'])
+            selecionados = _registros_colunar(config_nivel4, log, ids, janela_inicio, fim, None)
+            if len(selecionados) >= ultimos:
+                break
+        return selecionados[-ultimos:] if ultimos > 0 else []
+
+    campos = armazenamento_colunar.campos_disponiveis(pasta, inicio, fim) if log == 'aplicacao' else []
+    nomes_dados = [armazenamento_colunar.PREFIXO_DADOS + campo for campo in campos]
+    base = ['status', 'rssi_uplink_dbm', 'rssi_downlink_dbm'] if log == 'rede' else ['contador_pacote']
+    colunas = armazenamento_colunar.ler_colunas(pasta, base + nomes_dados, inicio, fim, ids, somente_ok=(log == 'aplicacao'))
+    listas = {nome: valores.tolist() for nome, valores in colunas.items()}
+    resultado = []
+    for i, instante in enumerate(listas['instante']):
+        registro = {'timestamp': formatar_instante(instante), 'id_sensor': listas['id_sensor'][i]}
+        if log == 'rede':
+            ok = listas['status'][i] == 1
+            registro['status'] = 'OK' if ok else 'Erro'
+            registro['rssi_uplink_dbm'] = round(listas['rssi_uplink_dbm'][i], 2) if ok else None
+            registro['rssi_downlink_dbm'] = round(listas['rssi_downlink_dbm'][i], 2) if ok else None
+        else:
+            dados = {campo: listas[nome][i] for campo, nome in zip(campos, nomes_dados) if listas[nome][i] == listas[nome][i]}
+            if not dados:
+                continue
+            registro['contador_pacote'] = listas['contador_pacote'][i]
+            registro['dados'] = dados
+        resultado.append(registro)
+    return resultado
@@ -0,0 +1,165 @@
+# Comum/relogio.py
+
+"""
+Relógio de Simulação Compartilhado
+Todos os níveis usam este relógio (em vez de 'time.sleep', 'time.monotonic' e
+'datetime.now') para esperas, prazos e carimbos de tempo dos logs. Assim, um cenário de
+24 horas não precisa levar 24 horas.
+
+Modos (variável de ambiente 'TPM_RELOGIO'):
+- 'real' (padrão): o tempo simulado é o tempo do relógio do sistema.
+- 'escalado:N': o tempo simulado corre N vezes mais rápido (ex.: 'escalado:100').
+  Todos os processos precisam da mesma origem em 'TPM_RELOGIO_ORIGEM' (instante real,
+  em segundos desde a época, em que o tempo simulado começou); para gerá-la:
+      eval $(python Comum/relogio.py escalado:100)
+- 'eventos': tempo virtual, "o mais rápido possível", avançado pelo núcleo de eventos
+  discretos (Simulador_Eventos/simular.py), que roda todos os níveis em um único processo.
+  Uma espera sem nada para fazer avança o relógio direto para o fim do prazo, sem dormir.
+  Os scripts independentes dos níveis recusam este modo (exigir_relogio_de_processo()):
+  sem o núcleo para ordenar os eventos, eles girariam sem parar e os prazos de resposta
+  venceriam antes de o outro processo responder.
+
+Durações passadas ao relógio (dormir, aguardar) são sempre em segundos SIMULADOS.
+"""
+
+# --- Importação de Bibliotecas ---
+import os
+import sys
+import time
+from datetime import datetime
+
+MODOS = ('real', 'escalado', 'eventos')
+
+
+class RelogioReal:
+    modo = 'real'
+    fator = 1.0
+
+    def agora(self):
+        """Instante simulado, em segundos desde a época (como 'time.time()')."""
+        return time.time()
+
+    def monotonico(self):
+        """Relógio simulado que nunca volta (como 'time.monotonic()'), para prazos e intervalos."""
+        return time.monotonic()
+
+    def para_real(self, segundos):
+        """Converte uma duração simulada no tempo real correspondente."""
+        return max(0.0, segundos)
+
+    def dormir(self, segundos):
+        time.sleep(self.para_real(segundos))
+
+    def aguardar(self, canal, canais, segundos):
+        """Espera até 'segundos' simulados por um pacote nos 'canais' do transporte."""
+        return canal.aguardar(canais, timeout=self.para_real(segundos))
+
+    def datetime_agora(self):
+        return datetime.fromtimestamp(self.agora())
+
+    def formatar(self, formato):
+        return self.datetime_agora().strftime(formato)
+
+
+class RelogioEscalado(RelogioReal):
+    modo = 'escalado'
+
+    def __init__(self, fator, origem_real=None, origem_simulada=None):
+        if fator <= 0:
+            raise ValueError("O fator do relógio escalado deve ser positivo.")
+        self.fator = float(fator)
+        self.origem_real = time.time() if origem_real is None else float(origem_real)
+        self.origem_simulada = self.origem_real if origem_simulada is None else float(origem_simulada)
+        self._origem_monotonica = time.monotonic() - (time.time() - self.origem_real)
+
+    def agora(self):
+        return self.origem_simulada + (time.time() - self.origem_real) * self.fator
+
+    def monotonico(self):
+        return (time.monotonic() - self._origem_monotonica) * self.fator
+
+    def para_real(self, segundos):
+        return max(0.0, segundos) / self.fator
+
+
+class RelogioEventos(RelogioReal):
+    modo = 'eventos'
+    fator = float('inf')
+
+    def __init__(self, inicio=None):
+        self._agora = time.time() if inicio is None else float(inicio)
+        self._inicio = self._agora
+
+    def agora(self):
+        return self._agora
+
+    def monotonico(self):
+        return self._agora - self._inicio
+
+    def para_real(self, segundos):
+        return 0.0
+
+    def avancar(self, segundos):
+        self._agora += max(0.0, segundos)
+
+    def avancar_para(self, instante):
+        """Avança o tempo virtual até 'instante' (mesma base de 'agora()'). Nunca volta."""
+        self._agora = max(self._agora, float(instante))
+
+    def dormir(self, segundos):
+        self.avancar(segundos)
+
+    def aguardar(self, canal, canais, segundos):
+        prontos = canal.aguardar(canais, timeout=0)
+        if not prontos:
+            self.avancar(segundos)
+        return prontos
+
+
+def criar_relogio(especificacao=None, origem_real=None):
+    """Cria o relógio de 'real', 'escalado:N' ou 'eventos' (padrão: variável 'TPM_RELOGIO')."""
+    especificacao = especificacao or os.environ.get('TPM_RELOGIO', 'real')
+    modo, _, argumento = especificacao.partition(':')
+    if modo not in MODOS:
+        raise ValueError(f"Modo de relógio '{modo}' desconhecido. Opções: {', '.join(MODOS)}")
+    if modo == 'real':
+        return RelogioReal()
+    if modo == 'eventos':
+        return RelogioEventos()
+    if origem_real is None:
+        origem_real = os.environ.get('TPM_RELOGIO_ORIGEM')
+        if origem_real is None:
+            print("[Relógio] AVISO: 'TPM_RELOGIO_ORIGEM' não definida; usando o início deste processo. "
+                  "Processos com origens diferentes terão horários simulados diferentes.")
+    return RelogioEscalado(float(argumento or 1), origem_real)
+
+_relogio = None
+
+def obter_relogio():
+    """Relógio compartilhado do processo (criado na primeira chamada)."""
+    global _relogio
+    if _relogio is None:
+        _relogio = criar_relogio()
+    return _relogio
+
+def exigir_relogio_de_processo(prefixo):
+    """
+    Encerra o script se o relógio for 'eventos'. Chamado pelos níveis que rodam como
+    processos independentes; o modo 'eventos' só vale dentro do núcleo de eventos.
+    """
+    if obter_relogio().modo == 'eventos':
+        print(f"[{prefixo}] ERRO: O relógio 'eventos' só funciona dentro do núcleo de eventos discretos "
+              f"(Simulador_Eventos/simular.py). Use 'TPM_RELOGIO=real' ou 'escalado:N'.")
+        sys.exit(1)
+
+def definir_relogio(relogio):
+    """Substitui o relógio do processo (ex.: pelo relógio virtual do núcleo de eventos)."""
+    global _relogio
+    _relogio = relogio
+
+
+if __name__ == '__main__':
+    # Imprime as variáveis de ambiente para iniciar todos os níveis com o mesmo relógio.
+    especificacao = sys.argv[1] if len(sys.argv) > 1 else 'real'
+    criar_relogio(especificacao, origem_real=0)
+    print(f"export TPM_RELOGIO={especificacao} TPM_RELOGIO_ORIGEM={time.time():.3f}")
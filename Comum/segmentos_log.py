@@ -0,0 +1,366 @@
+# Comum/segmentos_log.py
+
+"""
+Logs JSON Lines Segmentados (Nível 4 - Tempo Real)
+Em vez de um único arquivo que cresce para sempre, cada log é dividido em segmentos:
+
+    Nivel4/Tempo_Real/
+        dados_brutos_rede.jsonl              <- segmento ATIVO (a Base acrescenta aqui)
+        segmentos/
+            manifesto.json                   <- intervalo de tempo e sensores de cada segmento
+            dados_brutos_rede.20261018T100000.jsonl.gz
+            dados_brutos_rede.20261018T110000.jsonl.gz
+            ...
+
+- Rotação: o segmento ativo é fechado quando o próximo registro cai em outra janela de
+  'intervalo_s' segundos (ex.: a cada hora, alinhada ao relógio) ou quando ele passaria
+  de 'tamanho_mb'. O segmento fechado vai para 'segmentos/', é comprimido ('gzip' ou
+  'zstd', se o pacote 'zstandard' estiver instalado) e entra no manifesto.
+- Manifesto: para cada segmento fechado, guarda o log de origem, o primeiro e o último
+  instante (segundos desde a época), o número de registros e os IDs de sensores. É
+  reescrito de forma atômica (arquivo temporário + os.replace).
+- Leitura: ler_registros() abre apenas os segmentos cujo intervalo se sobrepõe à janela
+  pedida (e que contêm os sensores pedidos), mais o segmento ativo. O custo de uma
+  consulta depende da janela, não do tamanho do histórico.
+
+O nome do segmento ativo não muda, então quem lê só o arquivo ativo continua funcionando.
+Parâmetros em 'configuracoes.yaml', seção 'nivel4.rotacao'.
+"""
+
+# --- Importação de Bibliotecas ---
+import os
+import io
+import gzip
+import json
+import time
+import functools
+from datetime import datetime
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+FORMATO_TIMESTAMP = '%d-%m-%Y %H:%M:%S'
+PASTA_SEGMENTOS = 'segmentos'
+NOME_MANIFESTO = 'manifesto.json'
+COMPRESSOES = {'nenhuma': '', 'gzip': '.gz', 'zstd': '.zst'}
+PARAMETROS_PADRAO = {
+    'ativo': False,
+    'intervalo_s': 3600,
+    'tamanho_mb': 64,
+    'compressao': 'gzip',
+}
+
+
+@functools.lru_cache(maxsize=4096)
+def _inicio_da_hora(prefixo):
+    return datetime.strptime(prefixo, '%d-%m-%Y %H').timestamp()
+
+def instante_do_timestamp(texto):
+    """Converte o 'timestamp' dos logs ('%d-%m-%Y %H:%M:%S', hora local) em segundos desde a época."""
+    try:
+        # Caminho rápido: o início de cada hora é convertido uma vez (as mudanças de horário
+        # de verão acontecem em horas cheias) e os minutos e segundos são somados.
+        if len(texto) == 19 and texto[13] == ':' and texto[16] == ':':
+            minutos, segundos = int(texto[14:16]), int(texto[17:19])
+            if 0 <= minutos < 60 and 0 <= segundos < 60:
+                return _inicio_da_hora(texto[:13]) + minutos * 60 + segundos
+        return datetime.strptime(texto, FORMATO_TIMESTAMP).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+def abrir_segmento(caminho):
+    """Abre um segmento para leitura de texto, comprimido ou não (pela extensão)."""
+    if caminho.endswith('.gz'):
+        return gzip.open(caminho, 'rt', encoding='utf-8')
+    if caminho.endswith('.zst'):
+        if zstandard is None:
+            raise RuntimeError(f"O segmento '{caminho}' usa zstd, mas o pacote 'zstandard' não está instalado.")
+        return io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(caminho, 'rb'), closefd=True), encoding='utf-8')
+    return open(caminho, 'r', encoding='utf-8')
+
+def resumir_arquivo(caminho):
+    """Percorre um segmento e retorna (inicio, fim, registros, conjunto de IDs de sensores)."""
+    inicio = fim = None
+    registros = 0
+    sensores = set()
+    with abrir_segmento(caminho) as f:
+        for linha in f:
+            try:
+                registro = json.loads(linha)
+            except json.JSONDecodeError:
+                continue
+            registros += 1
+            sensores.add(registro.get('id_sensor'))
+            instante = instante_do_timestamp(registro.get('timestamp'))
+            if instante is not None:
+                inicio = instante if inicio is None else min(inicio, instante)
+                fim = instante if fim is None else max(fim, instante)
+    sensores.discard(None)
+    return inicio, fim, registros, sensores
+
+
+# ==============================================================================
+# MANIFESTO
+# ==============================================================================
+def caminho_manifesto(pasta_logs):
+    return os.path.join(pasta_logs, PASTA_SEGMENTOS, NOME_MANIFESTO)
+
+_cache_manifestos = {}
+
+def ler_manifesto(pasta_logs):
+    """Lê o manifesto (com cache: só relê quando o arquivo muda). Retorna a lista de segmentos."""
+    caminho = caminho_manifesto(pasta_logs)
+    try:
+        st = os.stat(caminho)
+    except FileNotFoundError:
+        return []
+    assinatura = (st.st_ino, st.st_mtime_ns, st.st_size)
+    em_cache = _cache_manifestos.get(caminho)
+    if em_cache and em_cache[0] == assinatura:
+        return em_cache[1]
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            segmentos = json.load(f).get('segmentos', [])
+    except (OSError, ValueError) as e:
+        print(f"AVISO: Não foi possível ler o manifesto '{caminho}'. Erro: {e}")
+        return em_cache[1] if em_cache else []
+    _cache_manifestos[caminho] = (assinatura, segmentos)
+    return segmentos
+
+def salvar_manifesto(pasta_logs, segmentos):
+    caminho = caminho_manifesto(pasta_logs)
+    os.makedirs(os.path.dirname(caminho), exist_ok=True)
+    caminho_tmp = caminho + '.tmp'
+    with open(caminho_tmp, 'w', encoding='utf-8') as f:
+        json.dump({'versao': 1, 'segmentos': segmentos}, f)
+    # Troca atômica: os leitores nunca veem um manifesto pela metade.
+    os.replace(caminho_tmp, caminho)
+
+
+# ==============================================================================
+# ESCRITA (usada pelo gravador de logs do Nível 3)
+# ==============================================================================
+class LogSegmentado:
+    """
+    Destino de gravação de um log (ex.: 'dados_brutos_rede.jsonl') com rotação.
+    Recebe lotes de (instante, registro, linha JSON) já ordenados pelo gravador.
+    """
+
+    def __init__(self, caminho, parametros=None):
+        p = dict(PARAMETROS_PADRAO)
+        p.update(parametros or {})
+        if p['compressao'] not in COMPRESSOES:
+            raise ValueError(f"Compressão '{p['compressao']}' desconhecida. Opções: {', '.join(COMPRESSOES)}")
+        if p['compressao'] == 'zstd' and zstandard is None:
+            print("[Nível 4 - Logs] AVISO: Pacote 'zstandard' não instalado. Usando compressão 'gzip'.")
+            p['compressao'] = 'gzip'
+        self.caminho = caminho
+        self.pasta_logs = os.path.dirname(caminho)
+        self.nome_log = os.path.basename(caminho)
+        self.rotacionar_ativo = bool(p['ativo'])
+        self.intervalo_s = float(p['intervalo_s'] or 0)
+        self.tamanho_max_bytes = int(float(p['tamanho_mb'] or 0) * 1024 * 1024)
+        self.compressao = p['compressao']
+        self._arquivo = None
+        # Quantos itens do último lote já foram entregues ao arquivo (ver gravar_lote).
+        self.gravados_no_lote = 0
+        self._zerar_estado()
+
+    def _zerar_estado(self):
+        self.inicio = self.fim = None
+        self.registros = 0
+        self.bytes = 0
+        self.sensores = set()
+
+    def _janela(self, instante):
+        return int(instante // self.intervalo_s) if self.intervalo_s > 0 else None
+
+    def _abrir(self):
+        if self._arquivo is not None:
+            return
+        os.makedirs(self.pasta_logs or '.', exist_ok=True)
+        if self.rotacionar_ativo and os.path.exists(self.caminho) and os.path.getsize(self.caminho) > 0:
+            # Segmento ativo deixado por uma execução anterior: recupera o resumo dele.
+            self.inicio, self.fim, self.registros, self.sensores = resumir_arquivo(self.caminho)
+            self.bytes = os.path.getsize(self.caminho)
+        self._arquivo = open(self.caminho, 'a', encoding='utf-8')
+
+    def gravar_lote(self, itens):
+        """
+        Acrescenta os itens ao segmento ativo, rotacionando no meio do lote se preciso.
+        Se uma gravação falhar, 'gravados_no_lote' diz quantos itens do início do lote já
+        estão no arquivo (inclusive num segmento rotacionado): só o resto deve ser regravado.
+        """
+        self.gravados_no_lote = 0
+        self._abrir()
+        pendentes = []
+        for i, (instante, registro, linha) in enumerate(itens):
+            if self.rotacionar_ativo and self.registros and self._deve_rotacionar(instante, len(linha)):
+                self._arquivo.write(''.join(pendentes))
+                self.gravados_no_lote = i
+                pendentes = []
+                self.rotacionar()
+                self._abrir()
+            pendentes.append(linha)
+            self.registros += 1
+            self.bytes += len(linha)
+            self.inicio = instante if self.inicio is None else min(self.inicio, instante)
+            self.fim = instante if self.fim is None else max(self.fim, instante)
+            self.sensores.add(registro.get('id_sensor'))
+        self._arquivo.write(''.join(pendentes))
+        self.gravados_no_lote = len(itens)
+
+    def _deve_rotacionar(self, instante, tamanho_linha):
+        if self.tamanho_max_bytes and self.bytes + tamanho_linha > self.tamanho_max_bytes:
+            return True
+        return self.inicio is not None and self._janela(instante) != self._janela(self.inicio)
+
+    def descarregar(self, fsync=False):
+        if self._arquivo is not None:
+            self._arquivo.flush()
+            if fsync:
+                os.fsync(self._arquivo.fileno())
+
+    def rotacionar(self):
+        """Fecha o segmento ativo, move-o para 'segmentos/', comprime e registra no manifesto."""
+        self.fechar()
+        if not os.path.exists(self.caminho) or self.registros == 0:
+            self._zerar_estado()
+            return
+        pasta_segmentos = os.path.join(self.pasta_logs, PASTA_SEGMENTOS)
+        os.makedirs(pasta_segmentos, exist_ok=True)
+        raiz, extensao = os.path.splitext(self.nome_log)
+        rotulo = time.strftime('%Y%m%dT%H%M%S', time.localtime(self.inicio if self.inicio is not None else time.time()))
+        nome = f"{raiz}.{rotulo}{extensao}"
+        sufixo = 1
+        while any(os.path.exists(os.path.join(pasta_segmentos, nome + c)) for c in COMPRESSOES.values()):
+            sufixo += 1
+            nome = f"{raiz}.{rotulo}-{sufixo}{extensao}"
+        destino = os.path.join(pasta_segmentos, nome)
+        os.replace(self.caminho, destino)
+
+        entrada = {
+            'log': self.nome_log, 'arquivo': nome,
+            'inicio': self.inicio, 'fim': self.fim,
+            'registros': self.registros, 'bytes': self.bytes,
+            'sensores': sorted(s for s in self.sensores if s is not None),
+        }
+        # O segmento entra no manifesto antes da compressão, para nunca ficar invisível.
+        segmentos = list(ler_manifesto(self.pasta_logs)) + [entrada]
+        salvar_manifesto(self.pasta_logs, segmentos)
+        print(f"[Nível 4 - Logs] Segmento '{nome}' fechado ({self.registros} registros).")
+        self._zerar_estado()
+
+        if self.compressao != 'nenhuma':
+            try:
+                comprimido = comprimir_segmento(destino, self.compressao)
+            except OSError as e:
+                print(f"[Nível 4 - Logs] AVISO: Falha ao comprimir '{nome}'; mantido sem compressão. Erro: {e}")
+                return
+            entrada = dict(entrada, arquivo=os.path.basename(comprimido))
+            salvar_manifesto(self.pasta_logs, [entrada if s['arquivo'] == nome else s for s in ler_manifesto(self.pasta_logs)])
+            os.remove(destino)
+
+    def fechar(self):
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+
+def comprimir_segmento(caminho, compressao):
+    destino = caminho + COMPRESSOES[compressao]
+    destino_tmp = destino + '.tmp'
+    with open(caminho, 'rb') as origem, open(destino_tmp, 'wb') as saida:
+        if compressao == 'zstd':
+            zstandard.ZstdCompressor(level=3).copy_stream(origem, saida)
+        else:
+            with gzip.GzipFile(fileobj=saida, mode='wb', compresslevel=6) as gz:
+                while True:
+                    bloco = origem.read(1 << 20)
+                    if not bloco:
+                        break
+                    gz.write(bloco)
+    os.replace(destino_tmp, destino)
+    return destino
+
+
+# ==============================================================================
+# LEITURA (Níveis 5 e 6, teste.py)
+# ==============================================================================
+def segmentos_da_consulta(pasta_logs, nome_log, inicio=None, fim=None, ids=None):
+    """
+    Retorna [(caminho, contido)] dos segmentos a abrir, em ordem cronológica, terminando
+    no segmento ativo. 'contido' indica que o segmento está todo dentro da janela (não
+    é preciso filtrar registro a registro pelo tempo).
+    """
+    ids = None if ids is None else {int(i) for i in ids}
+    selecionados = []
+    for s in ler_manifesto(pasta_logs):
+        if s.get('log') != nome_log:
+            continue
+        s_inicio, s_fim = s.get('inicio'), s.get('fim')
+        if s_inicio is not None and s_fim is not None:
+            if (fim is not None and s_inicio > fim) or (inicio is not None and s_fim < inicio):
+                continue
+        if ids is not None and not ids.intersection(s.get('sensores', [])):
+            continue
+        contido = (s_inicio is not None and s_fim is not None and (inicio is None or s_inicio >= inicio)
+                   and (fim is None or s_fim <= fim))
+        selecionados.append((s_inicio or 0, os.path.join(pasta_logs, PASTA_SEGMENTOS, s['arquivo']), contido))
+    selecionados.sort(key=lambda s: s[0])
+    caminhos = [(caminho, contido) for _, caminho, contido in selecionados]
+    caminhos.append((os.path.join(pasta_logs, nome_log), inicio is None and fim is None))
+    return caminhos
+
+def _registros_do_segmento(caminho, contido, inicio, fim, ids_texto):
+    try:
+        arquivo = abrir_segmento(caminho)
+    except FileNotFoundError:
+        # Segmento ativo ainda não criado, ou segmento comprimido entre a leitura do
+        # manifesto e a abertura do arquivo.
+        comprimidos = [caminho + c for c in COMPRESSOES.values() if c and os.path.exists(caminho + c)]
+        if not comprimidos:
+            return
+        arquivo = abrir_segmento(comprimidos[0])
+    with arquivo:
+        for linha in arquivo:
+            try:
+                registro = json.loads(linha)
+            except json.JSONDecodeError:
+                continue
+            if ids_texto is not None and str(registro.get('id_sensor')) not in ids_texto:
+                continue
+            if not contido:
+                instante = instante_do_timestamp(registro.get('timestamp'))
+                if instante is None or (inicio is not None and instante < inicio) or (fim is not None and instante > fim):
+                    continue
+            yield registro
+
+def ler_registros(pasta_logs, nome_log, inicio=None, fim=None, ids=None, incluir_ativo=True):
+    """
+    Gera os registros (dicionários) do log 'nome_log', em ordem cronológica, filtrando
+    pela janela [inicio, fim] (segundos desde a época) e pelos IDs de sensores.
+    'incluir_ativo=False' lê só os segmentos já rotacionados.
+    """
+    ids_texto = None if ids is None else {str(i) for i in ids}
+    segmentos = segmentos_da_consulta(pasta_logs, nome_log, inicio, fim, ids)
+    for caminho, contido in (segmentos if incluir_ativo else segmentos[:-1]):
+        yield from _registros_do_segmento(caminho, contido, inicio, fim, ids_texto)
+
+def ultimos_registros(pasta_logs, nome_log, quantidade, inicio=None, fim=None, ids=None):
+    """
+    Os 'quantidade' registros mais recentes (em ordem cronológica). Lê os segmentos do
+    mais novo para o mais antigo e para assim que tiver registros suficientes.
+    """
+    ids_texto = None if ids is None else {str(i) for i in ids}
+    partes = []
+    encontrados = 0
+    for caminho, contido in reversed(segmentos_da_consulta(pasta_logs, nome_log, inicio, fim, ids)):
+        registros = list(_registros_do_segmento(caminho, contido, inicio, fim, ids_texto))
+        partes.append(registros)
+        encontrados += len(registros)
+        if encontrados >= quantidade:
+            break
+    registros = [r for parte in reversed(partes) for r in parte]
+    return registros[-quantidade:] if quantidade > 0 else []
@@ -0,0 +1,180 @@
+# Comum/seguidor_log.py
+
+"""
+Leitura Incremental dos Logs JSON Lines (Nível 4 - Tempo Real)
+Equivale a um 'tail -F': cada SeguidorLog lembra até onde já leu um log (inode do arquivo
+e posição em bytes) e, a cada chamada, decodifica apenas as linhas acrescentadas desde
+então. Quem consulta o log repetidamente (painéis do Nível 6, 'teste.py') paga só pelos
+dados novos, não pelo arquivo inteiro.
+
+- Linha parcial: a Base grava em lote e o último pedaço lido pode não terminar em '\\n'.
+  Esse pedaço fica guardado e é completado na próxima leitura.
+- Rotação (segmentos_log.py): o arquivo ativo é movido para 'segmentos/' e um novo é
+  criado com o mesmo nome. O seguidor mantém o arquivo antigo aberto, lê o que faltava
+  nele e só então passa para o novo (detectado pela troca de inode).
+- Truncamento (arquivo recriado menor, ex.: restaurado pelo git): recomeça do início (e,
+  com 'com_segmentos', também relê os segmentos). O consumidor precisa descartar o que já
+  acumulou: 'reiniciado' fica verdadeiro depois da leitura em que isso aconteceu, e o
+  callback 'ao_reiniciar' é chamado antes de os registros relidos serem gerados.
+- 'com_segmentos=True': a primeira leitura inclui os segmentos já rotacionados (em ordem
+  cronológica), para o consumidor começar com o histórico completo; 'inicio_segmentos'
+  (segundos desde a época) pula os segmentos que terminam antes desse instante.
+
+Duas formas de uso:
+    seguidor = SeguidorLog('Nivel4/Tempo_Real/dados_brutos_rede.jsonl')
+    for registro in seguidor.ler_novos():      # gerador: só o que chegou desde a última chamada
+        ...
+    parar = seguidor.em_segundo_plano(lambda registros: ..., intervalo_s=1.0)   # callback
+"""
+
+# --- Importação de Bibliotecas ---
+import os
+import sys
+import json
+import threading
+
+sys.path.append(os.path.dirname(__file__))
+import segmentos_log
+
+TAMANHO_BLOCO_BYTES = 1024 * 1024
+
+
+class SeguidorLog:
+
+    def __init__(self, caminho, desde_inicio=True, com_segmentos=False, inicio_segmentos=None, ao_reiniciar=None):
+        """
+        'desde_inicio': se falso, ignora o conteúdo já existente e lê só o que for
+        acrescentado depois da primeira chamada.
+        'ao_reiniciar': função sem argumentos chamada quando o log é relido do início.
+        """
+        self.caminho = caminho
+        self.desde_inicio = desde_inicio
+        self.com_segmentos = com_segmentos
+        self._historico_pendente = com_segmentos and desde_inicio
+        self.ao_reiniciar = ao_reiniciar
+        self.reiniciado = False
+        self.inicio_segmentos = inicio_segmentos
+        self._arquivo = None
+        self.inode = None
+        self.offset = 0
+        self._resto = b''
+        self.linhas_invalidas = 0
+        self._trava = threading.Lock()
+
+    # --- Gerador ---
+    def ler_novos(self):
+        """Gera os registros (dicionários) acrescentados ao log desde a última chamada."""
+        with self._trava:
+            self.reiniciado = False
+            if self._historico_pendente:
+                self._historico_pendente = False
+                yield from self._ler_segmentos()
+            while True:
+                if self._arquivo is None and not self._abrir():
+                    return
+                yield from self._ler_ate_o_fim()
+                try:
+                    st = os.stat(self.caminho)
+                except FileNotFoundError:
+                    # Entre a rotação e a criação do novo arquivo: continua no antigo.
+                    return
+                if st.st_ino != self.inode:
+                    # Rotacionado: a Base já fechou o arquivo antigo; lê o que ainda faltava nele.
+                    yield from self._ler_ate_o_fim()
+                    self._fechar(descartar_resto=True)
+                    continue
+                if st.st_size < self.offset:
+                    print(f"[Nível 4 - Leitura] AVISO: '{os.path.basename(self.caminho)}' foi truncado. Relendo do início.")
+                    self._arquivo.seek(0)
+                    self.offset = 0
+                    self._resto = b''
+                    self.reiniciado = True
+                    if self.ao_reiniciar is not None:
+                        self.ao_reiniciar()
+                    if self.com_segmentos:
+                        yield from self._ler_segmentos()
+                    continue
+                return
+
+    def acompanhar(self, intervalo_s=1.0, parar=None):
+        """Gerador contínuo: espera por registros novos (verificando a cada 'intervalo_s') até 'parar' ser sinalizado."""
+        parar = parar or threading.Event()
+        while not parar.is_set():
+            yield from self.ler_novos()
+            parar.wait(intervalo_s)
+
+    # --- Callback ---
+    def seguir(self, callback, intervalo_s=1.0, parar=None):
+        """Chama callback(lista de registros novos) a cada 'intervalo_s' em que houver dados, até 'parar'."""
+        parar = parar or threading.Event()
+        while not parar.is_set():
+            try:
+                registros = list(self.ler_novos())
+                if registros:
+                    callback(registros)
+            except Exception as e:
+                print(f"[Nível 4 - Leitura] ERRO ao acompanhar '{self.caminho}': {e}")
+            parar.wait(intervalo_s)
+
+    def em_segundo_plano(self, callback, intervalo_s=1.0):
+        """Executa seguir() numa thread auxiliar. Retorna o evento que a encerra ('parar.set()')."""
+        parar = threading.Event()
+        threading.Thread(target=self.seguir, args=(callback, intervalo_s, parar),
+                         name=f"seguidor-{os.path.basename(self.caminho)}", daemon=True).start()
+        return parar
+
+    def fechar(self):
+        with self._trava:
+            self._fechar(descartar_resto=False)
+
+    # --- Auxiliares ---
+    def _abrir(self):
+        try:
+            self._arquivo = open(self.caminho, 'rb')
+        except FileNotFoundError:
+            # O log ainda não existe: tudo o que for gravado nele será novo.
+            self.desde_inicio = True
+            return False
+        self.inode = os.fstat(self._arquivo.fileno()).st_ino
+        if not self.desde_inicio:
+            self._arquivo.seek(0, os.SEEK_END)
+            # Só o primeiro arquivo é pulado: os que vierem depois de uma rotação são novos.
+            self.desde_inicio = True
+        self.offset = self._arquivo.tell()
+        return True
+
+    def _fechar(self, descartar_resto):
+        if self._arquivo is not None:
+            self._arquivo.close()
+            self._arquivo = None
+        if descartar_resto and self._resto:
+            # O segmento rotacionado terminou no meio de uma linha: não há como completá-la.
+            self.linhas_invalidas += 1
+        self._resto = b''
+
+    def _ler_ate_o_fim(self):
+        while True:
+            bloco = self._arquivo.read(TAMANHO_BLOCO_BYTES)
+            if not bloco:
+                return
+            self.offset += len(bloco)
+            linhas = (self._resto + bloco).split(b'\n')
+            self._resto = linhas.pop()
+            for linha in linhas:
+                registro = self._decodificar(linha)
+                if registro is not None:
+                    yield registro
+
+    def _decodificar(self, linha):
+        if not linha.strip():
+            return None
+        try:
+            return json.loads(linha)
+        except ValueError:
+            self.linhas_invalidas += 1
+            return None
+
+    def _ler_segmentos(self):
+        pasta, nome = os.path.split(self.caminho)
+        # O arquivo ativo fica de fora: ele é lido pelo próprio seguidor.
+        yield from segmentos_log.ler_registros(pasta, nome, inicio=self.inicio_segmentos, incluir_ativo=False)
@@ -0,0 +1,296 @@
+# Comum/transporte.py
+
+"""
+Camada de Transporte Compartilhada - Níveis 1, 2 e 3
+Este módulo concentra a troca de pacotes entre a Base (Nível 3), o Canal (Nível 2)
+e os Nós Sensores (Nível 1), que antes era feita diretamente com arquivos.
+
+Cada "canal" tem o mesmo nome do arquivo usado originalmente:
+- pacote_downlink_entrada: Base    -> Canal
+- pacote_downlink_saida:   Canal   -> Nó Sensor
+- pacote_uplink_entrada:   Nó Sensor -> Canal
+- pacote_uplink_saida:     Canal   -> Base
+
+Backends disponíveis (escolhidos com --transporte ou pela variável TPM_TRANSPORTE):
+- 'arquivo': comportamento original, um arquivo por canal no diretório Nivel2.
+  Mantido para compatibilidade; a chegada é detectada por verificação periódica.
+- 'fila': diretórios de spool ('<canal>.fila/'), um arquivo por pacote com nome
+  sequencial. Vários pacotes podem estar em trânsito ao mesmo tempo sem que um
+  sobrescreva o outro, e o consumidor drena a fila em lotes, em ordem de chegada.
+- 'socket': sockets Unix de datagrama. O processo que consome um canal fica
+  bloqueado no kernel e é acordado assim que o pacote chega, sem polling.
+
+Todos os backends oferecem a mesma interface:
+    escutar(canais), enviar(canal, pacote), receber(canal, timeout),
+    receber_lote(canal, maximo), aguardar(canais, timeout), descritor(canal) e fechar().
+'descritor' devolve o descritor de arquivo do canal (para uso com 'select'/asyncio)
+ou None quando o backend não tem um (nesse caso, use 'aguardar').
+"""
+
+# --- Importação de Bibliotecas ---
+import os
+import select
+import socket
+import time
+
+# --- 1. Nomes dos Canais ---
+DOWNLINK_ENTRADA = 'pacote_downlink_entrada'
+DOWNLINK_SAIDA = 'pacote_downlink_saida'
+UPLINK_ENTRADA = 'pacote_uplink_entrada'
+UPLINK_SAIDA = 'pacote_uplink_saida'
+
+PASTA_NIVEL2 = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'Nivel2'))
+TRANSPORTE_PADRAO = os.environ.get('TPM_TRANSPORTE', 'arquivo')
+
+
+class TransporteArquivo:
+    """
+    Backend de arquivos: cada canal é um único arquivo no diretório Nivel2.
+    A escrita é feita em um arquivo temporário seguido de 'os.replace', para que o
+    leitor nunca encontre um pacote pela metade.
+    """
+    # Intervalo entre verificações enquanto se espera um pacote.
+    INTERVALO_VERIFICACAO_S = 0.05
+
+    def __init__(self, pasta=PASTA_NIVEL2):
+        self.pasta = pasta
+
+    def _caminho(self, canal):
+        return os.path.join(self.pasta, canal)
+
+    def escutar(self, canais):
+        """Nada a preparar: os arquivos são criados pelo remetente."""
+        os.makedirs(self.pasta, exist_ok=True)
+
+    def enviar(self, canal, pacote):
+        caminho = self._caminho(canal)
+        caminho_tmp = f"{caminho}.{os.getpid()}.tmp"
+        with open(caminho_tmp, 'wb') as f:
+            f.write(bytes(pacote))
+        os.replace(caminho_tmp, caminho)
+        return True
+
+    def _ler(self, canal):
+        caminho = self._caminho(canal)
+        try:
+            with open(caminho, 'rb') as f:
+                pacote = f.read()
+            os.remove(caminho)
+            return pacote
+        except FileNotFoundError:
+            # Outro processo consumiu o arquivo primeiro.
+            return None
+
+    def aguardar(self, canais, timeout=None):
+        """Retorna a lista de canais com pacote disponível (vazia se o tempo esgotar)."""
+        limite = None if timeout is None else time.monotonic() + timeout
+        while True:
+            prontos = [c for c in canais if os.path.exists(self._caminho(c))]
+            if prontos or (limite is not None and time.monotonic() >= limite):
+                return prontos
+            time.sleep(self.INTERVALO_VERIFICACAO_S)
+
+    def receber(self, canal, timeout=0):
+        """Lê e consome o pacote do canal, esperando até 'timeout' segundos. Retorna None se não houver."""
+        limite = None if timeout is None else time.monotonic() + timeout
+        while True:
+            if os.path.exists(self._caminho(canal)):
+                pacote = self._ler(canal)
+                if pacote is not None:
+                    return pacote
+            if limite is not None and time.monotonic() >= limite:
+                return None
+            time.sleep(self.INTERVALO_VERIFICACAO_S)
+
+    def receber_lote(self, canal, maximo=64):
+        """Com um único arquivo por canal, o lote tem no máximo um pacote."""
+        pacote = self.receber(canal)
+        return [pacote] if pacote is not None else []
+
+    def descritor(self, canal):
+        return None
+
+    def fechar(self):
+        pass
+
+
+class TransporteFila(TransporteArquivo):
+    """
+    Backend de fila: cada canal é um diretório de spool ('<canal>.fila/') e cada pacote
+    é um arquivo '<tempo_ns>_<pid>_<seq>.pkt'. O nome cresce com o tempo de envio, então
+    a ordem alfabética é a ordem de chegada, e o par (pid, seq) evita colisões entre
+    remetentes. O consumidor "reivindica" cada arquivo com um 'os.rename' atômico antes
+    de lê-lo, de modo que dois consumidores nunca entregam o mesmo pacote.
+    """
+    EXTENSAO = '.pkt'
+
+    def __init__(self, pasta=PASTA_NIVEL2):
+        super().__init__(pasta)
+        self.sequencia = 0
+
+    def _caminho(self, canal):
+        return os.path.join(self.pasta, f"{canal}.fila")
+
+    def _pendentes(self, canal):
+        try:
+            nomes = [n for n in os.listdir(self._caminho(canal)) if n.endswith(self.EXTENSAO)]
+        except FileNotFoundError:
+            return []
+        nomes.sort()
+        return nomes
+
+    def escutar(self, canais):
+        for canal in canais:
+            os.makedirs(self._caminho(canal), exist_ok=True)
+
+    def enviar(self, canal, pacote):
+        pasta_fila = self._caminho(canal)
+        os.makedirs(pasta_fila, exist_ok=True)
+        self.sequencia += 1
+        nome = f"{time.time_ns():020d}_{os.getpid()}_{self.sequencia:08d}"
+        # O arquivo temporário começa com '.' e não termina em '.pkt': o leitor o ignora.
+        caminho_tmp = os.path.join(pasta_fila, f".{nome}.tmp")
+        with open(caminho_tmp, 'wb') as f:
+            f.write(bytes(pacote))
+        os.replace(caminho_tmp, os.path.join(pasta_fila, nome + self.EXTENSAO))
+        return True
+
+    def aguardar(self, canais, timeout=None):
+        limite = None if timeout is None else time.monotonic() + timeout
+        while True:
+            prontos = [c for c in canais if self._pendentes(c)]
+            if prontos or (limite is not None and time.monotonic() >= limite):
+                return prontos
+            time.sleep(self.INTERVALO_VERIFICACAO_S)
+
+    def receber_lote(self, canal, maximo=64):
+        """Drena até 'maximo' pacotes da fila, do mais antigo para o mais novo."""
+        pasta_fila = self._caminho(canal)
+        lote = []
+        for nome in self._pendentes(canal)[:maximo]:
+            caminho = os.path.join(pasta_fila, nome)
+            caminho_reivindicado = f"{caminho}.{os.getpid()}.lido"
+            try:
+                os.rename(caminho, caminho_reivindicado)
+            except FileNotFoundError:
+                continue # Outro consumidor levou este pacote.
+            with open(caminho_reivindicado, 'rb') as f:
+                lote.append(f.read())
+            os.remove(caminho_reivindicado)
+        return lote
+
+    def receber(self, canal, timeout=0):
+        limite = None if timeout is None else time.monotonic() + timeout
+        while True:
+            lote = self.receber_lote(canal, maximo=1)
+            if lote:
+                return lote[0]
+            if limite is not None and time.monotonic() >= limite:
+                return None
+            time.sleep(self.INTERVALO_VERIFICACAO_S)
+
+
+class TransporteSocket:
+    """
+    Backend de sockets Unix (AF_UNIX / SOCK_DGRAM): cada canal é um endereço no
+    diretório Nivel2 ('<canal>.sock'). Quem consome o canal faz o 'bind' em 'escutar()';
+    quem envia apenas faz 'sendto'. Cada datagrama é exatamente um pacote.
+
+    Se não houver ninguém escutando o canal, o pacote é descartado (como em um rádio
+    sem receptor ligado) e 'enviar()' retorna False.
+    """
+
+    def __init__(self, pasta=PASTA_NIVEL2):
+        self.pasta = pasta
+        self.sockets_escuta = {}
+        self.socket_envio = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+
+    def _caminho(self, canal):
+        return os.path.join(self.pasta, f"{canal}.sock")
+
+    def escutar(self, canais):
+        """Cria os sockets de recepção dos canais consumidos por este processo."""
+        os.makedirs(self.pasta, exist_ok=True)
+        for canal in canais:
+            if canal in self.sockets_escuta:
+                continue
+            caminho = self._caminho(canal)
+            if os.path.exists(caminho):
+                if self._em_uso(caminho):
+                    raise RuntimeError(f"O canal '{canal}' já está sendo escutado por outro processo ({caminho}).")
+                # Endereço deixado por um processo encerrado de forma abrupta.
+                os.remove(caminho)
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.bind(caminho)
+            self.sockets_escuta[canal] = sock
+
+    @staticmethod
+    def _em_uso(caminho):
+        """Testa com connect() se algum processo ainda está ligado ao endereço."""
+        sonda = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            sonda.connect(caminho)
+            return True
+        except (ConnectionRefusedError, FileNotFoundError):
+            return False
+        finally:
+            sonda.close()
+
+    def enviar(self, canal, pacote):
+        try:
+            self.socket_envio.sendto(bytes(pacote), self._caminho(canal))
+            return True
+        except (FileNotFoundError, ConnectionRefusedError):
+            print(f"[Transporte] AVISO: Ninguém escutando o canal '{canal}'. Pacote descartado.")
+            return False
+
+    def aguardar(self, canais, timeout=None):
+        sockets = [self.sockets_escuta[c] for c in canais]
+        prontos, _, _ = select.select(sockets, [], [], timeout)
+        return [c for c in canais if self.sockets_escuta[c] in prontos]
+
+    def receber(self, canal, timeout=0):
+        if not self.aguardar([canal], timeout):
+            return None
+        pacote, _ = self.sockets_escuta[canal].recvfrom(4096)
+        return pacote
+
+    def descritor(self, canal):
+        return self.sockets_escuta[canal].fileno()
+
+    def receber_lote(self, canal, maximo=64):
+        """Drena sem bloquear os datagramas já enfileirados no kernel."""
+        lote = []
+        while len(lote) < maximo:
+            pacote = self.receber(canal)
+            if pacote is None:
+                break
+            lote.append(pacote)
+        return lote
+
+    def fechar(self):
+        self.socket_envio.close()
+        for canal, sock in self.sockets_escuta.items():
+            sock.close()
+            try:
+                os.remove(self._caminho(canal))
+            except FileNotFoundError:
+                pass
+        self.sockets_escuta = {}
+
+
+# --- REGISTRO CENTRAL DE BACKENDS ---
+BACKENDS = {
+    'arquivo': TransporteArquivo,
+    'fila': TransporteFila,
+    'socket': TransporteSocket,
+}
+
+def criar_transporte(nome=None, canais_escuta=()):
+    """Cria o backend pelo nome e já prepara a recepção dos canais informados."""
+    nome = nome or TRANSPORTE_PADRAO
+    if nome not in BACKENDS:
+        raise ValueError(f"Transporte '{nome}' desconhecido. Opções: {', '.join(BACKENDS)}")
+    transporte = BACKENDS[nome]()
+    transporte.escutar(list(canais_escuta))
+    return transporte
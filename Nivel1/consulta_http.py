@@ -0,0 +1,165 @@
+# Nivel1/consulta_http.py
+
+"""
+Consultas HTTP em Cache para as Fontes de Dados - Nível 1
+Apoio às fontes de dados que buscam valores em uma API (ex: 'data_source/clima.py').
+Com muitos sensores do mesmo tipo, a mesma consulta seria repetida a cada pedido e a
+resposta do sensor ficaria presa à latência da rede. Aqui:
+
+- Cache com validade (TTL) por consulta: a chave é a URL mais os parâmetros.
+- Uma única 'requests.Session' compartilhada, com pool de conexões.
+- Atualização em segundo plano: vencida a validade, 'obter()' devolve na hora o último
+  valor bom e dispara UMA atualização em uma thread; as chamadas seguintes não repetem
+  a consulta enquanto ela estiver em andamento.
+- Limite de taxa: depois de uma falha, a consulta só é tentada de novo após
+  'intervalo_apos_falha_s', mesmo que muitos sensores peçam o valor.
+
+Modos (variável de ambiente 'TPM_HTTP_MODO', arquivo em 'TPM_HTTP_ARQUIVO'):
+- 'online' (padrão): consulta a API.
+- 'gravar': consulta a API e acrescenta cada resposta ao arquivo (JSON Lines).
+- 'offline': não acessa a rede; reproduz, em ordem e em ciclo, as respostas gravadas
+  no arquivo para a mesma consulta. Não requer a biblioteca 'requests'.
+O arquivo padrão ('respostas_http.jsonl', ao lado deste script) traz respostas de exemplo
+para a consulta do 'clima.py'. Ex.: TPM_HTTP_MODO=offline python nivel1.py --id 1
+"""
+
+# --- Importação de Bibliotecas ---
+import os
+import json
+import time
+import threading
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+except ImportError:
+    requests = None
+
+MODO = os.environ.get('TPM_HTTP_MODO', 'online')
+ARQUIVO_RESPOSTAS = os.environ.get('TPM_HTTP_ARQUIVO', os.path.join(os.path.dirname(__file__), 'respostas_http.jsonl'))
+MODOS = ('online', 'gravar', 'offline')
+
+_sessao = None
+_trava_sessao = threading.Lock()
+
+
+def obter_sessao():
+    """Sessão HTTP compartilhada por todas as fontes de dados do processo."""
+    global _sessao
+    with _trava_sessao:
+        if _sessao is None:
+            if requests is None:
+                raise RuntimeError("O modo online requer a biblioteca 'requests' (pip install requests).")
+            _sessao = requests.Session()
+            adaptador = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            _sessao.mount('https://', adaptador)
+            _sessao.mount('http://', adaptador)
+        return _sessao
+
+def chave_consulta(url, parametros=None):
+    return url + '?' + '&'.join(f'{k}={v}' for k, v in sorted((parametros or {}).items()))
+
+
+class RespostasGravadas:
+    """Respostas lidas de um arquivo JSON Lines, devolvidas em ciclo para cada consulta."""
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        self._respostas = {}
+        self._posicao = {}
+        self._trava = threading.Lock()
+        if os.path.exists(caminho):
+            with open(caminho, 'r', encoding='utf-8') as f:
+                for linha in f:
+                    if linha.strip():
+                        registro = json.loads(linha)
+                        self._respostas.setdefault(registro['chave'], []).append(registro['resposta'])
+
+    def proxima(self, chave):
+        with self._trava:
+            respostas = self._respostas.get(chave)
+            if not respostas:
+                raise LookupError(f"Nenhuma resposta gravada para '{chave}' em '{self.caminho}'.")
+            posicao = self._posicao.get(chave, 0)
+            self._posicao[chave] = posicao + 1
+            return respostas[posicao % len(respostas)]
+
+    def gravar(self, chave, resposta):
+        with self._trava:
+            with open(self.caminho, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'chave': chave, 'instante': time.time(), 'resposta': resposta}) + '\n')
+
+
+class ConsultaEmCache:
+    """
+    Cache de consultas JSON com validade, atualização em segundo plano e limite de taxa.
+    'validade_s': por quanto tempo uma resposta é considerada atual.
+    """
+
+    def __init__(self, nome, validade_s=300, tempo_limite_s=10, intervalo_apos_falha_s=30, modo=None, arquivo=None):
+        self.nome = nome
+        self.validade_s = validade_s
+        self.tempo_limite_s = tempo_limite_s
+        self.intervalo_apos_falha_s = intervalo_apos_falha_s
+        self.modo = modo or MODO
+        if self.modo not in MODOS:
+            raise ValueError(f"Modo HTTP '{self.modo}' desconhecido. Opções: {', '.join(MODOS)}")
+        self.gravadas = RespostasGravadas(arquivo or ARQUIVO_RESPOSTAS) if self.modo != 'online' else None
+        # Chave -> (valor, instante em que foi obtido). Só guarda respostas válidas.
+        self._valores = {}
+        # Chave -> instante da última tentativa que falhou.
+        self._falhas = {}
+        self._atualizando = set()
+        self._trava = threading.Lock()
+
+    def _buscar(self, url, parametros, chave):
+        if self.modo == 'offline':
+            return self.gravadas.proxima(chave)
+        resposta = obter_sessao().get(url, params=parametros, timeout=self.tempo_limite_s)
+        resposta.raise_for_status()
+        dados = resposta.json()
+        if self.modo == 'gravar':
+            self.gravadas.gravar(chave, dados)
+        return dados
+
+    def _atualizar(self, url, parametros, chave):
+        try:
+            dados = self._buscar(url, parametros, chave)
+        except Exception as e:
+            print(f"[Fonte de Dados: {self.nome}] AVISO: Falha na consulta. Erro: {e}")
+            with self._trava:
+                self._falhas[chave] = time.monotonic()
+            return None
+        with self._trava:
+            self._valores[chave] = (dados, time.monotonic())
+            self._falhas.pop(chave, None)
+        return dados
+
+    def _atualizar_em_segundo_plano(self, url, parametros, chave):
+        try:
+            self._atualizar(url, parametros, chave)
+        finally:
+            with self._trava:
+                self._atualizando.discard(chave)
+
+    def obter(self, url, parametros=None):
+        """
+        Retorna a resposta (JSON já convertido) da consulta, ou None se nunca houve uma
+        resposta válida. Só bloqueia na primeira consulta de cada chave.
+        """
+        chave = chave_consulta(url, parametros)
+        agora = time.monotonic()
+        with self._trava:
+            valor = self._valores.get(chave)
+            ultima_falha = self._falhas.get(chave)
+            if valor is not None and agora - valor[1] < self.validade_s:
+                return valor[0]
+            if ultima_falha is not None and agora - ultima_falha < self.intervalo_apos_falha_s:
+                return valor[0] if valor else None
+            if valor is not None:
+                # Valor vencido: devolve o último bom e atualiza em segundo plano (uma thread por chave).
+                if chave not in self._atualizando:
+                    self._atualizando.add(chave)
+                    threading.Thread(target=self._atualizar_em_segundo_plano, args=(url, parametros, chave), daemon=True).start()
+                return valor[0]
+        return self._atualizar(url, parametros, chave)
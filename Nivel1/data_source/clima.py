@@ -1,17 +1,26 @@
 # Nivel1/data_source/clima.py
-import requests
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from consulta_http import ConsultaEmCache
+
+URL = "https://api.open-meteo.com/v1/forecast"
+PARAMETROS = {'latitude': -22.9056, 'longitude': -47.0608, 'current': 'temperature_2m,relative_humidity_2m'}
+
+# Compartilhado por todos os sensores de clima do processo: a API é consultada no máximo
+# uma vez a cada 5 minutos (o Open-Meteo atualiza os dados 'current' a cada 15 minutos).
+consulta = ConsultaEmCache("clima.py", validade_s=300, tempo_limite_s=10)
 
 def get_data():
     """
-    Tenta obter dados de temperatura e umidade da API Open-Meteo.
+    Obtém dados de temperatura e umidade da API Open-Meteo (em cache, ver consulta_http.py).
     Retorna um dicionário com os dados ou None em caso de falha.
     """
     try:
-        url = "https://api.open-meteo.com/v1/forecast?latitude=-22.9056&longitude=-47.0608&current=temperature_2m,relative_humidity_2m"
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        
+        data = consulta.obter(URL, PARAMETROS)
+        if data is None:
+            return None
         return {
             'temperatura': float(data['current']['temperature_2m']),
             'umidade': float(data['current']['relative_humidity_2m'])
@@ -0,0 +1,42 @@
+# Nivel1/data_source/clima_sintetico.py
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'Comum'))
+import relogio
+from sinal_sintetico import MotorSintetico
+
+SEMENTE = 7
+DIA_S = 86400
+
+# Mesmos campos do 'clima.py', mas gerados localmente (sem rede) pelo motor sintético.
+# A fase põe o pico de temperatura (e o mínimo de umidade) às 15h de Brasília (18h UTC).
+PARAMETROS = {
+    'temperatura': {
+        'nivel': 22.0, 'processo': 'ar1', 'phi': 0.995, 'sigma': 0.05,
+        'sazonal': [{'periodo_s': DIA_S, 'amplitude': 5.0, 'fase_s': 12 * 3600}],
+        'anomalias': {'taxa_por_hora': 0.05, 'amplitude': 8.0, 'duracao_s': 120},
+        'falhas': {'taxa_por_hora': 0.02, 'duracao_s': 600},
+        'minimo': -10.0, 'maximo': 50.0,
+    },
+    'umidade': {
+        'nivel': 65.0, 'processo': 'ar1', 'phi': 0.99, 'sigma': 0.3,
+        'sazonal': [{'periodo_s': DIA_S, 'amplitude': -15.0, 'fase_s': 12 * 3600}],
+        'minimo': 0.0, 'maximo': 100.0,
+    },
+}
+
+motor = MotorSintetico(PARAMETROS, semente=SEMENTE)
+
+def get_data():
+    """
+    Gera temperatura e umidade sintéticas (série do sensor 0) no instante atual do relógio de simulação.
+    Retorna um dicionário com os dados; campos em falha são omitidos.
+    """
+    colunas = get_data_batch([0], relogio.obter_relogio().agora())
+    return {campo: float(valores[0]) for campo, valores in colunas.items() if valores[0] == valores[0]} or None
+
+def get_data_batch(sensor_ids, t):
+    """Temperatura e umidade de vários sensores no instante 't' (ver sinal_sintetico.py)."""
+    return motor.amostras(sensor_ids, t)
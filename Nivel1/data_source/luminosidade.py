@@ -1,9 +1,47 @@
 # Nivel1/data_source/luminosidade.py
+import os
+import sys
 import random
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'Comum'))
+import relogio
+try:
+    import numpy as np
+    import sinais
+except ImportError:
+    np = None  # Sem NumPy, o Nível 1 usa apenas get_data().
+
+SEMENTE = 2024
+FUSO_HORAS = -3.0          # Horário de Brasília
+LUX_NOITE = 100            # Iluminação artificial / noturna
+LUX_PICO = 2000            # Pico médio ao meio-dia
+PASSO_S = 1.0              # Resolução do ruído: um sorteio por sensor a cada segundo
+
 def get_data():
     """
-    Gera um dado aleatório de luminosidade (em Lux) para simulação.
+    Gera a luminosidade (em Lux) do sensor 0 no instante atual do relógio de simulação,
+    pela mesma curva diurna de get_data_batch(). Sem NumPy, sorteia um valor uniforme.
     Retorna um dicionário com o dado.
     """
-    return {'luminosidade_lux': random.randint(100, 2000)}
+    if np is None:
+        return {'luminosidade_lux': random.randint(LUX_NOITE, LUX_PICO)}
+    colunas = get_data_batch([0], relogio.obter_relogio().agora())
+    return {campo: float(valores[0]) for campo, valores in colunas.items()}
+
+# O contrato de lote é opcional: só existe quando o NumPy está instalado.
+if np is not None:
+    def get_data_batch(sensor_ids, t):
+        """
+        Gera a luminosidade de vários sensores de uma vez, no instante 't' (segundos desde a época).
+        Cada sensor segue a curva do dia com seu próprio pico (±20%) e nuvens passageiras
+        (ruído multiplicativo), reprodutíveis por (SEMENTE, ID, instante).
+        Retorna {'luminosidade_lux': vetor com um valor por sensor, na ordem de 'sensor_ids'}.
+        """
+        ids = np.asarray(sensor_ids, dtype=np.int64)
+        passo = np.full(len(ids), int(t // PASSO_S))
+        # Pico próprio de cada sensor (fixo: não depende do instante).
+        pico = LUX_PICO * (0.8 + 0.4 * sinais.uniforme_deterministica(SEMENTE, ids, np.zeros(len(ids)), fluxo=0))
+        nuvens = np.clip(1.0 + 0.15 * sinais.normal_deterministica(SEMENTE, ids, passo, fluxo=1), 0.2, 1.2)
+        lux = LUX_NOITE + (pico - LUX_NOITE) * sinais.curva_diurna(t, fuso_horas=FUSO_HORAS) * nuvens
+        return {'luminosidade_lux': np.round(lux)}
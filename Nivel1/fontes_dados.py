@@ -0,0 +1,113 @@
+# Nivel1/fontes_dados.py
+
+"""
+Registro de Fontes de Dados - Nível 1
+Carrega os scripts do diretório 'data_source' (ex: 'clima.py') UMA vez e os mantém em
+cache, indexados pelo caminho do arquivo. Um módulo só é recarregado quando o arquivo
+muda (inode, mtime ou tamanho), então editar um script durante a simulação continua
+valendo, mas um pedido comum não recompila nem reimporta nada.
+
+- obter_modulo(nome_arquivo): módulo em cache (carrega ou recarrega se preciso).
+- aquecer(nomes_arquivos): carrega os módulos antecipadamente, para que o primeiro
+  pedido não pague o custo das importações.
+- obter_dados_lote(nome_arquivo, ids, t): leituras de vários sensores da mesma fonte.
+
+Contrato opcional de lote: além de 'get_data()', uma fonte pode definir
+'get_data_batch(sensor_ids, t)', que retorna {campo: vetor com um valor por sensor, na
+ordem de 'sensor_ids'} para o instante 't' (segundos desde a época). Um valor NaN
+significa que o sensor não tem aquela leitura. Fontes sem 'get_data_batch' continuam
+funcionando: 'get_data()' é chamada uma vez por sensor.
+"""
+
+# --- Importação de Bibliotecas ---
+import os
+import sys
+import importlib.util # Biblioteca para importar módulos dinamicamente
+
+CAMINHO_DATA_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data_source')
+
+# Caminho do arquivo -> (assinatura do arquivo, módulo carregado).
+_modulos_em_cache = {}
+
+
+def _assinatura(caminho):
+    st = os.stat(caminho)
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+def _carregar(nome_arquivo_fonte, caminho_modulo):
+    """Importa o módulo a partir do seu caminho de arquivo, como no carregamento original."""
+    nome_modulo = f"data_source_{os.path.splitext(nome_arquivo_fonte)[0]}"
+    # Especificação para carregar o módulo a partir do seu caminho de arquivo
+    spec = importlib.util.spec_from_file_location(nome_modulo, caminho_modulo)
+    # Cria um novo módulo vazio baseado na especificação
+    modulo_fonte = importlib.util.module_from_spec(spec)
+    # Executa o código do módulo, o que define a função get_data()
+    spec.loader.exec_module(modulo_fonte)
+    # Só registra no sistema depois de executar com sucesso.
+    sys.modules[spec.name] = modulo_fonte
+    return modulo_fonte
+
+def obter_modulo(nome_arquivo_fonte):
+    """
+    Retorna o módulo de 'data_source/<nome_arquivo_fonte>', carregando-o apenas na primeira
+    vez ou quando o arquivo mudou. Se a recarga falhar, a versão anterior continua em uso.
+    Levanta exceção apenas se o módulo nunca pôde ser carregado.
+    """
+    caminho_modulo = os.path.join(CAMINHO_DATA_SOURCE, nome_arquivo_fonte)
+    assinatura = _assinatura(caminho_modulo)
+    entrada = _modulos_em_cache.get(caminho_modulo)
+    if entrada is not None and entrada[0] == assinatura:
+        return entrada[1]
+
+    try:
+        modulo_fonte = _carregar(nome_arquivo_fonte, caminho_modulo)
+    except Exception as e:
+        if entrada is None:
+            raise
+        print(f"[Nível 1 - Fontes de Dados] AVISO: Falha ao recarregar '{nome_arquivo_fonte}'. Mantendo a versão anterior. Erro: {e}")
+        # Guarda a nova assinatura para não tentar de novo a cada pedido.
+        _modulos_em_cache[caminho_modulo] = (assinatura, entrada[1])
+        return entrada[1]
+
+    if entrada is not None:
+        print(f"[Nível 1 - Fontes de Dados] '{nome_arquivo_fonte}' mudou no disco. Módulo recarregado.")
+    _modulos_em_cache[caminho_modulo] = (assinatura, modulo_fonte)
+    return modulo_fonte
+
+def aquecer(nomes_arquivos):
+    """Carrega antecipadamente as fontes informadas. Falhas são apenas avisadas."""
+    for nome_arquivo_fonte in sorted({n for n in nomes_arquivos if n}):
+        try:
+            obter_modulo(nome_arquivo_fonte)
+            print(f"[Nível 1 - Fontes de Dados] '{nome_arquivo_fonte}' carregado antecipadamente.")
+        except Exception as e:
+            print(f"[Nível 1 - Fontes de Dados] AVISO: Não foi possível carregar '{nome_arquivo_fonte}'. Erro: {e}")
+
+def obter_dados_lote(nome_arquivo_fonte, ids_sensores, t):
+    """
+    Retorna {ID: dados} para os sensores informados, com uma única chamada a
+    'get_data_batch()' quando a fonte a oferece. Sensores sem leitura recebem None.
+    Sem 'get_data_batch()', cada sensor chama 'get_data()' separadamente: a falha de um
+    não afeta os outros.
+    """
+    modulo_fonte = obter_modulo(nome_arquivo_fonte)
+    if getattr(modulo_fonte, 'get_data_batch', None) is None:
+        resultado = {}
+        for id_sensor in ids_sensores:
+            try:
+                resultado[id_sensor] = modulo_fonte.get_data()
+            except Exception as e:
+                print(f"[Nível 1 - Fontes de Dados] ERRO: '{nome_arquivo_fonte}' falhou para o sensor {id_sensor}. Erro: {e}")
+                resultado[id_sensor] = None
+        return resultado
+
+    colunas = modulo_fonte.get_data_batch(list(ids_sensores), t)
+    resultado = {}
+    for i, id_sensor in enumerate(ids_sensores):
+        dados = {}
+        for campo, valores in colunas.items():
+            valor = float(valores[i])
+            if valor == valor:  # ignora NaN (sem leitura)
+                dados[campo] = valor
+        resultado[id_sensor] = dados or None
+    return resultado
@@ -0,0 +1,137 @@
+# Nivel1/no_sensor.py
+
+"""
+Funções do Nó Sensor (Nível 1)
+Lógica de um sensor separada do laço de recepção, para que um único processo
+('nivel1.py') possa hospedar vários sensores virtuais:
+- ler_minha_configuracao(): instruções do sensor em 'sensores_config.yml'. O arquivo fica
+  em cache, separado por sensor, e só é relido quando muda.
+- NoSensor: estado de UM sensor (ID e contador de pacotes) e a montagem da resposta.
+- FazendaSensores: despacha cada Downlink, pelo byte de destino (8), ao sensor certo.
+  O estado de um sensor só é criado quando ele recebe o primeiro pedido. Um lote de
+  Downlinks é atendido com uma chamada 'get_data_batch()' por fonte de dados, quando
+  a fonte a oferece (módulos em cache no registro 'fontes_dados.py').
+"""
+
+# --- Importação de Bibliotecas ---
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'Comum'))
+import codec_pacote
+from cache_yaml import ConfigYamlEmCache
+
+sys.path.append(os.path.dirname(__file__))
+import fontes_dados
+
+# --- Definições e Configurações Globais ---
+ID_BASE = 0
+TAMANHO_PACOTE = 52
+PASTA_ATUAL = os.path.dirname(__file__)
+CAMINHO_CONFIG_SENSORES = os.path.join(PASTA_ATUAL, 'sensores_config.yml')
+
+# --- Funções Auxiliares ---
+def _secoes_por_sensor(config_completa):
+    """Separa o YAML em uma seção por sensor (ID em texto -> instruções do sensor)."""
+    secoes = (config_completa or {}).get('config_sensores') or {}
+    return {str(id_sensor): secao for id_sensor, secao in secoes.items()}
+
+# O YAML só é relido quando o arquivo muda; cada sensor consulta apenas a sua seção.
+cache_config_sensores = ConfigYamlEmCache(CAMINHO_CONFIG_SENSORES, padrao={}, transformar=_secoes_por_sensor, nome="sensores")
+
+def ler_minha_configuracao(id_do_meu_sensor):
+    """Retorna as instruções específicas para este sensor (em cache, ver Comum/cache_yaml.py)."""
+    config_padrao = {'source_file': None, 'mapeamento_pacote': {}}
+    return cache_config_sensores.obter().get(str(id_do_meu_sensor)) or config_padrao
+
+
+class NoSensor:
+    """Estado de um sensor virtual: sua identidade e o contador de pacotes enviados."""
+
+    def __init__(self, id_sensor):
+        self.id = id_sensor
+        self.contador_pacotes_enviados = 0
+
+    def montar_uplink(self, Pacote_DL, dados, mapeamento):
+        """ETAPA B: monta o pacote de resposta (Uplink) com 'dados' já obtidos da fonte."""
+        rssi_dl_byte = Pacote_DL[0]
+        Pacote_UL = bytearray(TAMANHO_PACOTE)
+
+        # --- Camada 4: APLICAÇÃO ---
+        # Lógica de empacotamento DINÂMICO
+        if dados and mapeamento:
+            print(f"[Nível 1 - Nó Sensor {self.id}] - Aplicação - Empacotando dados conforme mapeamento: {dados}")
+            try:
+                codec_pacote.obter_codec(mapeamento).codificar(dados, Pacote_UL)
+            except ValueError as e:
+                print(f"[Nível 1 - Nó Sensor {self.id}] - Aplicação - ERRO: Mapeamento de pacote inválido. Erro: {e}")
+        elif dados is None:
+            print(f"[Nível 1 - Nó Sensor {self.id}] - Aplicação - ERRO: Não foi possível obter dados da fonte.")
+
+        # --- Camada 3: TRANSPORTE ---
+        # O contador ocupa 2 bytes e volta a zero depois de 65535.
+        self.contador_pacotes_enviados = (self.contador_pacotes_enviados + 1) & 0xFFFF
+        Pacote_UL[14] = (self.contador_pacotes_enviados >> 8) & 0xFF
+        Pacote_UL[15] = self.contador_pacotes_enviados & 0xFF
+        print(f"[Nível 1 - Nó Sensor {self.id}] - Transporte -  Contador de pacotes incrementado para {self.contador_pacotes_enviados}.")
+
+        # --- Camada 2: REDE ---
+        Pacote_UL[8] = ID_BASE
+        Pacote_UL[10] = self.id
+        print(f"[Nível 1 - Nó Sensor {self.id}] - Rede -  Destino=ID {ID_BASE}, Remetente=ID {self.id}.")
+
+        # --- Camada 1: MAC ---
+        print(f"[Nível 1 - Nó Sensor {self.id}] - MAC - Escrevendo RSSI de Downlink no pacote de resposta.")
+        Pacote_UL[0] = rssi_dl_byte
+        return Pacote_UL
+
+
+class FazendaSensores:
+    """Conjunto de sensores virtuais hospedados em um único processo."""
+
+    def __init__(self, ids_hospedados):
+        self.ids_hospedados = frozenset(ids_hospedados)
+        # Estado criado sob demanda: ID -> NoSensor.
+        self.sensores = {}
+
+    def _sensor(self, id_sensor):
+        sensor = self.sensores.get(id_sensor)
+        if sensor is None:
+            sensor = self.sensores[id_sensor] = NoSensor(id_sensor)
+        return sensor
+
+    def despachar_lote(self, pacotes_dl, t):
+        """
+        ETAPA A: lê o destino (byte 8) de cada Downlink e entrega o pedido ao sensor certo.
+        Os sensores que usam a mesma fonte de dados são atendidos com UMA chamada a
+        'get_data_batch()' (se a fonte a oferecer). 't' é o instante da leitura, em segundos desde a época.
+        Retorna a lista de Uplinks de resposta.
+        """
+        pedidos = []
+        for Pacote_DL in pacotes_dl:
+            if Pacote_DL[8] in self.ids_hospedados:
+                pedidos.append((Pacote_DL, ler_minha_configuracao(Pacote_DL[8])))
+            else:
+                print(f"[Nível 1 - Nó Sensor] - Rede - ERRO: Pacote para o ID={Pacote_DL[8]} descartado, ID não hospedado neste processo.")
+
+        # Agrupa os sensores por fonte de dados (sem repetir um sensor pedido duas vezes).
+        ids_por_fonte = {}
+        for Pacote_DL, config_sensor in pedidos:
+            ids = ids_por_fonte.setdefault(config_sensor.get('source_file'), [])
+            if Pacote_DL[8] not in ids:
+                ids.append(Pacote_DL[8])
+
+        dados_por_sensor = {}
+        for arquivo_fonte, ids in ids_por_fonte.items():
+            if not arquivo_fonte:
+                print("[Nível 1 - Nó Sensor] - APLICAÇÃO - ERRO: Nenhum arquivo de fonte de dados especificado.")
+                continue
+            try:
+                print(f"[Nível 1 - Nó Sensor] - Aplicação - Obtendo dados de '{arquivo_fonte}' para {len(ids)} sensor(es)...")
+                dados_por_sensor.update(fontes_dados.obter_dados_lote(arquivo_fonte, ids, t))
+            except Exception as e:
+                print(f"[Nível 1 - Nó Sensor] - APLICAÇÃO - ERRO: Falha ao carregar ou executar '{arquivo_fonte}'. Erro: {e}")
+
+        return [self._sensor(Pacote_DL[8]).montar_uplink(Pacote_DL, dados_por_sensor.get(Pacote_DL[8]),
+                                                         config_sensor.get('mapeamento_pacote', {}))
+                for Pacote_DL, config_sensor in pedidos]
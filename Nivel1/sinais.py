@@ -0,0 +1,57 @@
+# Nivel1/sinais.py
+
+"""
+Sinais Vetorizados para Fontes de Dados Sintéticas - Nível 1
+Funções NumPy usadas pelas fontes de dados que implementam 'get_data_batch()', para
+gerar as leituras de MUITOS sensores de uma só vez.
+
+Ruído determinístico: em vez de um gerador com estado por sensor, o valor aleatório é
+uma função (hash) de (semente, ID do sensor, instante discretizado). Assim, cada sensor
+tem sua própria sequência reprodutível, que não depende de quais outros sensores
+estão no mesmo lote, e o lote inteiro é calculado sem laço por sensor.
+"""
+
+# --- Importação de Bibliotecas ---
+import numpy as np
+
+SEGUNDOS_POR_DIA = 86400
+
+_MASCARA_53_BITS = np.uint64((1 << 53) - 1)
+
+
+def _misturar(x):
+    """Função de mistura 'splitmix64' aplicada elemento a elemento (uint64)."""
+    with np.errstate(over='ignore'):
+        x = (x + np.uint64(0x9E3779B97F4A7C15))
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return x ^ (x >> np.uint64(31))
+
+def uniforme_deterministica(semente, ids_sensores, passos, fluxo=0):
+    """
+    Valores uniformes em [0, 1), um por (sensor, passo). 'fluxo' separa sequências
+    independentes do mesmo sensor (ex.: um fluxo por grandeza medida).
+    """
+    ids = np.asarray(ids_sensores, dtype=np.uint64)
+    passos = np.asarray(passos, dtype=np.int64).astype(np.uint64)
+    with np.errstate(over='ignore'):
+        x = _misturar(np.uint64(semente) ^ (np.uint64(fluxo) << np.uint64(48)))
+        x = _misturar(x ^ ids)
+        x = _misturar(x ^ passos)
+    return (x >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+def normal_deterministica(semente, ids_sensores, passos, fluxo=0):
+    """Valores normais padrão (Box-Muller) a partir de dois fluxos uniformes."""
+    u1 = uniforme_deterministica(semente, ids_sensores, passos, fluxo=2 * fluxo + 1)
+    u2 = uniforme_deterministica(semente, ids_sensores, passos, fluxo=2 * fluxo + 2)
+    return np.sqrt(-2.0 * np.log1p(-u1)) * np.cos(2.0 * np.pi * u2)
+
+def hora_local(t, fuso_horas=0.0):
+    """Hora do dia (0 a 24, fracionária) do instante 't' (segundos desde a época)."""
+    return ((np.asarray(t, dtype=np.float64) + fuso_horas * 3600.0) % SEGUNDOS_POR_DIA) / 3600.0
+
+def curva_diurna(t, nascer_h=6.0, por_h=18.0, fuso_horas=0.0):
+    """Fator entre 0 e 1 que segue o sol: 0 à noite e 1 ao meio-dia solar."""
+    hora = hora_local(t, fuso_horas)
+    fase = (hora - nascer_h) / (por_h - nascer_h)
+    return np.where((fase > 0) & (fase < 1), np.sin(np.pi * np.clip(fase, 0, 1)), 0.0)
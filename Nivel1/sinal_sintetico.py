@@ -0,0 +1,214 @@
+# Nivel1/sinal_sintetico.py
+
+"""
+Motor de Séries Temporais Sintéticas - Nível 1
+Gera, para cada (sensor, grandeza), uma série temporal realista e DETERMINÍSTICA:
+o valor no instante 't' depende apenas da semente, do ID do sensor, da grandeza e de 't',
+nunca da ordem em que os pedidos chegaram. Serve para testes de carga prolongados e
+para validar as análises do Nível 5 com dados cujo comportamento é conhecido.
+
+Componentes do sinal (parâmetros por grandeza):
+- 'nivel': valor médio.
+- 'processo': 'ar1' (x[n] = phi*x[n-1] + ruído, com 'phi' e 'sigma') ou 'passeio'
+  (passeio aleatório, phi = 1, a partir de 'inicio').
+- 'sazonal': lista de {'periodo_s', 'amplitude', 'fase_s'} (ex.: ciclo diário).
+- 'anomalias': {'taxa_por_hora', 'amplitude', 'duracao_s'}: picos injetados.
+- 'falhas': {'taxa_por_hora', 'duracao_s'}: trechos sem leitura (NaN).
+- 'minimo' / 'maximo': limites físicos (opcionais).
+
+Desempenho: a série é calculada em BLOCOS de 'tamanho_bloco' amostras (passo 'passo_s').
+Um bloco é uma matriz (sensores x amostras) calculada de uma vez para todos os sensores
+pedidos, com operações vetoriais NumPy; um pedido em lote ('get_data_batch') só lê uma
+coluna dela. Só os sorteios (uma linha por sensor, de geradores semeados por sensor e
+bloco) são feitos sensor a sensor, uma vez por bloco. A recorrência do AR(1) é resolvida
+por varredura em dobro (log2 do bloco passos vetoriais), sem laço por amostra.
+Um bloco é independente dos que foram pedidos antes:
+- AR(1): o bloco k parte de um estado estacionário sorteado no início do bloco k-1 e
+  percorre o bloco k-1 inteiro antes; a memória do processo (phi^tamanho_bloco) apaga a
+  diferença, e a série é contínua entre blocos na prática.
+- Passeio: o nível no início do bloco k é a soma dos deslocamentos totais dos blocos
+  anteriores (sorteados por hash, vetorialmente); dentro do bloco, o caminho é uma
+  ponte browniana que termina exatamente no deslocamento do bloco.
+"""
+
+# --- Importação de Bibliotecas ---
+import zlib
+from collections import OrderedDict
+
+import numpy as np
+
+import sinais
+
+PARAMETROS_PADRAO = {
+    'nivel': 0.0,
+    'processo': 'ar1',
+    'phi': 0.98,
+    'sigma': 0.1,
+    'inicio': 1735689600,   # 01/01/2025 00:00 UTC, origem do passeio aleatório
+    'sazonal': [],
+    'anomalias': None,
+    'falhas': None,
+    'minimo': None,
+    'maximo': None,
+}
+
+# Os blocos em cache são guardados em float32 (metade da memória com milhares de sensores).
+VALORES_DTYPE = np.float32
+# Elementos por fatia de sensores na geração de um bloco (limita os intermediários).
+AMOSTRAS_POR_FATIA = 1 << 20
+
+
+def varredura_ar1(ruido, phi):
+    """
+    y[n] = phi*y[n-1] + ruido[n] (com y[-1] = 0), por varredura em dobro vetorizada.
+    A recorrência corre no último eixo: 'ruido' pode ter uma linha por sensor.
+    """
+    y = np.array(ruido, dtype=np.float64)
+    deslocamento, potencia = 1, phi
+    while deslocamento < y.shape[-1]:
+        y[..., deslocamento:] += potencia * y[..., :-deslocamento]
+        deslocamento *= 2
+        potencia *= potencia
+    return y
+
+
+class SinalSintetico:
+    """
+    Série de uma grandeza para qualquer conjunto de sensores. Cada bloco é uma matriz
+    (sensores x amostras); os blocos recentes ficam em cache (LRU), por conjunto de IDs.
+    """
+
+    def __init__(self, parametros, semente=0, campo='', passo_s=1.0, tamanho_bloco=3600, blocos_em_cache=2):
+        self.p = dict(PARAMETROS_PADRAO)
+        self.p.update(parametros or {})
+        if self.p['processo'] not in ('ar1', 'passeio'):
+            raise ValueError(f"Processo '{self.p['processo']}' desconhecido. Use 'ar1' ou 'passeio'.")
+        self.semente = int(semente)
+        self.fluxo = zlib.crc32(campo.encode('utf-8'))
+        self.passo_s = float(passo_s)
+        self.tamanho_bloco = int(tamanho_bloco)
+        self.blocos_em_cache = blocos_em_cache
+        self._blocos = OrderedDict()
+
+    def _gerador(self, id_sensor, bloco, etapa):
+        return np.random.default_rng([self.semente, int(id_sensor), self.fluxo, bloco, etapa])
+
+    def _ruido(self, ids, bloco):
+        """Ruído do bloco: matriz (sensores x amostras), uma linha por gerador de sensor."""
+        ruido = np.empty((len(ids), self.tamanho_bloco))
+        for linha, id_sensor in zip(ruido, ids):
+            linha[:] = self._gerador(id_sensor, bloco, 0).normal(0.0, self.p['sigma'], self.tamanho_bloco)
+        return ruido
+
+    def _processo(self, ids, bloco):
+        p, b = self.p, self.tamanho_bloco
+        if p['processo'] == 'ar1':
+            phi = float(p['phi'])
+            # Estado estacionário sorteado no início do bloco anterior ("aquecimento").
+            desvio = p['sigma'] / np.sqrt(max(1.0 - phi * phi, 1e-12))
+            inicial = np.array([self._gerador(i, bloco - 1, 1).normal(0.0, desvio) for i in ids])
+            caminho = varredura_ar1(np.concatenate((self._ruido(ids, bloco - 1), self._ruido(ids, bloco)), axis=1), phi)
+            caminho += inicial[:, None] * phi ** np.arange(1, 2 * b + 1)
+            return caminho[:, b:]
+
+        # Passeio aleatório: deslocamento total de cada bloco ~ N(0, sigma^2 * b), por hash.
+        primeiro = int(p['inicio'] // self.passo_s) // b
+        anteriores = np.arange(primeiro, bloco)
+        totais = sinais.normal_deterministica(self.semente, ids[:, None], anteriores[None, :], fluxo=self.fluxo)
+        escala = p['sigma'] * np.sqrt(b)
+        partida = escala * totais.sum(axis=1)
+        total = escala * sinais.normal_deterministica(self.semente, ids, np.full(len(ids), bloco), fluxo=self.fluxo)
+        passeio = np.cumsum(self._ruido(ids, bloco), axis=1)
+        fracao = np.arange(1, b + 1) / b
+        return partida[:, None] + passeio - fracao * passeio[:, -1:] + fracao * total[:, None]
+
+    def _eventos(self, ids, bloco, etapa, config, com_sinal=False):
+        """
+        Sorteia os eventos Poisson de um bloco. Retorna a matriz (sensores x amostras) com
+        o número de eventos que começam em cada amostra (com 'com_sinal', a soma dos sinais
+        ±1 sorteados para eles) e a duração dos eventos, em amostras.
+        """
+        media = config.get('taxa_por_hora', 0) * self.tamanho_bloco * self.passo_s / 3600.0
+        marcas = np.zeros((len(ids), self.tamanho_bloco))
+        for linha, id_sensor in zip(marcas, ids):
+            rng = self._gerador(id_sensor, bloco, etapa)
+            inicios = rng.integers(0, self.tamanho_bloco, rng.poisson(media))
+            pesos = rng.choice([-1.0, 1.0], len(inicios)) if com_sinal else 1.0
+            np.add.at(linha, inicios, pesos)
+        duracao = max(1, int(config.get('duracao_s', self.passo_s) / self.passo_s))
+        return marcas, duracao
+
+    @staticmethod
+    def _janela(marcas, duracao):
+        """Soma, em cada amostra, das marcas das 'duracao' amostras até ela (eventos ativos)."""
+        acumulado = np.cumsum(marcas, axis=1)
+        acumulado[:, duracao:] -= acumulado[:, :-duracao].copy()
+        return acumulado
+
+    def _gerar_bloco(self, ids, bloco):
+        p, b = self.p, self.tamanho_bloco
+        t = (bloco * b + np.arange(b)) * self.passo_s
+        valores = p['nivel'] + self._processo(ids, bloco)
+        for componente in p['sazonal'] or []:
+            valores += componente['amplitude'] * np.sin(2 * np.pi * (t + componente.get('fase_s', 0)) / componente['periodo_s'])
+
+        if p['anomalias']:
+            marcas, duracao = self._eventos(ids, bloco, 2, p['anomalias'], com_sinal=True)
+            valores += p['anomalias']['amplitude'] * self._janela(marcas, duracao)
+        if p['minimo'] is not None or p['maximo'] is not None:
+            valores = np.clip(valores, p['minimo'], p['maximo'])
+        if p['falhas']:
+            marcas, duracao = self._eventos(ids, bloco, 3, p['falhas'])
+            valores[self._janela(marcas, duracao) > 0] = np.nan
+        return valores
+
+    def bloco(self, ids, bloco):
+        """Matriz (sensores x amostras) do bloco, para os sensores 'ids' (vetor de inteiros)."""
+        chave = (bloco, ids.tobytes())
+        valores = self._blocos.get(chave)
+        if valores is not None:
+            self._blocos.move_to_end(chave)
+            return valores
+        # Em fatias de sensores, para limitar a memória dos intermediários (2 blocos por sensor no AR(1)).
+        valores = np.empty((len(ids), self.tamanho_bloco), dtype=VALORES_DTYPE)
+        fatia = max(1, AMOSTRAS_POR_FATIA // (2 * self.tamanho_bloco))
+        for inicio in range(0, len(ids), fatia):
+            valores[inicio:inicio + fatia] = self._gerar_bloco(ids[inicio:inicio + fatia], bloco)
+        self._blocos[chave] = valores
+        if len(self._blocos) > self.blocos_em_cache:
+            self._blocos.popitem(last=False)
+        return valores
+
+    def valores(self, ids_sensores, t):
+        """Valor de cada sensor no instante 't' (segundos desde a época), ou NaN durante uma falha."""
+        ids = np.asarray(ids_sensores, dtype=np.int64)
+        amostra = int(t // self.passo_s)
+        return self.bloco(ids, amostra // self.tamanho_bloco)[:, amostra % self.tamanho_bloco].astype(np.float64)
+
+    def serie(self, id_sensor, t_inicio, quantidade):
+        """'quantidade' amostras consecutivas de um sensor a partir de 't_inicio' (para testes de carga e análises)."""
+        ids = np.array([id_sensor], dtype=np.int64)
+        amostra = int(t_inicio // self.passo_s)
+        partes = []
+        while quantidade > 0:
+            bloco, deslocamento = divmod(amostra, self.tamanho_bloco)
+            n = min(quantidade, self.tamanho_bloco - deslocamento)
+            partes.append(self.bloco(ids, bloco)[0, deslocamento:deslocamento + n].astype(np.float64))
+            amostra += n
+            quantidade -= n
+        return np.concatenate(partes) if partes else np.zeros(0)
+
+
+class MotorSintetico:
+    """
+    Séries de vários sensores e grandezas.
+    'parametros_por_campo': {campo: parâmetros do SinalSintetico}.
+    """
+
+    def __init__(self, parametros_por_campo, semente=0, passo_s=1.0, tamanho_bloco=3600):
+        self.sinais = {campo: SinalSintetico(parametros, semente, campo, passo_s, tamanho_bloco)
+                       for campo, parametros in parametros_por_campo.items()}
+
+    def amostras(self, ids_sensores, t):
+        """Retorna {campo: vetor com o valor de cada sensor no instante 't'} (contrato 'get_data_batch')."""
+        return {campo: sinal.valores(ids_sensores, t) for campo, sinal in self.sinais.items()}
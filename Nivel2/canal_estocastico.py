@@ -0,0 +1,155 @@
+# Nivel2/canal_estocastico.py
+
+"""
+Motor Estocástico de Canal - Nível 2
+Substitui o RSSI fixo por link (canal_config.yml) por um canal com imperfeições:
+1. Sombreamento log-normal: desvio gaussiano (em dB) em torno do RSSI médio do link.
+2. Desvanecimento rápido Rayleigh ou Rician: ganho |h|² aplicado a cada pacote.
+3. Perda de pacotes: a SNR de cada pacote define a taxa de erro de bit (FSK não coerente)
+   e, a partir dela, a probabilidade de o pacote inteiro chegar corrompido.
+4. Atraso e jitter: cada link tem uma fila de atraso; um pacote nunca ultrapassa o
+   anterior do mesmo link.
+
+Reprodutibilidade: cada (link, direção) tem seu próprio gerador NumPy, derivado da
+semente global. A sequência de um link não depende do tráfego dos outros links.
+Cada pacote consome sempre a mesma quantidade de números (SORTEIOS_POR_PACOTE
+uniformes), na ordem de chegada: o n-ésimo pacote de um link recebe os mesmos valores
+qualquer que seja o tamanho dos lotes em que o tráfego foi dividido.
+
+Desempenho: os pacotes de um lote são agrupados por link e os sorteios de um grupo são
+feitos de uma vez, numa matriz (pacotes x SORTEIOS_POR_PACOTE) preenchida linha a linha.
+"""
+
+# --- Importação de Bibliotecas ---
+import heapq
+import itertools
+import numpy as np
+
+DIRECAO_DOWNLINK = 0
+DIRECAO_UPLINK = 1
+
+# Valores usados quando 'canal_estocastico.yml' não define o parâmetro.
+PARAMETROS_PADRAO = {
+    'sombreamento_sigma_db': 4.0,
+    'desvanecimento': 'rayleigh',   # 'nenhum', 'rayleigh' ou 'rician'
+    'fator_k_rician': 6.0,
+    'ruido_dbm': -120.0,
+    'bits_por_pacote': 52 * 8,
+    'atraso_medio_s': 0.05,
+    'jitter_s': 0.02,
+}
+
+# Uniformes por pacote: dois pares de Box-Muller (sombreamento e as duas componentes do
+# desvanecimento), a perda e o jitter.
+SORTEIOS_POR_PACOTE = 6
+
+
+class CanalEstocastico:
+    """
+    Mantém o estado do canal entre lotes: os geradores aleatórios de cada link,
+    o instante da última entrega de cada link e a fila de pacotes em atraso.
+    """
+
+    def __init__(self, semente=0, parametros=None):
+        self.semente = semente
+        self.parametros = parametros or {}
+        self._geradores = {}
+        self._ultima_entrega = {}
+        self._fila_atrasos = []
+        self._desempate = itertools.count()
+
+    def _gerador(self, id_link, direcao):
+        chave = (id_link, direcao)
+        if chave not in self._geradores:
+            self._geradores[chave] = np.random.default_rng([self.semente, id_link, direcao])
+        return self._geradores[chave]
+
+    def _parametros_link(self, id_link):
+        """Combina os valores padrão, os globais do YAML e as sobrescritas do link."""
+        p = dict(PARAMETROS_PADRAO)
+        p.update({k: v for k, v in self.parametros.items() if k in PARAMETROS_PADRAO})
+        p.update((self.parametros.get('links') or {}).get(str(id_link)) or {})
+        return p
+
+    @staticmethod
+    def _normais(u1, u2):
+        """Par de normais padrão independentes a partir de duas uniformes (Box-Muller)."""
+        raio = np.sqrt(-2 * np.log1p(-u1))
+        return raio * np.cos(2 * np.pi * u2), raio * np.sin(2 * np.pi * u2)
+
+    def _ganho_desvanecimento_db(self, p, z_real, z_imag):
+        tipo = p['desvanecimento']
+        if tipo == 'nenhum':
+            return np.zeros(len(z_real))
+        if tipo == 'rayleigh':
+            # |h|² de um canal Rayleigh com potência média unitária (h gaussiano complexo).
+            ganho = (z_real ** 2 + z_imag ** 2) / 2
+        elif tipo == 'rician':
+            k = float(p['fator_k_rician'])
+            visada = np.sqrt(k / (k + 1))
+            espalhado = np.sqrt(1 / (2 * (k + 1)))
+            h = (visada + espalhado * z_real) + 1j * espalhado * z_imag
+            ganho = np.abs(h) ** 2
+        else:
+            raise ValueError(f"Desvanecimento '{tipo}' desconhecido. Use 'nenhum', 'rayleigh' ou 'rician'.")
+        return 10 * np.log10(np.maximum(ganho, 1e-12))
+
+    def processar_lote(self, direcao, ids_links, rssi_medio_dbm, agora):
+        """
+        Aplica o canal a um lote de pacotes.
+        Retorna três vetores do tamanho do lote: RSSI sorteado (dBm), se o pacote foi
+        entregue (bool) e o instante de entrega (mesma base de tempo de 'agora').
+        """
+        ids_links = np.asarray(ids_links, dtype=np.int64)
+        rssi_medio_dbm = np.asarray(rssi_medio_dbm, dtype=np.float64)
+        n = len(ids_links)
+        rssi = np.empty(n)
+        entregue = np.empty(n, dtype=bool)
+        instantes = np.empty(n)
+
+        for id_link in np.unique(ids_links):
+            idx = np.flatnonzero(ids_links == id_link)
+            k = len(idx)
+            id_link = int(id_link)
+            p = self._parametros_link(id_link)
+            # Uma linha por pacote, na ordem de chegada.
+            u = self._gerador(id_link, direcao).random((k, SORTEIOS_POR_PACOTE))
+            z_sombreamento, z_real = self._normais(u[:, 0], u[:, 1])
+            z_imag, _ = self._normais(u[:, 2], u[:, 3])
+
+            # 1 e 2. Sombreamento + desvanecimento em torno do RSSI médio do link.
+            sombreamento = p['sombreamento_sigma_db'] * z_sombreamento
+            rssi_grupo = rssi_medio_dbm[idx] + sombreamento + self._ganho_desvanecimento_db(p, z_real, z_imag)
+
+            # 3. SNR -> BER (FSK não coerente) -> probabilidade de erro de pacote.
+            snr_linear = 10 ** ((rssi_grupo - p['ruido_dbm']) / 10)
+            ber = 0.5 * np.exp(-snr_linear / 2)
+            per = 1 - (1 - ber) ** p['bits_por_pacote']
+            entregue[idx] = u[:, 4] >= per
+
+            # 4. Atraso + jitter, respeitando a ordem de chegada dentro do link.
+            atraso = p['atraso_medio_s'] - p['jitter_s'] * np.log1p(-u[:, 5])
+            chave = (id_link, direcao)
+            inicio = self._ultima_entrega.get(chave, -np.inf)
+            entrega = np.maximum.accumulate(np.concatenate(([inicio], agora + atraso)))[1:]
+            self._ultima_entrega[chave] = entrega[-1]
+
+            rssi[idx] = rssi_grupo
+            instantes[idx] = entrega
+
+        # O RSSI é transportado em um único byte com sinal.
+        return np.clip(rssi, -128, 127), entregue, instantes
+
+    # --- Fila de Atrasos ---
+    def agendar(self, instante, item):
+        heapq.heappush(self._fila_atrasos, (instante, next(self._desempate), item))
+
+    def liberar(self, agora):
+        """Retorna, em ordem, os itens cujo instante de entrega já chegou."""
+        prontos = []
+        while self._fila_atrasos and self._fila_atrasos[0][0] <= agora:
+            prontos.append(heapq.heappop(self._fila_atrasos)[2])
+        return prontos
+
+    def proximo_instante(self):
+        return self._fila_atrasos[0][0] if self._fila_atrasos else None
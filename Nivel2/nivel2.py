@@ -5,51 +5,157 @@ Simulador Nível 2 - Conectividade
 Este script simula o Nível 2 do Framework TpM - Conectividade.
 
 O fluxo de trabalho foi MODIFICADO para integrar com o Simulador Gráfico:
-1. Fica monitorando a chegada de pacotes da Base (Downlink) ou do Sensor (Uplink).
-2. A cada ciclo, ele lê um arquivo de configuração ('canal_config.yml') para obter uma
+1. Fica monitorando a chegada de pacotes da Base (Downlink) ou do Sensor (Uplink)
+   pela camada de transporte compartilhada (Comum/transporte.py). Com o transporte
+   'fila', os pacotes pendentes de cada direção são drenados em lotes a cada ciclo.
+2. A cada ciclo, ele consulta a configuração ('canal_config.yml') para obter uma
    tabela com os valores de RSSI para CADA SENSOR, calculados pelo Simulador Gráfico.
+   A tabela fica em cache e o YAML só é relido quando o arquivo muda.
 3. Ao receber um pacote, ele lê seu conteúdo para DESCOBRIR o ID do sensor de origem/destino.
 4. Com o ID, ele CONSULTA na tabela o valor de RSSI correto para aquele link específico.
 5. "Injeta" esse valor de RSSI nos bytes apropriados do cabeçalho do pacote.
-6. Escreve o pacote modificado em um novo arquivo, para que o destinatário final o leia.
+6. Repassa o pacote modificado pelo transporte, para que o destinatário final o leia.
+
+Com '--canal estocastico', o RSSI da tabela passa a ser a MÉDIA do link e cada pacote
+sofre sombreamento, desvanecimento, perda e atraso sorteados pelo motor em
+'canal_estocastico.py' (parâmetros em 'canal_estocastico.yml').
+
+Com '--captura ARQUIVO', cada pacote entregue (já com o RSSI injetado) é gravado em um
+arquivo binário (Comum/captura.py), que pode ser reproduzido com 'replay_captura.py'.
 """
 
 # --- Importação de Bibliotecas ---
 import os
-import time
-from datetime import datetime
-import yaml
+import sys
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'Comum'))
+import transporte
+import captura
+import relogio
+from cache_yaml import ConfigYamlEmCache
 
 print("--- [NÍVEL 2 - Conectividade] Iniciando Script.")
 
-# --- 1. Mapeamento dos Arquivos de Comunicação ---
+parser = argparse.ArgumentParser(description="Simulador do Canal de Conectividade.")
+parser.add_argument("--transporte", choices=list(transporte.BACKENDS), default=transporte.TRANSPORTE_PADRAO,
+                    help="Backend da camada de transporte compartilhada com os Níveis 1 e 3.")
+parser.add_argument("--lote", type=int, default=64,
+                    help="Número máximo de pacotes drenados por direção a cada ciclo.")
+parser.add_argument("--canal", choices=['estatico', 'estocastico'], default='estatico',
+                    help="'estatico': RSSI fixo do canal_config.yml. 'estocastico': desvanecimento, perda e atraso.")
+parser.add_argument("--captura", metavar="ARQUIVO",
+                    help="Grava os pacotes entregues (Downlink e Uplink) neste arquivo de captura binário.")
+args = parser.parse_args()
+
+RELOGIO = relogio.obter_relogio()
+relogio.exigir_relogio_de_processo("NÍVEL 2 - Conectividade")
+
+# --- 1. Mapeamento dos Canais de Comunicação ---
 PASTA_ATUAL = os.path.dirname(__file__)
-CAMINHO_PACOTE_DL_ENTRADA = os.path.join(PASTA_ATUAL, 'pacote_downlink_entrada')
-CAMINHO_PACOTE_DL_SAIDA = os.path.join(PASTA_ATUAL, 'pacote_downlink_saida')
-CAMINHO_PACOTE_UL_ENTRADA = os.path.join(PASTA_ATUAL, 'pacote_uplink_entrada')
-CAMINHO_PACOTE_UL_SAIDA = os.path.join(PASTA_ATUAL, 'pacote_uplink_saida')
+CANAL_DL_ENTRADA = transporte.DOWNLINK_ENTRADA
+CANAL_DL_SAIDA = transporte.DOWNLINK_SAIDA
+CANAL_UL_ENTRADA = transporte.UPLINK_ENTRADA
+CANAL_UL_SAIDA = transporte.UPLINK_SAIDA
 
 # Caminho para o arquivo de configuração que será escrito pelo Simulador Gráfico.
 CAMINHO_CONFIG_CANAL = os.path.join(PASTA_ATUAL, 'canal_config.yml')
+CAMINHO_CONFIG_ESTOCASTICO = os.path.join(PASTA_ATUAL, 'canal_estocastico.yml')
 
 # --- Função Auxiliar para Ler a Configuração ---
+cache_config_canal = ConfigYamlEmCache(CAMINHO_CONFIG_CANAL, padrao={'links': {}}, nome="canal")
+
 def ler_config_canal():
     """
-    Esta função lê o arquivo de configuração do canal (canal_config.yml).
+    Esta função retorna a configuração do canal (canal_config.yml).
+    - O conteúdo fica em cache e só é relido quando o arquivo muda (inode/mtime/tamanho).
     - Ela é "segura": se o arquivo não existir ou der um erro na leitura,
-      ela retorna uma estrutura vazia para o simulador não travar.
+      ela retorna a última versão válida (ou uma estrutura vazia) para o simulador não travar.
     """
-    try:
-        if os.path.exists(CAMINHO_CONFIG_CANAL):
-            with open(CAMINHO_CONFIG_CANAL, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-                return config
-    except Exception as e:
-        print(f"AVISO: Não foi possível ler o arquivo de configuração do canal. Usando valores padrão. Erro: {e}")
-    return {'links': {}}
-
-print(f"[NÍVEL 2 - Conectividade] Monitorando arquivos de entrada em: {PASTA_ATUAL}")
+    config = cache_config_canal.obter()
+    return config if isinstance(config, dict) else {'links': {}}
+
+# --- Entrega (e captura opcional) de um pacote ---
+gravador_captura = None
+
+def entregar(canal_saida, pacote):
+    """Envia o pacote ao destinatário final e, no modo captura, grava-o no arquivo."""
+    canal.enviar(canal_saida, pacote)
+    if gravador_captura is not None:
+        if canal_saida == CANAL_DL_SAIDA:
+            gravador_captura.registrar(captura.DIRECAO_DOWNLINK, pacote[8], pacote)
+        else:
+            gravador_captura.registrar(captura.DIRECAO_UPLINK, pacote[10], pacote)
+
+# --- Funções de Repasse (uma chamada por pacote do lote) ---
+def repassar_downlink(Pacote_DL_Bytes, tabela_de_links):
+    """Injeta o RSSI de Downlink do link de destino e entrega o pacote ao Nível 1."""
+    Pacote_DL = bytearray(Pacote_DL_Bytes)
+
+    # --- LÓGICA INTELIGENTE: Descobrir para quem é o pacote ---
+    id_sensor_destino = str(Pacote_DL[8])
+    
+    link_especifico = tabela_de_links.get(id_sensor_destino, {})
+    rssi_downlink_dbm = link_especifico.get('rssi_downlink_dbm', -120.0)
+    
+    rssi_int = int(rssi_downlink_dbm)
+    print(f"[NÍVEL 2 - Conectividade] Pacote para Sensor ID {id_sensor_destino}. Injetando RSSI de Downlink: {rssi_downlink_dbm:.1f} dBm.")
+
+    Pacote_DL[0] = rssi_int & 0xFF
+
+    entregar(CANAL_DL_SAIDA, Pacote_DL)
+
+def repassar_uplink(Pacote_UL_Bytes, tabela_de_links):
+    """Injeta o RSSI de Uplink do link de origem e entrega o pacote ao Nível 3."""
+    Pacote_UL = bytearray(Pacote_UL_Bytes)
+
+    # --- LÓGICA INTELIGENTE: Descobrir de quem veio o pacote ---
+    id_sensor_origem = str(Pacote_UL[10])
+    
+    link_especifico = tabela_de_links.get(id_sensor_origem, {})
+    rssi_uplink_dbm = link_especifico.get('rssi_uplink_dbm', -120.0)
+
+    rssi_int = int(rssi_uplink_dbm)
+    print(f"[NÍVEL 2 - Conectividade] Pacote do Sensor ID {id_sensor_origem}. Injetando RSSI de Uplink: {rssi_uplink_dbm:.1f} dBm.")
+    
+    Pacote_UL[2] = rssi_int & 0xFF
+
+    entregar(CANAL_UL_SAIDA, Pacote_UL)
+
+# --- Modo Estocástico (opcional, requer NumPy) ---
+def repassar_lote_estocastico(lote, direcao, tabela_de_links):
+    """Sorteia RSSI, perda e atraso para o lote inteiro e agenda os pacotes entregues."""
+    if direcao == canal_estocastico.DIRECAO_DOWNLINK:
+        byte_id, byte_rssi, chave_rssi, canal_saida = 8, 0, 'rssi_downlink_dbm', CANAL_DL_SAIDA
+    else:
+        byte_id, byte_rssi, chave_rssi, canal_saida = 10, 2, 'rssi_uplink_dbm', CANAL_UL_SAIDA
+
+    ids_links = [p[byte_id] for p in lote]
+    rssi_medio = [tabela_de_links.get(str(i), {}).get(chave_rssi, -120.0) for i in ids_links]
+    motor_canal.parametros = cache_config_estocastico.obter() or {}
+    rssi, entregue, instantes = motor_canal.processar_lote(direcao, ids_links, rssi_medio, RELOGIO.monotonico())
+
+    perdidos = 0
+    for pacote, rssi_dbm, ok, instante in zip(lote, rssi, entregue, instantes):
+        if not ok:
+            perdidos += 1
+            continue
+        pacote = bytearray(pacote)
+        pacote[byte_rssi] = int(rssi_dbm) & 0xFF
+        motor_canal.agendar(instante, (canal_saida, pacote))
+    print(f"[NÍVEL 2 - Conectividade] Canal estocástico: {len(lote) - perdidos} pacote(s) agendado(s), {perdidos} perdido(s).")
+
+if args.canal == 'estocastico':
+    import canal_estocastico
+    cache_config_estocastico = ConfigYamlEmCache(CAMINHO_CONFIG_ESTOCASTICO, padrao={}, nome="canal estocástico")
+    motor_canal = canal_estocastico.CanalEstocastico(semente=(cache_config_estocastico.obter() or {}).get('semente', 0))
+
+canal = transporte.criar_transporte(args.transporte, canais_escuta=[CANAL_DL_ENTRADA, CANAL_UL_ENTRADA])
+print(f"[NÍVEL 2 - Conectividade] Monitorando canais de entrada (transporte: {args.transporte}) em: {PASTA_ATUAL}")
 print(f"[NÍVEL 2 - Conectividade] Lendo configurações do canal de: {CAMINHO_CONFIG_CANAL}")
+if args.captura:
+    gravador_captura = captura.GravadorCaptura(args.captura)
+    print(f"[NÍVEL 2 - Conectividade] Gravando captura de pacotes em: {args.captura}")
 
 try:
     while True:
@@ -58,61 +164,46 @@ try:
         tabela_de_links = config_canal_atual.get('links', {})
 
         # --- FLUXO 1: DOWNLINK (Base -> Sensor) ---
-        if os.path.exists(CAMINHO_PACOTE_DL_ENTRADA):
-            print(f"\n[{datetime.now().strftime('%H:%M:%S')}] [NÍVEL 2 - Conectividade] Pacote DOWNLINK (da Base) detectado.")
-            
-            f_in = open(CAMINHO_PACOTE_DL_ENTRADA, 'rb')
-            Pacote_DL_Bytes = f_in.read()
-            f_in.close()
-            
-            Pacote_DL = bytearray(Pacote_DL_Bytes)
-
-            # --- LÓGICA INTELIGENTE: Descobrir para quem é o pacote ---
-            id_sensor_destino = str(Pacote_DL[8])
-            
-            link_especifico = tabela_de_links.get(id_sensor_destino, {})
-            rssi_downlink_dbm = link_especifico.get('rssi_downlink_dbm', -120.0)
-            
-            rssi_int = int(rssi_downlink_dbm)
-            print(f"[NÍVEL 2 - Conectividade] Pacote para Sensor ID {id_sensor_destino}. Injetando RSSI de Downlink: {rssi_downlink_dbm:.1f} dBm.")
-
-            Pacote_DL[0] = rssi_int & 0xFF
-
-            f_out = open(CAMINHO_PACOTE_DL_SAIDA, 'wb')
-            f_out.write(Pacote_DL)
-            f_out.close()
-            
-            os.remove(CAMINHO_PACOTE_DL_ENTRADA)
-            print("[NÍVEL 2 - Conectividade] Pacote de Downlink repassado para o Nível 1 (Nó Sensor).")
+        lote_dl = canal.receber_lote(CANAL_DL_ENTRADA, args.lote)
+        if lote_dl:
+            print(f"\n[{RELOGIO.formatar('%H:%M:%S')}] [NÍVEL 2 - Conectividade] {len(lote_dl)} pacote(s) DOWNLINK (da Base) detectado(s).")
+            if args.canal == 'estocastico':
+                repassar_lote_estocastico(lote_dl, canal_estocastico.DIRECAO_DOWNLINK, tabela_de_links)
+            else:
+                for Pacote_DL_Bytes in lote_dl:
+                    repassar_downlink(Pacote_DL_Bytes, tabela_de_links)
+            print("[NÍVEL 2 - Conectividade] Pacotes de Downlink repassados para o Nível 1 (Nó Sensor).")
 
         # --- FLUXO 2: UPLINK (Nó Sensor -> Borda) ---
-        if os.path.exists(CAMINHO_PACOTE_UL_ENTRADA):
-            print(f"\n[{datetime.now().strftime('%H:%M:%S')}] [NÍVEL 2 - Conectividade] Pacote Uplink (do Nó Sensor) detectado.")
-            
-            f_in = open(CAMINHO_PACOTE_UL_ENTRADA, 'rb')
-            Pacote_UL_Bytes = f_in.read()
-            f_in.close()
-            
-            Pacote_UL = bytearray(Pacote_UL_Bytes)
-
-            # --- LÓGICA INTELIGENTE: Descobrir de quem veio o pacote ---
-            id_sensor_origem = str(Pacote_UL[10])
-            
-            link_especifico = tabela_de_links.get(id_sensor_origem, {})
-            rssi_uplink_dbm = link_especifico.get('rssi_uplink_dbm', -120.0)
-
-            rssi_int = int(rssi_uplink_dbm)
-            print(f"[NÍVEL 2 - Conectividade] Pacote do Sensor ID {id_sensor_origem}. Injetando RSSI de Uplink: {rssi_uplink_dbm:.1f} dBm.")
-            
-            Pacote_UL[2] = rssi_int & 0xFF
-
-            f_out = open(CAMINHO_PACOTE_UL_SAIDA, 'wb')
-            f_out.write(Pacote_UL)
-            f_out.close()
-            
-            os.remove(CAMINHO_PACOTE_UL_ENTRADA)
-            print("[NÍVEL 2 - Conectividade] Pacote de Uplink repassado para o Nível 3 (Base).")
-
-        time.sleep(0.5)
+        lote_ul = canal.receber_lote(CANAL_UL_ENTRADA, args.lote)
+        if lote_ul:
+            print(f"\n[{RELOGIO.formatar('%H:%M:%S')}] [NÍVEL 2 - Conectividade] {len(lote_ul)} pacote(s) Uplink (do Nó Sensor) detectado(s).")
+            if args.canal == 'estocastico':
+                repassar_lote_estocastico(lote_ul, canal_estocastico.DIRECAO_UPLINK, tabela_de_links)
+            else:
+                for Pacote_UL_Bytes in lote_ul:
+                    repassar_uplink(Pacote_UL_Bytes, tabela_de_links)
+            print("[NÍVEL 2 - Conectividade] Pacotes de Uplink repassados para o Nível 3 (Base).")
+
+        # --- Entrega dos pacotes cujo atraso de canal já passou ---
+        espera_s = 0.5
+        if args.canal == 'estocastico':
+            for canal_saida, pacote in motor_canal.liberar(RELOGIO.monotonico()):
+                entregar(canal_saida, pacote)
+            proximo = motor_canal.proximo_instante()
+            if proximo is not None:
+                espera_s = min(espera_s, max(0.0, proximo - RELOGIO.monotonico()))
+
+        # Se algum lote veio cheio, ainda há pacotes esperando: volta sem aguardar.
+        if len(lote_dl) < args.lote and len(lote_ul) < args.lote:
+            if gravador_captura is not None:
+                gravador_captura.descarregar()
+            # Aguarda o próximo pacote em qualquer direção (acorda assim que um chegar).
+            RELOGIO.aguardar(canal, [CANAL_DL_ENTRADA, CANAL_UL_ENTRADA], espera_s)
 except KeyboardInterrupt:
     print("\n[NÍVEL 2 - Conectividade] Simulador encerrado pelo usuário.")
+finally:
+    canal.fechar()
+    if gravador_captura is not None:
+        gravador_captura.fechar()
+        print(f"[NÍVEL 2 - Conectividade] Captura encerrada: {gravador_captura.registros} pacote(s) gravado(s).")
@@ -0,0 +1,109 @@
+# Nivel2/replay_captura.py
+
+"""
+Replay de Captura - Nível 2
+Reproduz um arquivo gravado com 'nivel2.py --captura' no lugar do Canal, alimentando a
+Base (Nível 3) com os mesmos Uplinks, na mesma ordem e com os mesmos intervalos.
+
+- '--velocidade 1' reproduz em tempo real, '--velocidade 10' dez vezes mais rápido e
+  '--velocidade 0' o mais rápido possível (sem esperas).
+- Modo padrão: os Uplinks são entregues pela camada de transporte ao Nível 3 em execução
+  ('nivel3.py' ou 'nivel3_async.py'). Os pedidos de Downlink que a Base enviar são
+  descartados, pois as respostas já estão na captura.
+- '--bancada': não usa transporte; decodifica e grava os logs dentro deste processo com as
+  mesmas funções da Base (Nivel3/borda.py) e mede a vazão, de forma determinística.
+
+Uso: python replay_captura.py captura.bin --transporte fila --velocidade 0
+     python replay_captura.py captura.bin --bancada --diretorio-logs /tmp/logs_bancada
+"""
+
+# --- Importação de Bibliotecas ---
+import os
+import sys
+import time
+import argparse
+import contextlib
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'Comum'))
+import transporte
+import captura
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'Nivel3'))
+
+
+def uplinks_da_captura(caminho):
+    """Retorna a lista de (instante_ns, pacote) dos Uplinks da captura."""
+    return [(instante_ns, pacote) for instante_ns, direcao, _id_link, pacote in captura.ler_registros(caminho)
+            if direcao == captura.DIRECAO_UPLINK]
+
+def reproduzir(uplinks, velocidade, entregar):
+    """Chama 'entregar(pacote)' para cada Uplink, respeitando os intervalos originais / velocidade."""
+    if not uplinks:
+        return
+    primeiro_ns = uplinks[0][0]
+    inicio = time.monotonic()
+    for instante_ns, pacote in uplinks:
+        if velocidade > 0:
+            espera_s = inicio + (instante_ns - primeiro_ns) / 1e9 / velocidade - time.monotonic()
+            if espera_s > 0:
+                time.sleep(espera_s)
+        entregar(pacote)
+
+def executar_bancada(uplinks, velocidade, diretorio_logs=None):
+    """Decodifica e grava os Uplinks com as funções da Base e imprime a vazão obtida."""
+    import borda
+    config = borda.carregar_configuracao_central()
+    if diretorio_logs:
+        config['nivel4']['diretorio_logs'] = os.path.abspath(diretorio_logs)
+
+    def processar(pacote):
+        borda.salvar_logs(borda.processar_uplink(pacote, config), config)
+
+    inicio = time.perf_counter()
+    # As mensagens por pacote da Base custariam mais que a própria decodificação.
+    with open(os.devnull, 'w') as nulo, contextlib.redirect_stdout(nulo):
+        reproduzir(uplinks, velocidade, processar)
+        borda.fechar_logs()
+    duracao_s = time.perf_counter() - inicio
+    print(f"[Replay] Bancada: {len(uplinks)} Uplink(s) decodificado(s) e gravado(s) em {duracao_s:.3f} s "
+          f"({len(uplinks) / max(duracao_s, 1e-9):.0f} pacotes/s).")
+
+def executar_transporte(uplinks, velocidade, nome_transporte):
+    """Entrega os Uplinks ao Nível 3 em execução e descarta os Downlinks que ele enviar."""
+    canal = transporte.criar_transporte(nome_transporte, canais_escuta=[transporte.DOWNLINK_ENTRADA])
+
+    def entregar(pacote):
+        canal.enviar(transporte.UPLINK_SAIDA, pacote)
+        canal.receber_lote(transporte.DOWNLINK_ENTRADA, 1024)
+
+    try:
+        inicio = time.perf_counter()
+        reproduzir(uplinks, velocidade, entregar)
+        duracao_s = time.perf_counter() - inicio
+        print(f"[Replay] {len(uplinks)} Uplink(s) entregue(s) ao Nível 3 em {duracao_s:.3f} s.")
+    finally:
+        canal.fechar()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Reproduz uma captura do Nível 2 para a Estação Base.")
+    parser.add_argument("arquivo", help="Arquivo gravado com 'nivel2.py --captura'.")
+    parser.add_argument("--velocidade", type=float, default=1.0,
+                        help="Fator de velocidade (1 = tempo real, N = N vezes mais rápido, 0 = máximo).")
+    parser.add_argument("--transporte", choices=list(transporte.BACKENDS), default=transporte.TRANSPORTE_PADRAO,
+                        help="Backend da camada de transporte compartilhada com o Nível 3.")
+    parser.add_argument("--bancada", action="store_true",
+                        help="Decodifica e grava os logs neste processo e mede a vazão, sem transporte.")
+    parser.add_argument("--diretorio-logs",
+                        help="No modo bancada, grava os logs neste diretório em vez do 'nivel4.diretorio_logs'.")
+    args = parser.parse_args()
+
+    uplinks = uplinks_da_captura(args.arquivo)
+    print(f"[Replay] {len(uplinks)} Uplink(s) lido(s) de '{args.arquivo}' (velocidade: {args.velocidade or 'máxima'}).")
+    try:
+        if args.bancada:
+            executar_bancada(uplinks, args.velocidade, args.diretorio_logs)
+        else:
+            executar_transporte(uplinks, args.velocidade, args.transporte)
+    except KeyboardInterrupt:
+        print("\n[Replay] Interrompido pelo usuário.")
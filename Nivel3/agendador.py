@@ -0,0 +1,152 @@
+# Nivel3/agendador.py
+
+"""
+Agendador de Requisições - Nível 3 (Borda)
+Decide QUANDO a Base deve enviar um pedido de dados (Downlink) para CADA sensor
+listado na seção 'nivel1' do 'configuracoes.yaml'.
+
+Cada sensor tem um "próximo instante" de leitura. A cada consulta, o agendador devolve
+os sensores cujo instante já chegou, e a Base envia todos os pedidos de uma vez,
+mantendo várias requisições pendentes (cada uma com seu próprio prazo). Assim, uma
+varredura de N sensores custa aproximadamente UM tempo limite, e não N.
+
+Políticas disponíveis (chave 'politica_agendamento' em 'nivel3'):
+- 'round_robin': todos os sensores a cada 'intervalo_leitura_s'; quando o limite de
+  pendentes é atingido, a ordem de atendimento gira entre as varreduras.
+- 'prioridade': o campo 'prioridade' de cada sensor (padrão 1) divide o intervalo;
+  um sensor de prioridade 4 é lido 4 vezes mais que um de prioridade 1.
+- 'tdma': cada sensor recebe um slot fixo de 'duracao_slot_s' dentro do quadro, e os
+  pedidos são espalhados no tempo em vez de saírem todos juntos.
+- 'adaptativo': a taxa de leitura acompanha o último RSSI de Uplink. Links bons são lidos
+  no intervalo base; links fracos ou sem resposta têm o intervalo dobrado a cada falha,
+  até 'intervalo_maximo_s', liberando o canal para os demais.
+"""
+
+# IDs são transportados em um único byte do pacote (bytes 8 e 10).
+ID_MAXIMO = 255
+
+
+class AgendadorRoundRobin:
+
+    def __init__(self, ids_sensores, config_n3, config_n1=None, agora=0.0):
+        self.ids = list(ids_sensores)
+        self.config_n3 = config_n3
+        self.config_n1 = config_n1 or {}
+        self.intervalo_s = config_n3.get('intervalo_leitura_s', 5)
+        self.proxima_leitura = {id_sensor: self._instante_inicial(i, agora) for i, id_sensor in enumerate(self.ids)}
+        self._rodada = 0
+
+    def _instante_inicial(self, posicao, agora):
+        return agora
+
+    def _intervalo(self, id_sensor):
+        return self.intervalo_s
+
+    def proximos(self, agora, limite=None, ignorar=()):
+        """Retorna os sensores com leitura vencida, até 'limite' sensores, pulando os de 'ignorar'."""
+        vencidos = [i for i in self.ids if self.proxima_leitura[i] <= agora and i not in ignorar]
+        # Gira o ponto de partida para que nenhum sensor fique sempre no fim da fila.
+        if vencidos:
+            inicio = self._rodada % len(vencidos)
+            vencidos = vencidos[inicio:] + vencidos[:inicio]
+            self._rodada += 1
+        selecionados = vencidos if limite is None else vencidos[:max(0, limite)]
+        for id_sensor in selecionados:
+            self.proxima_leitura[id_sensor] = agora + self._intervalo(id_sensor)
+        return selecionados
+
+    def registrar_resultado(self, id_sensor, sucesso, rssi_uplink_dbm=None):
+        """Informa o resultado de uma requisição (usado pelas políticas adaptativas)."""
+        pass
+
+    def proximo_instante(self, ignorar=()):
+        """
+        Instante da próxima leitura agendada (ou None se não houver sensores).
+        'ignorar': sensores que não podem ser consultados agora (ex.: pedido pendente).
+        """
+        return min((t for i, t in self.proxima_leitura.items() if i not in ignorar), default=None)
+
+
+class AgendadorPrioridade(AgendadorRoundRobin):
+
+    def _prioridade(self, id_sensor):
+        """Prioridade do sensor como número; ausente, vazia ('prioridade:' no YAML) ou inválida vale 1."""
+        try:
+            return float((self.config_n1.get(str(id_sensor)) or {}).get('prioridade') or 1)
+        except (TypeError, ValueError):
+            return 1.0
+
+    def _intervalo(self, id_sensor):
+        return self.intervalo_s / max(self._prioridade(id_sensor), 1e-3)
+
+    def proximos(self, agora, limite=None, ignorar=()):
+        # Com limite, os sensores de maior prioridade são atendidos primeiro.
+        vencidos = [i for i in self.ids if self.proxima_leitura[i] <= agora and i not in ignorar]
+        vencidos.sort(key=lambda i: -self._prioridade(i))
+        selecionados = vencidos if limite is None else vencidos[:max(0, limite)]
+        for id_sensor in selecionados:
+            self.proxima_leitura[id_sensor] = agora + self._intervalo(id_sensor)
+        return selecionados
+
+
+class AgendadorTDMA(AgendadorRoundRobin):
+
+    def __init__(self, ids_sensores, config_n3, config_n1=None, agora=0.0):
+        self.duracao_slot_s = config_n3.get('duracao_slot_s', 0.1)
+        super().__init__(ids_sensores, config_n3, config_n1, agora)
+        # O quadro nunca é menor que a soma dos slots.
+        self.intervalo_s = max(self.intervalo_s, self.duracao_slot_s * len(self.ids))
+
+    def _instante_inicial(self, posicao, agora):
+        return agora + posicao * self.duracao_slot_s
+
+
+class AgendadorAdaptativo(AgendadorRoundRobin):
+
+    def __init__(self, ids_sensores, config_n3, config_n1=None, agora=0.0):
+        super().__init__(ids_sensores, config_n3, config_n1, agora)
+        self.limiar_rssi_dbm = config_n3.get('limiar_rssi_dbm', -100)
+        self.intervalo_maximo_s = config_n3.get('intervalo_maximo_s', self.intervalo_s * 8)
+        self.fator = {id_sensor: 1 for id_sensor in self.ids}
+
+    def _intervalo(self, id_sensor):
+        return min(self.intervalo_s * self.fator[id_sensor], self.intervalo_maximo_s)
+
+    def registrar_resultado(self, id_sensor, sucesso, rssi_uplink_dbm=None):
+        if id_sensor not in self.fator:
+            return
+        if sucesso and rssi_uplink_dbm is not None and rssi_uplink_dbm >= self.limiar_rssi_dbm:
+            self.fator[id_sensor] = 1
+        else:
+            self.fator[id_sensor] = min(self.fator[id_sensor] * 2, self.intervalo_maximo_s / self.intervalo_s)
+
+
+# --- REGISTRO CENTRAL DE POLÍTICAS ---
+POLITICAS = {
+    'round_robin': AgendadorRoundRobin,
+    'prioridade': AgendadorPrioridade,
+    'tdma': AgendadorTDMA,
+    'adaptativo': AgendadorAdaptativo,
+}
+
+def ler_ids_sensores(config_n1):
+    """Lê os IDs dos sensores da seção 'nivel1', ignorando os que não cabem em um byte."""
+    ids = []
+    for chave in config_n1 or {}:
+        try:
+            id_sensor = int(chave)
+        except (TypeError, ValueError):
+            print(f"[Nível 3 - Borda] AVISO: ID de sensor inválido '{chave}' ignorado.")
+            continue
+        if not 0 < id_sensor <= ID_MAXIMO:
+            print(f"[Nível 3 - Borda] AVISO: ID {id_sensor} fora do intervalo 1-{ID_MAXIMO} do pacote. Ignorado.")
+            continue
+        ids.append(id_sensor)
+    return sorted(ids)
+
+def criar_agendador(config_n3, config_n1, agora=0.0):
+    """Cria o agendador da política configurada em 'nivel3.politica_agendamento'."""
+    nome = config_n3.get('politica_agendamento', 'round_robin')
+    if nome not in POLITICAS:
+        raise ValueError(f"Política de agendamento '{nome}' desconhecida. Opções: {', '.join(POLITICAS)}")
+    return POLITICAS[nome](ler_ids_sensores(config_n1), config_n3, config_n1, agora)
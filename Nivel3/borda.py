@@ -0,0 +1,186 @@
+# Nivel3/borda.py
+
+"""
+Funções da Estação Base (Nível 3 - Borda)
+Etapas do ciclo de coleta que não dependem de COMO a Base espera pelos pacotes.
+São usadas tanto pelo laço síncrono ('nivel3.py') quanto pelo runtime assíncrono
+('nivel3_async.py'):
+- carregar_configuracao_central(): lê o 'configuracoes.yaml' e valida os mapeamentos.
+- montar_downlink(): ETAPA A, monta o pedido de dados para um sensor.
+- processar_uplink(): ETAPA C, decodifica a resposta conforme o 'mapeamento_pacote'.
+- salvar_logs(): ETAPA D, grava os logs de rede e de aplicação pelo gravador em lote
+  ('gravador_logs.py'), no formato de 'nivel4.formato' ('jsonl', 'colunar' ou 'sqlite');
+  fechar_logs() descarrega e fecha os arquivos.
+"""
+
+# --- Importação de Bibliotecas ---
+import os
+import sys
+import yaml # Usaremos YAML para ler o arquivo de configuração
+from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'Comum'))
+import codec_pacote
+import relogio
+import armazenamento_colunar
+import armazenamento_sqlite
+
+sys.path.append(os.path.dirname(__file__))
+import gravador_logs
+
+TAMANHO_DO_PACOTE_BYTES = 52
+FORMATOS_LOG = ('jsonl', 'colunar', 'sqlite')
+CAMINHO_CONFIG_CENTRAL = os.path.join(os.path.dirname(__file__), '..', 'Nivel4', 'Parametros', 'configuracoes.yaml')
+
+# --- 1. CARREGAMENTO DA CONFIGURAÇÃO CENTRAL ---
+def carregar_configuracao_central():
+    """
+    Carrega o arquivo de configuração principal (configuracoes.yaml).
+    Este arquivo é a "fonte da verdade" para todo o backend.
+    Se o arquivo não for encontrado, o programa encerrará, pois não pode operar sem ele.
+    O 'mapeamento_pacote' de cada sensor é compilado aqui (codec_pacote), e um mapeamento
+    inválido (campo fora do pacote ou sobreposto) também encerra o programa.
+    """
+    caminho_config = CAMINHO_CONFIG_CENTRAL
+    try:
+        with open(caminho_config, 'r', encoding='utf-8') as f:
+            print(f"[Nível 3 - Borda] Carregando configurações de '{caminho_config}'...")
+            config = yaml.safe_load(f)
+    except Exception as e:
+        print(f"ERRO CRÍTICO: Não foi possível carregar o arquivo de configuração '{caminho_config}'. Encerrando. Erro: {e}")
+        exit()
+
+    for id_sensor, config_sensor in (config.get('nivel1') or {}).items():
+        try:
+            codec_pacote.obter_codec(config_sensor.get('mapeamento_pacote', []))
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"ERRO CRÍTICO: 'mapeamento_pacote' inválido para o Sensor {id_sensor}. Encerrando. Erro: {e}")
+            exit()
+
+    formato = config.get('nivel4', {}).get('formato', 'jsonl')
+    if formato not in FORMATOS_LOG:
+        print(f"ERRO CRÍTICO: 'nivel4.formato' inválido: '{formato}'. Opções: {', '.join(FORMATOS_LOG)}. Encerrando.")
+        exit()
+    if formato == 'colunar' and armazenamento_colunar.np is None:
+        print("ERRO CRÍTICO: O formato 'colunar' requer o NumPy (pip install numpy). Encerrando.")
+        exit()
+    return config
+
+# ==============================================================================
+# ETAPA A: MONTAR O PACOTE DE DOWNLINK
+# ==============================================================================
+def montar_downlink(id_sensor_alvo, id_base):
+    Pacote_DL = [0] * TAMANHO_DO_PACOTE_BYTES
+    print(f"[Nível 3 - Borda] - Rede - Endereços do Pacote: Destino=ID {id_sensor_alvo}, Remetente=ID {id_base}.")
+    Pacote_DL[8] = id_sensor_alvo
+    Pacote_DL[10] = id_base
+    return bytearray(Pacote_DL)
+
+# ==============================================================================
+# ETAPA C: PROCESSAR O PACOTE RECEBIDO
+# ==============================================================================
+def processar_uplink(Pacote_UL, config):
+    """Decodifica um Uplink e retorna um dicionário com o resultado da comunicação."""
+    resultado = {'status': 'Erro', 'id_sensor': None, 'dados': {}, 'config_sensor': None}
+
+    if Pacote_UL and len(Pacote_UL) == TAMANHO_DO_PACOTE_BYTES:
+        resultado['status'] = 'OK'
+
+        rssi_dl_int = Pacote_UL[0]; rssi_downlink_dbm = float(rssi_dl_int - 256 if rssi_dl_int > 127 else rssi_dl_int)
+        rssi_ul_int = Pacote_UL[2]; rssi_uplink_dbm = float(rssi_ul_int - 256 if rssi_ul_int > 127 else rssi_ul_int)
+        print(f"[Nível 3 - Borda] - MAC - RSSI medido: Uplink={rssi_uplink_dbm:.1f} dBm, Downlink={rssi_downlink_dbm:.1f} dBm.")
+        resultado['rssi_uplink_dbm'] = rssi_uplink_dbm
+        resultado['rssi_downlink_dbm'] = rssi_downlink_dbm
+
+        id_remetente = str(Pacote_UL[10])
+        contador_sensor = (Pacote_UL[14] << 8) | Pacote_UL[15]
+        print(f"[Nível 3 - Borda] - Transporte - Contador de pacotes: {contador_sensor}.")
+        resultado['id_sensor'] = int(id_remetente)
+        resultado['contador_pacote'] = contador_sensor
+
+        mapeamento_geral = config.get('nivel1', {})
+        config_sensor = mapeamento_geral.get(id_remetente)
+        resultado['config_sensor'] = config_sensor
+
+        if config_sensor:
+            print(f"[Nível 3 - Borda] - Aplicação - Decodificando pacote do Sensor {id_remetente} (Tipo: {config_sensor['tipo_dados']})")
+            # O codec já foi compilado e validado na carga da configuração (fica em cache).
+            resultado['dados'] = codec_pacote.obter_codec(config_sensor.get('mapeamento_pacote', [])).decodificar(Pacote_UL)
+            print(f"[Nível 3 - Borda] - Aplicação - Dados decodificados: {resultado['dados']}")
+        else:
+             print(f"[Nível 3 - Borda] - Aplicação - ERRO: Sensor ID {id_remetente} não encontrado no arquivo de configuração.")
+    else:
+        print(f"[Nível 3 - Borda] FALHA. Pacote inválido.")
+    return resultado
+
+def resultado_sem_resposta(id_sensor):
+    """Resultado registrado quando o prazo de uma requisição vence sem resposta."""
+    return {'status': 'Erro', 'id_sensor': id_sensor, 'dados': {}, 'config_sensor': None}
+
+# ==============================================================================
+# ETAPA D: SALVAR OS DADOS
+# ==============================================================================
+def salvar_logs(resultado, config):
+    """
+    Enfileira os registros de rede e de aplicação no gravador de logs do processo.
+    Não espera pelo disco: os arquivos ficam abertos e são gravados em lote por uma
+    thread auxiliar (ver gravador_logs.py).
+    """
+    pasta_logs = os.path.join(os.path.dirname(__file__), '..', config['nivel4']['diretorio_logs'])
+    gravador = gravador_logs.obter_gravador(config['nivel4'])
+    instante = relogio.obter_relogio().agora()
+    status_da_comunicacao = resultado['status']
+
+    formato = config['nivel4'].get('formato', 'jsonl')
+    if formato != 'jsonl':
+        # Um registro por comunicação, com rede e aplicação juntas; o destino separa o que precisar.
+        ok = status_da_comunicacao == 'OK'
+        if formato == 'colunar':
+            destino = os.path.join(pasta_logs, armazenamento_colunar.PASTA_COLUNAR)
+        else:
+            destino = armazenamento_sqlite.caminho_banco(pasta_logs, config['nivel4'].get('sqlite'))
+        gravador.gravar(destino, {
+            "id_sensor": resultado['id_sensor'],
+            "status": status_da_comunicacao,
+            "rssi_uplink_dbm": round(resultado['rssi_uplink_dbm'], 2) if ok else None,
+            "rssi_downlink_dbm": round(resultado['rssi_downlink_dbm'], 2) if ok else None,
+            "tipo_sensor": (resultado['config_sensor'] or {}).get('tipo_dados', 'Desconhecido'),
+            "contador_pacote": resultado['contador_pacote'] if ok else None,
+            "dados": resultado['dados'],
+        }, instante, formato=formato)
+        print(f"[Nível 3 - Borda] Log ({formato}) salvo.")
+        return
+
+    data_hora_atual = datetime.fromtimestamp(instante).strftime('%d-%m-%Y %H:%M:%S')
+
+    # --- Bloco de Log para Dados da Rede (agora em JSON Lines) ---
+    caminho_log_rede = os.path.join(pasta_logs, config['nivel4']['nome_arquivo_rede'])
+
+    log_rede_entry = {
+        "timestamp": data_hora_atual,
+        "id_sensor": resultado['id_sensor'],
+        "status": status_da_comunicacao,
+        "rssi_uplink_dbm": round(resultado['rssi_uplink_dbm'], 2) if status_da_comunicacao == 'OK' else None,
+        "rssi_downlink_dbm": round(resultado['rssi_downlink_dbm'], 2) if status_da_comunicacao == 'OK' else None
+    }
+
+    gravador.gravar(caminho_log_rede, log_rede_entry, instante)
+
+    print(f"[Nível 3 - Borda] Log de Rede salvo.")
+
+    # --- Bloco de Log para Dados da Aplicação (JSON Lines) ---
+    if status_da_comunicacao == 'OK' and resultado['dados']:
+        caminho_log_app = os.path.join(pasta_logs, config['nivel4']['nome_arquivo_aplicacao'])
+        log_app_entry = {
+            "timestamp": data_hora_atual,
+            "id_sensor": resultado['id_sensor'],
+            "tipo_sensor": resultado['config_sensor'].get('tipo_dados', 'Desconhecido'),
+            "contador_pacote": resultado['contador_pacote'],
+            "dados": resultado['dados']
+        }
+        gravador.gravar(caminho_log_app, log_app_entry, instante)
+        print(f"[Nível 3 - Borda] Log de Aplicação salvo.")
+
+def fechar_logs():
+    """Grava os registros ainda na fila e fecha os arquivos de log (chamar ao encerrar a Base)."""
+    gravador_logs.fechar_gravador()
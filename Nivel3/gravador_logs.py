@@ -0,0 +1,235 @@
+# Nivel3/gravador_logs.py
+
+"""
+Gravador de Logs em Lote (Nível 3 - ETAPA D)
+Mantém os arquivos de log abertos e grava os registros em lote, a partir de uma thread
+auxiliar, para que o laço de pacotes da Base nunca espere pelo disco.
+
+- gravar(caminho, registro): apenas coloca o registro na fila (não bloqueia, salvo se a
+  fila passar de 'fila_max_registros': nesse caso, a Base espera em vez de perder registros).
+- A thread auxiliar serializa os registros (JSON Lines), agrupa por arquivo e descarrega
+  o buffer quando ele passa de 'limite_buffer_kb' ou a cada 'intervalo_descarga_s'.
+- Política de fsync ('fsync'):
+    'nunca'    - só descarrega para o sistema operacional (mais rápido);
+    'descarga' - fsync a cada descarga (perde no máximo 'intervalo_descarga_s' numa queda);
+    'registro' - descarrega e faz fsync a cada lote retirado da fila (mais seguro).
+- descarregar() espera tudo o que já foi enfileirado chegar ao disco; fechar() faz isso e
+  fecha os arquivos (também é chamado na saída do processo).
+
+Cada destino é gravado pela classe do seu formato (DESTINOS):
+- 'jsonl': LogSegmentado (Comum/segmentos_log.py), com rotação em segmentos comprimidos
+  quando 'nivel4.rotacao.ativo' é verdadeiro;
+- 'colunar': TabelaColunar (Comum/armazenamento_colunar.py), parâmetros em 'nivel4.colunar';
+- 'sqlite': BancoLogs (Comum/armazenamento_sqlite.py), parâmetros em 'nivel4.sqlite'.
+
+Parâmetros em 'configuracoes.yaml', seções 'nivel4.gravacao', 'nivel4.rotacao',
+'nivel4.colunar' e 'nivel4.sqlite' (todos opcionais).
+"""
+
+# --- Importação de Bibliotecas ---
+import os
+import json
+import time
+import collections
+import sys
+import atexit
+import sqlite3
+import threading
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'Comum'))
+import segmentos_log
+import armazenamento_colunar
+import armazenamento_sqlite
+
+POLITICAS_FSYNC = ('nunca', 'descarga', 'registro')
+PARAMETROS_PADRAO = {
+    'limite_buffer_kb': 64,
+    'intervalo_descarga_s': 1.0,
+    'fsync': 'descarga',
+    'fila_max_registros': 100000,
+}
+REGISTROS_POR_AVISO = 1024
+DESTINOS = {
+    'jsonl': segmentos_log.LogSegmentado,
+    'colunar': armazenamento_colunar.TabelaColunar,
+    'sqlite': armazenamento_sqlite.BancoLogs,
+}
+# Tamanho estimado de um registro que não é serializado em JSON (para o limite do buffer).
+BYTES_POR_REGISTRO_BINARIO = 64
+
+
+class GravadorLogs:
+
+    def __init__(self, parametros=None, parametros_destinos=None):
+        p = dict(PARAMETROS_PADRAO)
+        p.update(parametros or {})
+        if p['fsync'] not in POLITICAS_FSYNC:
+            raise ValueError(f"Política de fsync '{p['fsync']}' desconhecida. Opções: {', '.join(POLITICAS_FSYNC)}")
+        self.limite_buffer_bytes = int(p['limite_buffer_kb']) * 1024
+        self.intervalo_descarga_s = float(p['intervalo_descarga_s'])
+        self.fsync = p['fsync']
+        self.fila_max_registros = int(p['fila_max_registros'])
+        self.parametros_destinos = parametros_destinos or {}
+        # A fila é um deque (append/popleft são atômicos): enfileirar não disputa travas com a
+        # thread auxiliar, que só é acordada a cada REGISTROS_POR_AVISO registros ou pelo prazo.
+        self._fila = collections.deque()
+        self._acordar = threading.Event()
+        self._espaco = threading.Event()
+        self._encerrar = False
+        self._arquivos = {}
+        self._buffers = {}
+        self._bytes_no_buffer = 0
+        self._ultima_descarga = time.monotonic()
+        self.registros_gravados = 0
+        self._thread = threading.Thread(target=self._executar, name='gravador-logs', daemon=True)
+        self._thread.start()
+
+    # --- Interface usada pela Base ---
+    def gravar(self, caminho, registro, instante=None, formato='jsonl'):
+        """
+        Enfileira um registro (dicionário) para ser acrescentado ao destino 'caminho' (um
+        arquivo JSON Lines ou, no formato 'colunar', a pasta da tabela).
+        'instante' (segundos desde a época) decide o segmento/partição; padrão: agora.
+        """
+        if self._thread is None:
+            raise RuntimeError("O gravador de logs já foi fechado.")
+        self._fila.append(((formato, caminho), registro, time.time() if instante is None else instante))
+        tamanho = len(self._fila)
+        if tamanho % REGISTROS_POR_AVISO == 0:
+            self._acordar.set()
+        if tamanho >= self.fila_max_registros:
+            # Disco mais lento que a Base: espera a thread esvaziar a fila.
+            self._espaco.clear()
+            self._acordar.set()
+            self._espaco.wait(self.intervalo_descarga_s)
+
+    def descarregar(self):
+        """Bloqueia até todos os registros já enfileirados estarem gravados."""
+        if self._thread is not None:
+            evento = threading.Event()
+            self._fila.append(evento)
+            self._acordar.set()
+            evento.wait()
+
+    def fechar(self):
+        if self._thread is None:
+            return
+        self._encerrar = True
+        self._acordar.set()
+        self._thread.join()
+        self._thread = None
+
+    # --- Thread auxiliar ---
+    def _executar(self):
+        while True:
+            self._acordar.wait(self._tempo_ate_descarga())
+            self._acordar.clear()
+            encerrar = self._encerrar
+
+            avisos = []
+            try:
+                while self._fila:
+                    item = self._fila.popleft()
+                    if isinstance(item, threading.Event):
+                        avisos.append(item)
+                    else:
+                        self._acrescentar(*item)
+
+                if (avisos or encerrar or self.fsync == 'registro' or self._bytes_no_buffer >= self.limite_buffer_bytes
+                        or self._tempo_ate_descarga() == 0):
+                    self._descarregar_buffers()
+            except Exception as e:
+                # A thread não pode morrer: a Base ficaria esperando por espaço ou por descarregar().
+                print(f"[Nível 3 - Gravador de Logs] ERRO inesperado: {e}")
+                self._ultima_descarga = time.monotonic()
+            finally:
+                self._espaco.set()
+                for evento in avisos:
+                    evento.set()
+            if encerrar:
+                break
+        self._fechar_arquivos()
+
+    def _tempo_ate_descarga(self):
+        return max(0.0, self._ultima_descarga + self.intervalo_descarga_s - time.monotonic())
+
+    def _acrescentar(self, destino, registro, instante):
+        linha = json.dumps(registro) + '\n' if destino[0] == 'jsonl' else None
+        self._buffers.setdefault(destino, []).append((instante, registro, linha))
+        self._bytes_no_buffer += len(linha) if linha is not None else BYTES_POR_REGISTRO_BINARIO
+        self.registros_gravados += 1
+
+    def _arquivo(self, destino):
+        arquivo = self._arquivos.get(destino)
+        if arquivo is None:
+            formato, caminho = destino
+            arquivo = DESTINOS[formato](caminho, self.parametros_destinos.get(formato))
+            self._arquivos[destino] = arquivo
+        return arquivo
+
+    def _descarregar_buffers(self):
+        for destino, itens in self._buffers.items():
+            if not itens:
+                continue
+            arquivo = None
+            try:
+                arquivo = self._arquivo(destino)
+                arquivo.gravar_lote(itens)
+                arquivo.descarregar(fsync=self.fsync != 'nunca')
+            except (OSError, sqlite3.Error) as e:
+                # Só os registros que não chegaram ao destino ficam no buffer para a próxima
+                # descarga; regravar os outros os duplicaria.
+                gravados = arquivo.gravados_no_lote if arquivo is not None else 0
+                print(f"[Nível 3 - Gravador de Logs] ERRO: Falha ao gravar '{destino[1]}' "
+                      f"({len(itens) - gravados} registro(s) pendentes). Erro: {e}")
+                del itens[:gravados]
+                self._fechar_destino(destino)
+                continue
+            itens.clear()
+        self._bytes_no_buffer = sum(len(linha) if linha is not None else BYTES_POR_REGISTRO_BINARIO
+                                    for itens in self._buffers.values() for _, _, linha in itens)
+        self._ultima_descarga = time.monotonic()
+
+    def _fechar_destino(self, destino):
+        """Fecha um destino que falhou; a próxima descarga o reabre do zero."""
+        arquivo = self._arquivos.pop(destino, None)
+        if arquivo is not None:
+            try:
+                arquivo.fechar()
+            except (OSError, sqlite3.Error) as e:
+                print(f"[Nível 3 - Gravador de Logs] ERRO: Falha ao fechar '{destino[1]}'. Erro: {e}")
+
+    def _fechar_arquivos(self):
+        # Uma falha ao fechar um destino não pode impedir que os outros sejam fechados.
+        for destino, arquivo in self._arquivos.items():
+            try:
+                arquivo.fechar()
+            except (OSError, sqlite3.Error) as e:
+                print(f"[Nível 3 - Gravador de Logs] ERRO: Falha ao fechar '{destino[1]}'. Erro: {e}")
+        self._arquivos.clear()
+
+
+_gravador = None
+_trava = threading.Lock()
+
+def obter_gravador(config_nivel4=None):
+    """Gravador compartilhado do processo (criado na primeira chamada, com a seção 'nivel4' da configuração)."""
+    global _gravador
+    if _gravador is not None:
+        return _gravador
+    with _trava:
+        if _gravador is None:
+            config_nivel4 = config_nivel4 or {}
+            _gravador = GravadorLogs(config_nivel4.get('gravacao'),
+                                     {'jsonl': config_nivel4.get('rotacao'), 'colunar': config_nivel4.get('colunar'),
+                                      'sqlite': config_nivel4.get('sqlite')})
+            atexit.register(fechar_gravador)
+        return _gravador
+
+def fechar_gravador():
+    """Grava o que estiver pendente e fecha os arquivos de log."""
+    global _gravador
+    with _trava:
+        gravador, _gravador = _gravador, None
+    if gravador is not None:
+        gravador.fechar()
@@ -0,0 +1,167 @@
+# Nivel3/nivel3_async.py
+
+"""
+Simulador Nível 3 - Borda (Runtime Assíncrono)
+Alternativa ao 'nivel3.py' baseada em asyncio. Em vez de um único laço que envia,
+espera, decodifica e grava em sequência, cada tarefa é uma corrotina independente,
+ligadas por filas (asyncio.Queue):
+
+    enviador ──> [requisições pendentes: um Future por sensor]
+    receptor ──> fila_uplinks ──> decodificador ──> fila_logs ──> registrador
+                                        │
+                                        └──> resolve o Future do sensor remetente
+
+- enviador: consulta o agendador (agendador.py) e envia os pedidos de Downlink. Para cada
+  pedido, cria uma tarefa que espera a resposta com 'asyncio.wait_for' e o prazo
+  'tempo_limite_resposta_s'.
+- receptor: é acordado pelo próprio laço de eventos quando chega um Uplink (transporte
+  'socket'); nos transportes sem descritor, a espera é feita em uma thread auxiliar.
+- decodificador: aplica 'borda.processar_uplink' e entrega o resultado ao pedido pendente.
+- registrador: entrega os resultados ao gravador de logs (borda.salvar_logs), que grava em
+  lote numa thread própria, para o disco não travar o laço.
+
+Uso: python nivel3_async.py --transporte socket
+"""
+
+# --- Importação de Bibliotecas ---
+import asyncio
+import os
+import sys
+import argparse
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'Comum'))
+import transporte
+import relogio
+
+sys.path.append(os.path.dirname(__file__))
+import agendador
+import borda
+
+
+class BaseAssincrona:
+
+    def __init__(self, config, canal):
+        self.config = config
+        self.relogio = relogio.obter_relogio()
+        self.canal = canal
+        self.id_base = config['nivel3']['id_base']
+        self.tempo_limite_s = config['nivel3']['tempo_limite_resposta_s']
+        self.max_pendentes = config['nivel3'].get('max_pendentes', 256)
+        self.agendador = agendador.criar_agendador(config['nivel3'], config.get('nivel1', {}), self.relogio.monotonico())
+        # Pedidos aguardando resposta: ID do sensor -> Future com o resultado decodificado.
+        self.pendentes = {}
+        self.fila_uplinks = asyncio.Queue()
+        self.fila_logs = asyncio.Queue()
+        self.vaga_livre = asyncio.Event()
+        # Referências às tarefas de espera, para não serem coletadas antes de terminar.
+        self.tarefas = set()
+        self.numero_da_tentativa = 0
+
+    # --- Corrotina 1: envio das requisições ---
+    async def enviador(self):
+        laco = asyncio.get_running_loop()
+        while True:
+            agora = self.relogio.monotonico()
+            alvos = self.agendador.proximos(agora, limite=self.max_pendentes - len(self.pendentes), ignorar=self.pendentes)
+            if alvos:
+                self.numero_da_tentativa += 1
+                print(f"\n[{self.relogio.formatar('%H:%M:%S')}] [Nível 3 - Borda] [Ciclo N° {self.numero_da_tentativa}] Consultando sensor(es) {alvos}")
+                for id_sensor in alvos:
+                    self.pendentes[id_sensor] = laco.create_future()
+                    self.canal.enviar(transporte.DOWNLINK_ENTRADA, borda.montar_downlink(id_sensor, self.id_base))
+                    tarefa = asyncio.create_task(self.aguardar_resposta(id_sensor, self.pendentes[id_sensor]))
+                    self.tarefas.add(tarefa)
+                    tarefa.add_done_callback(self.tarefas.discard)
+
+            # Dorme até a próxima leitura agendada ou até um pedido pendente liberar vaga.
+            self.vaga_livre.clear()
+            if len(self.pendentes) >= self.max_pendentes:
+                # Sem vaga, a próxima leitura não pode ser enviada: espera só pela vaga.
+                await self.vaga_livre.wait()
+                continue
+            proximo = self.agendador.proximo_instante(ignorar=self.pendentes)
+            espera_s = 5 if proximo is None else max(0.0, proximo - self.relogio.monotonico())
+            try:
+                await asyncio.wait_for(self.vaga_livre.wait(), timeout=self.relogio.para_real(espera_s))
+            except asyncio.TimeoutError:
+                pass
+
+    # --- Corrotina 2 (uma por pedido): espera pela resposta com prazo ---
+    async def aguardar_resposta(self, id_sensor, futuro):
+        try:
+            resultado = await asyncio.wait_for(futuro, timeout=self.relogio.para_real(self.tempo_limite_s))
+            self.agendador.registrar_resultado(id_sensor, resultado['status'] == 'OK', resultado.get('rssi_uplink_dbm'))
+        except asyncio.TimeoutError:
+            print(f"[Nível 3 - Borda] FALHA. Resposta do Sensor {id_sensor} não recebida em {self.tempo_limite_s} s.")
+            self.agendador.registrar_resultado(id_sensor, False)
+            await self.fila_logs.put(borda.resultado_sem_resposta(id_sensor))
+        finally:
+            self.pendentes.pop(id_sensor, None)
+            self.vaga_livre.set()
+
+    # --- Corrotina 3: recepção dos Uplinks ---
+    async def receptor(self):
+        laco = asyncio.get_running_loop()
+        descritor = self.canal.descritor(transporte.UPLINK_SAIDA)
+        chegou = asyncio.Event()
+        if descritor is not None:
+            laco.add_reader(descritor, chegou.set)
+        while True:
+            if descritor is not None:
+                await chegou.wait()
+                chegou.clear()
+            else:
+                await asyncio.to_thread(self.canal.aguardar, [transporte.UPLINK_SAIDA], 0.5)
+            for Pacote_UL in self.canal.receber_lote(transporte.UPLINK_SAIDA, max(self.max_pendentes, 1)):
+                await self.fila_uplinks.put(Pacote_UL)
+
+    # --- Corrotina 4: decodificação ---
+    async def decodificador(self):
+        while True:
+            Pacote_UL = await self.fila_uplinks.get()
+            print(f"[Nível 3 - Borda] Pacote de resposta de Uplink recebido!")
+            resultado = borda.processar_uplink(Pacote_UL, self.config)
+            futuro = self.pendentes.get(resultado['id_sensor'])
+            if futuro is not None and not futuro.done():
+                futuro.set_result(resultado)
+            await self.fila_logs.put(resultado)
+
+    # --- Corrotina 5: gravação dos logs ---
+    async def registrador(self):
+        while True:
+            resultado = await self.fila_logs.get()
+            borda.salvar_logs(resultado, self.config)
+
+    async def executar(self):
+        print(f"[Nível 3 - Borda] Runtime assíncrono: {len(self.agendador.ids)} sensor(es), até {self.max_pendentes} pendente(s).")
+        await asyncio.gather(self.enviador(), self.receptor(), self.decodificador(), self.registrador())
+
+
+if __name__ == '__main__':
+    print("--- [Nível 3 - Borda (asyncio)] Iniciando Script.")
+
+    parser = argparse.ArgumentParser(description="Simulador da Estação Base (Borda) com asyncio.")
+    parser.add_argument("--transporte", choices=list(transporte.BACKENDS), default=transporte.TRANSPORTE_PADRAO,
+                        help="Backend da camada de transporte compartilhada com os Níveis 1 e 2.")
+    args = parser.parse_args()
+
+    relogio.exigir_relogio_de_processo("Nível 3 - Borda")
+
+    CONFIG = borda.carregar_configuracao_central()
+    canal = transporte.criar_transporte(args.transporte, canais_escuta=[transporte.UPLINK_SAIDA])
+    if args.transporte == 'arquivo':
+        # Com um único arquivo por canal, um segundo pedido sobrescreveria o primeiro.
+        print("[Nível 3 - Borda] AVISO: O transporte 'arquivo' comporta um pacote por vez. Use 'fila' ou 'socket' para consultar sensores em paralelo.")
+        CONFIG['nivel3']['max_pendentes'] = 1
+
+    try:
+        if CONFIG['nivel3']['ativo']:
+            asyncio.run(BaseAssincrona(CONFIG, canal).executar())
+        else:
+            print("[Nível 3 - Borda] Coleta desativada em 'nivel3.ativo'.")
+    except KeyboardInterrupt:
+        print("\n\n[Nível 3 - Borda] Programa interrompido pelo usuário.")
+    finally:
+        canal.fechar()
+        borda.fechar_logs()
+        print("[Nível 3 - Borda] Simulação encerrada.")
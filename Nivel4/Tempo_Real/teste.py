@@ -3,33 +3,57 @@ import json
 import os
 import sys
 
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'Comum'))
+import segmentos_log
+import leitura_logs
+import seguidor_log
+
 # --- Configuração ---
 OLLAMA_API_URL = "http://localhost:11434/api/chat"
 MODELO_OLLAMA = "llama3"
 NOME_ARQUIVO_DADOS = "dados_brutos_rede.jsonl"
 
+# Registros já lidos de cada arquivo: a cada pergunta, só as linhas novas são decodificadas.
+_seguidores = {}
+_dados_lidos = {}
+
 def carregar_dados_jsonl(filepath):
     """
     Carrega os dados do arquivo .jsonl 'em tempo real'.
-    Lê cada linha como um objeto JSON separado.
+    Lê cada linha como um objeto JSON separado, incluindo os segmentos já rotacionados
+    (pasta 'segmentos/', ver Comum/segmentos_log.py). Só a primeira chamada lê o histórico;
+    as seguintes acrescentam as linhas novas (Comum/seguidor_log.py).
+    Se a Base grava em outro formato ('nivel4.formato' = colunar ou sqlite), lê o log de
+    rede por Comum/leitura_logs.py, com os registros no mesmo formato do JSON Lines.
     """
-    if not os.path.exists(filepath):
+    config_nivel4 = leitura_logs.config_nivel4()
+    if config_nivel4.get('formato', 'jsonl') != 'jsonl':
+        try:
+            return leitura_logs.registros(config_nivel4, 'rede')
+        except Exception as e:
+            print(f"Erro ao ler os logs ({config_nivel4.get('formato')}): {e}", file=sys.stderr)
+            return []
+
+    pasta, nome = os.path.split(os.path.abspath(filepath))
+    if not os.path.exists(filepath) and not segmentos_log.ler_manifesto(pasta):
         print(f"Erro: Arquivo '{filepath}' não encontrado.", file=sys.stderr)
         return []
         
-    dados = []
+    caminho = os.path.join(pasta, nome)
+    if caminho not in _seguidores:
+        _seguidores[caminho] = seguidor_log.SeguidorLog(caminho, com_segmentos=True)
+        _dados_lidos[caminho] = []
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    linha_limpa = line.strip()
-                    if linha_limpa:
-                        dados.append(json.loads(linha_limpa))
-                except json.JSONDecodeError:
-                    pass
+        seguidor = _seguidores[caminho]
+        novos = list(seguidor.ler_novos())
+        if seguidor.reiniciado:
+            # O log foi truncado e relido do início: o que estava acumulado não vale mais.
+            _dados_lidos[caminho] = novos
+        else:
+            _dados_lidos[caminho].extend(novos)
     except Exception as e:
         print(f"Erro ao ler o arquivo: {e}", file=sys.stderr)
-    return dados
+    return _dados_lidos[caminho]
 
 #
 # --- MUDANÇA NÍVEL 1: LÓGICA DE REGRAS NO PYTHON ---
@@ -1,9 +1,12 @@
 # Nivel5/analise.py
 
 import os
-import time
+import sys
 import csv
-from datetime import datetime
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'Comum'))
+import relogio
+import leitura_logs
 
 print("--- [NÍVEL 5 - ANÁLISE] Iniciando Script de Análise de Dados ---")
 
@@ -15,27 +18,27 @@ CONFIG = {
     # Número de 'N' últimas amostras para calcular a média móvel.
     'JANELA_MEDIA_MOVEL': 5,
 
-    # Nomes dos arquivos de entrada (gerados pela base).
-    'ARQUIVO_DADOS_REDE': 'dados_brutos_rede.csv',
-    'ARQUIVO_DADOS_APP': 'dados_brutos_aplicacao.csv',
-
     # Nomes dos arquivos de saída (com as estatísticas).
     'ARQUIVO_STATS_REDE': 'estatisticas_rede.csv',
     'ARQUIVO_STATS_APP': 'estatisticas_aplicacao.csv'
 }
 
+# O intervalo é em segundos do relógio de simulação (Comum/relogio.py).
+RELOGIO = relogio.obter_relogio()
+relogio.exigir_relogio_de_processo("NÍVEL 5 - ANÁLISE")
+
 # --- 2. Definição dos Caminhos (Paths) ---
+# Os logs de entrada são lidos no formato configurado em 'nivel4.formato' (jsonl, colunar
+# ou sqlite) por Comum/leitura_logs.py, que busca só as N últimas amostras.
 PASTA_NIVEL4 = os.path.join(os.path.dirname(__file__), '..', 'Nivel4')
-PASTA_ENTRADA = os.path.join(PASTA_NIVEL4, 'Tempo_Real')
 PASTA_SAIDA = os.path.join(PASTA_NIVEL4, 'Tempo_Nao_Real')
 os.makedirs(PASTA_SAIDA, exist_ok=True)
 
-CAMINHO_DADOS_REDE = os.path.join(PASTA_ENTRADA, CONFIG['ARQUIVO_DADOS_REDE'])
-CAMINHO_DADOS_APP = os.path.join(PASTA_ENTRADA, CONFIG['ARQUIVO_DADOS_APP'])
 CAMINHO_STATS_REDE = os.path.join(PASTA_SAIDA, CONFIG['ARQUIVO_STATS_REDE'])
 CAMINHO_STATS_APP = os.path.join(PASTA_SAIDA, CONFIG['ARQUIVO_STATS_APP'])
 
-print(f"[NÍVEL 5 - ANÁLISE] Lendo dados de: {PASTA_ENTRADA}")
+print(f"[NÍVEL 5 - ANÁLISE] Lendo dados de: {leitura_logs.pasta_logs(leitura_logs.config_nivel4())} "
+      f"(formato '{leitura_logs.config_nivel4().get('formato', 'jsonl')}')")
 print(f"[NÍVEL 5 - ANÁLISE] Salvando estatísticas em: {PASTA_SAIDA}")
 print(f"[NÍVEL 5 - ANÁLISE] Janela de análise (N): {CONFIG['JANELA_MEDIA_MOVEL']} amostras")
 print(f"[NÍVEL 5 - ANÁLISE] Intervalo entre análises: {CONFIG['INTERVALO_ANALISE_S']} segundos")
@@ -43,7 +46,7 @@ print(f"[NÍVEL 5 - ANÁLISE] Intervalo entre análises: {CONFIG['INTERVALO_ANAL
 # --- 3. Loop Principal de Análise ---
 try:
     while True:
-        print(f"\n[{datetime.now().strftime('%H:%M:%S')}] [NÍVEL 5 - ANÁLISE] Novo ciclo de análise...")
+        print(f"\n[{RELOGIO.formatar('%H:%M:%S')}] [NÍVEL 5 - ANÁLISE] Novo ciclo de análise...")
         
         # ======================================================================
         # ETAPA A: Análise de Aplicação (Temperatura e Umidade)
@@ -53,36 +56,33 @@ try:
         media_umid = 0.0
         
         try:
-            if os.path.exists(CAMINHO_DADOS_APP):
-                with open(CAMINHO_DADOS_APP, 'r', newline='', encoding='utf-8') as f:
-                    leitor = csv.DictReader(f, delimiter=';')
-                    todos_os_dados = list(leitor)
-                
-                ultimas_n_linhas = todos_os_dados[-CONFIG['JANELA_MEDIA_MOVEL']:]
-
-                if ultimas_n_linhas:
-                    soma_temp, contagem_temp = 0.0, 0
-                    soma_umid, contagem_umid = 0.0, 0
-                    
-                    for linha in ultimas_n_linhas:
-                        try:
-                            temp_str = linha.get('Temperatura (C)', '').strip()
-                            if temp_str:
-                                soma_temp += float(temp_str)
-                                contagem_temp += 1
-                        except (ValueError, TypeError): continue
-                        
-                        try:
-                            umid_str = linha.get('Umidade (%)', '').strip()
-                            if umid_str:
-                                soma_umid += float(umid_str)
-                                contagem_umid += 1
-                        except (ValueError, TypeError): continue
-
-                    if contagem_temp > 0: media_temp = round(soma_temp / contagem_temp, 2)
-                    if contagem_umid > 0: media_umid = round(soma_umid / contagem_umid, 2)
+            ultimas_n_linhas = leitura_logs.registros(leitura_logs.config_nivel4(), 'aplicacao',
+                                                      ultimos=CONFIG['JANELA_MEDIA_MOVEL'])
+
+            if ultimas_n_linhas:
+                soma_temp, contagem_temp = 0.0, 0
+                soma_umid, contagem_umid = 0.0, 0
+
+                for linha in ultimas_n_linhas:
+                    dados = linha.get('dados') or {}
+                    try:
+                        temp = dados.get('temperatura')
+                        if temp is not None:
+                            soma_temp += float(temp)
+                            contagem_temp += 1
+                    except (ValueError, TypeError): pass
+
+                    try:
+                        umid = dados.get('umidade')
+                        if umid is not None:
+                            soma_umid += float(umid)
+                            contagem_umid += 1
+                    except (ValueError, TypeError): pass
+
+                if contagem_temp > 0: media_temp = round(soma_temp / contagem_temp, 2)
+                if contagem_umid > 0: media_umid = round(soma_umid / contagem_umid, 2)
         except Exception as e:
-            print(f"   - ERRO ao processar arquivo de aplicação: {e}")
+            print(f"   - ERRO ao processar log de aplicação: {e}")
 
         print(f"   - Média de Temperatura (últimas {CONFIG['JANELA_MEDIA_MOVEL']}): {media_temp:.2f}°C")
         print(f"   - Média de Umidade (últimas {CONFIG['JANELA_MEDIA_MOVEL']}): {media_umid:.2f}%")
@@ -94,7 +94,7 @@ try:
         
         with open(CAMINHO_STATS_APP, 'a', newline='', encoding='utf-8') as f:
             escritor = csv.writer(f, delimiter=';')
-            timestamp_atual = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+            timestamp_atual = RELOGIO.formatar('%d/%m/%Y %H:%M:%S')
             escritor.writerow([timestamp_atual, f"{media_temp:.2f}", f"{media_umid:.2f}"])
         
         print("   - Estatísticas de aplicação salvas.")
@@ -107,36 +107,33 @@ try:
         media_rssi_down = 0.0
 
         try:
-            if os.path.exists(CAMINHO_DADOS_REDE):
-                with open(CAMINHO_DADOS_REDE, 'r', newline='', encoding='utf-8') as f:
-                    leitor = csv.DictReader(f, delimiter=';')
-                    todos_os_dados_rede = list(leitor)
-
-                ultimas_n_linhas_rede = todos_os_dados_rede[-CONFIG['JANELA_MEDIA_MOVEL']:]
-
-                if ultimas_n_linhas_rede:
-                    soma_up, contagem_up = 0.0, 0
-                    soma_down, contagem_down = 0.0, 0
-
-                    for linha in ultimas_n_linhas_rede:
-                        try:
-                            up_str = linha.get('RSSI_Uplink_dBm', '').strip()
-                            if up_str:
-                                soma_up += float(up_str)
-                                contagem_up += 1
-                        except (ValueError, TypeError): continue
-
-                        try:
-                            down_str = linha.get('RSSI_Downlink_dBm', '').strip()
-                            if down_str:
-                                soma_down += float(down_str)
-                                contagem_down += 1
-                        except (ValueError, TypeError): continue
-                    
-                    if contagem_up > 0: media_rssi_up = round(soma_up / contagem_up, 2)
-                    if contagem_down > 0: media_rssi_down = round(soma_down / contagem_down, 2)
+            ultimas_n_linhas_rede = leitura_logs.registros(leitura_logs.config_nivel4(), 'rede',
+                                                           ultimos=CONFIG['JANELA_MEDIA_MOVEL'])
+
+            if ultimas_n_linhas_rede:
+                soma_up, contagem_up = 0.0, 0
+                soma_down, contagem_down = 0.0, 0
+
+                for linha in ultimas_n_linhas_rede:
+                    # Comunicações com erro têm RSSI nulo e ficam fora da média.
+                    try:
+                        up = linha.get('rssi_uplink_dbm')
+                        if up is not None:
+                            soma_up += float(up)
+                            contagem_up += 1
+                    except (ValueError, TypeError): pass
+
+                    try:
+                        down = linha.get('rssi_downlink_dbm')
+                        if down is not None:
+                            soma_down += float(down)
+                            contagem_down += 1
+                    except (ValueError, TypeError): pass
+
+                if contagem_up > 0: media_rssi_up = round(soma_up / contagem_up, 2)
+                if contagem_down > 0: media_rssi_down = round(soma_down / contagem_down, 2)
         except Exception as e:
-            print(f"   - ERRO ao processar arquivo de rede: {e}")
+            print(f"   - ERRO ao processar log de rede: {e}")
 
         print(f"   - Média de RSSI Uplink (últimas {CONFIG['JANELA_MEDIA_MOVEL']}): {media_rssi_up:.2f} dBm")
         print(f"   - Média de RSSI Downlink (últimas {CONFIG['JANELA_MEDIA_MOVEL']}): {media_rssi_down:.2f} dBm")
@@ -148,7 +145,7 @@ try:
 
         with open(CAMINHO_STATS_REDE, 'a', newline='', encoding='utf-8') as f:
             escritor = csv.writer(f, delimiter=';')
-            timestamp_atual = datetime.now().strftime('%d/%m/%Y %H:%M:%S')
+            timestamp_atual = RELOGIO.formatar('%d/%m/%Y %H:%M:%S')
             escritor.writerow([timestamp_atual, f"{media_rssi_up:.2f}", f"{media_rssi_down:.2f}"])
 
         print("   - Estatísticas de rede salvas.")
@@ -158,7 +155,7 @@ try:
         # ======================================================================
         intervalo = CONFIG['INTERVALO_ANALISE_S']
         print(f"[NÍVEL 5 - ANÁLISE] Aguardando {intervalo} segundos para o próximo ciclo...")
-        time.sleep(intervalo)
+        RELOGIO.dormir(intervalo)
 
 except KeyboardInterrupt:
     print("\n\n[NÍVEL 5 - ANÁLISE] Programa interrompido pelo usuário.")
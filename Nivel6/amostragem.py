@@ -0,0 +1,93 @@
+# Nivel6/amostragem.py
+
+"""
+Redução de Séries para os Gráficos (Nível 6 - Painéis)
+Com dias de histórico, uma série tem dezenas de milhares de pontos, mas o gráfico só tem
+algumas centenas de pixels de largura. Estas funções escolhem quais pontos enviar:
+
+- 'lttb' (Largest-Triangle-Three-Buckets): divide a série em baldes e, de cada balde,
+  mantém o ponto que forma o maior triângulo com o ponto escolhido no balde anterior e a
+  média do balde seguinte. Preserva o formato visual (picos e vales) com poucos pontos.
+- 'minmax': de cada balde, mantém o menor e o maior valor (na ordem em que ocorreram).
+  Nenhum extremo se perde; bom para RSSI, em que as quedas importam.
+
+As funções retornam os ÍNDICES escolhidos (em ordem crescente), para que os rótulos de
+tempo e as outras séries do mesmo gráfico possam ser recortados juntos.
+Valores ausentes (None) não são escolhidos; o primeiro e o último ponto válidos sempre são.
+"""
+
+METODOS = ('lttb', 'minmax')
+
+
+def _validos(x, y):
+    return [(i, float(x[i]), float(y[i])) for i in range(len(y)) if y[i] is not None and x[i] is not None]
+
+def lttb(x, y, n):
+    """Índices de até 'n' pontos de (x, y) escolhidos pelo LTTB."""
+    pontos = _validos(x, y)
+    if n >= len(pontos):
+        return [p[0] for p in pontos]
+    if n < 3:
+        return [pontos[0][0], pontos[-1][0]]
+
+    escolhidos = [pontos[0]]
+    # Os pontos internos (sem o primeiro e o último) são divididos em n - 2 baldes.
+    tamanho_balde = (len(pontos) - 2) / (n - 2)
+    for b in range(n - 2):
+        inicio = int(b * tamanho_balde) + 1
+        fim = int((b + 1) * tamanho_balde) + 1
+        # Média do balde seguinte (o último "balde seguinte" é o ponto final).
+        proximo = pontos[fim:min(int((b + 2) * tamanho_balde) + 1, len(pontos) - 1)] or pontos[-1:]
+        media_x = sum(p[1] for p in proximo) / len(proximo)
+        media_y = sum(p[2] for p in proximo) / len(proximo)
+
+        _, ax, ay = escolhidos[-1]
+        melhor, maior_area = None, -1.0
+        for ponto in pontos[inicio:fim]:
+            area = abs((ax - media_x) * (ponto[2] - ay) - (ax - ponto[1]) * (media_y - ay))
+            if area > maior_area:
+                melhor, maior_area = ponto, area
+        escolhidos.append(melhor)
+    escolhidos.append(pontos[-1])
+    return [p[0] for p in escolhidos]
+
+def minmax(x, y, n):
+    """Índices de até 'n' pontos de (x, y): o primeiro, o último e o mínimo e o máximo de cada um de (n - 2)/2 baldes."""
+    pontos = _validos(x, y)
+    if n >= len(pontos):
+        return [p[0] for p in pontos]
+    if n < 4:
+        return [pontos[0][0], pontos[-1][0]]
+    # O primeiro e o último ponto ficam de fora dos baldes: já estão no orçamento.
+    internos = pontos[1:-1]
+    baldes = (n - 2) // 2
+    tamanho_balde = len(internos) / baldes
+    indices = {pontos[0][0], pontos[-1][0]}
+    for b in range(baldes):
+        balde = internos[int(b * tamanho_balde):int((b + 1) * tamanho_balde)]
+        if balde:
+            indices.add(min(balde, key=lambda p: p[2])[0])
+            indices.add(max(balde, key=lambda p: p[2])[0])
+    return sorted(indices)
+
+def reduzir(x, series, n, metodo='lttb'):
+    """
+    Índices a manter de várias séries que compartilham o eixo 'x' ({campo: valores}).
+    O orçamento de 'n' pontos é dividido entre as séries e os índices escolhidos são unidos;
+    o resultado nunca passa de 'n' índices.
+    """
+    if metodo not in METODOS:
+        raise ValueError(f"Método de amostragem '{metodo}' desconhecido. Opções: {', '.join(METODOS)}")
+    funcao = lttb if metodo == 'lttb' else minmax
+    por_serie = max(2, n // max(1, len(series)))
+    indices = set()
+    for valores in series.values():
+        indices.update(funcao(x, valores, por_serie))
+    escolhidos = sorted(indices)
+    if len(escolhidos) > n:
+        # Orçamento menor que as pontas de todas as séries: mantém 'n' índices espaçados.
+        if n < 2:
+            return escolhidos[:max(n, 0)]
+        passo = (len(escolhidos) - 1) / (n - 1)
+        escolhidos = [escolhidos[round(i * passo)] for i in range(n)]
+    return escolhidos
@@ -2,30 +2,161 @@
 import os
 import sys
 import json
-from flask import Flask, render_template, request, jsonify, url_for
+from datetime import datetime
+from flask import Flask, render_template, request, jsonify, url_for, Response, stream_with_context
 
 sys.path.append(os.path.dirname(__file__))
 import config_helper
+import buffer_sensores
+import amostragem
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'Comum'))
+import leitura_logs
+import segmentos_log
 
 app = Flask(__name__)
 
-# Define o caminho base para os logs
-LOG_DIR_PATH_BASE = os.path.join(os.path.dirname(__file__), '..')
+CAMPOS_REDE = ['rssi_uplink_dbm', 'rssi_downlink_dbm']
+# Sem pontos novos, o stream envia um comentário a cada intervalo para manter a conexão aberta.
+INTERVALO_KEEPALIVE_S = 15
+# Padrões da seção 'nivel6.api': pontos por série enviados ao gráfico e método de redução.
+PARAMETROS_API_PADRAO = {
+    'max_pontos': 1000,
+    'amostragem': 'lttb',
+}
+
+
+def campos_do_log(log_type, sensor_id):
+    """Campos exibidos do sensor: RSSI na rede, 'mapeamento_pacote' na aplicação (None se o sensor não existe)."""
+    if log_type == 'rede':
+        return CAMPOS_REDE
+    sensor_config = config_helper.ler_config().get('nivel1', {}).get(str(sensor_id))
+    if not sensor_config:
+        return None
+    # PONTO 5: 'mapeamento_pacote' define os campos (sem 'tipo_dados' aqui)
+    return [m.get('campo') for m in sensor_config.get('mapeamento_pacote', []) if m.get('campo')]
+
+
+def buffer_do_log(config, log_type):
+    """Buffer em memória do log JSON Lines (buffer_sensores.py), ou None nos outros formatos."""
+    config_n4 = config.get('nivel4', {})
+    if config_n4.get('formato', 'jsonl') != 'jsonl':
+        return None
+    caminho = os.path.join(leitura_logs.pasta_logs(config_n4), leitura_logs.nome_arquivo(config_n4, log_type))
+    return buffer_sensores.obter_buffer(caminho, (config.get('nivel6') or {}).get('buffer'))
+
 
-def get_log_filepath(log_type='aplicacao'):
-    """Lê a config e retorna o caminho completo do arquivo de log."""
+def ler_serie(log_type, sensor_id, campos, inicio=None, fim=None, paginada=False):
+    """
+    Lê a config e retorna (timestamps, {campo: valores}, ultimo_id) do sensor no log 'rede'
+    ou 'aplicacao', qualquer que seja o formato gravado pela Base (Comum/leitura_logs.py).
+    Em JSON Lines, a série vem do buffer em memória do sensor (buffer_sensores.py), com os
+    pontos recentes limitados por 'nivel6.buffer'; os outros formatos já são indexados.
+    Sem 'inicio', 'fim' nem paginação ('paginada'), a série é a janela recente do buffer.
+    Nas outras consultas, um 'inicio' ausente vale como o começo do log, e a série só vem
+    do buffer se ele ainda guarda todos os pontos desde então; senão, é lida dos logs.
+    'ultimo_id' é a sequência do buffer de onde o stream continua (None fora do JSON Lines).
+    """
     config = config_helper.ler_config()
     config_n4 = config.get('nivel4', {})
-    
-    dir_logs = config_n4.get('diretorio_logs', 'Nivel4/Tempo_Real')
-    
-    if log_type == 'rede':
-        filename = config_n4.get('nome_arquivo_rede', 'dados_brutos_rede.jsonl')
-    else:
-        filename = config_n4.get('nome_arquivo_aplicacao', 'dados_brutos_aplicacao.jsonl')
-        
-    # Constrói o caminho completo a partir da raiz do projeto
-    return os.path.join(LOG_DIR_PATH_BASE, dir_logs, filename)
+    buffer = buffer_do_log(config, log_type)
+    if buffer is None:
+        return leitura_logs.serie_sensor(config_n4, log_type, sensor_id, campos, inicio, fim) + (None,)
+    janela = inicio is not None or fim is not None or paginada
+    if janela and not buffer.cobre(sensor_id, inicio):
+        ultimo_id = buffer.sequencia
+        return leitura_logs.serie_sensor(config_n4, log_type, sensor_id, campos, inicio, fim) + (ultimo_id,)
+    registros, ultimo_id = buffer.registros(sensor_id, inicio, fim)
+    return leitura_logs.serie_de_registros(registros, log_type, campos) + (ultimo_id,)
+
+
+def ler_instante(texto):
+    """Instante de um parâmetro de consulta: segundos desde a época, ISO 8601 ou o formato dos logs."""
+    if texto is None or texto == '':
+        return None
+    try:
+        return float(texto)
+    except ValueError:
+        pass
+    try:
+        return datetime.fromisoformat(texto).timestamp()
+    except ValueError:
+        pass
+    instante = segmentos_log.instante_do_timestamp(texto)
+    if instante is None:
+        raise ValueError(f"Instante inválido: '{texto}'.")
+    return instante
+
+
+def ler_consulta():
+    """
+    Parâmetros de consulta das APIs de dados:
+    - 'from' / 'to': janela de tempo (inclusiva);
+    - 'limit' e 'cursor': paginação em ordem cronológica; a resposta traz 'proximo_cursor'
+      (None na última página), a ser passado em 'cursor' para buscar a página seguinte;
+    - 'max_points' e 'downsample' ('lttb', 'minmax' ou 'none'): redução da série no servidor
+      (padrões em 'nivel6.api').
+    """
+    p = dict(PARAMETROS_API_PADRAO)
+    p.update((config_helper.ler_config().get('nivel6') or {}).get('api') or {})
+    args = request.args
+    consulta = {'inicio': ler_instante(args.get('from')), 'fim': ler_instante(args.get('to')),
+                'limite': None, 'cursor': None}
+    if args.get('limit'):
+        consulta['limite'] = int(args['limit'])
+        if consulta['limite'] <= 0:
+            raise ValueError("'limit' deve ser positivo.")
+    if args.get('cursor'):
+        instante, repetidos = args['cursor'].split(':')
+        consulta['cursor'] = (float(instante), int(repetidos))
+    consulta['amostragem'] = args.get('downsample', p['amostragem'] or 'none')
+    if consulta['amostragem'] not in amostragem.METODOS + ('none',):
+        raise ValueError(f"'downsample' deve ser um de: {', '.join(amostragem.METODOS + ('none',))}.")
+    consulta['max_pontos'] = int(args.get('max_points', p['max_pontos'] or 0))
+    return consulta
+
+
+def recortar_serie(labels, series, consulta):
+    """Aplica cursor, limite e redução a uma série. Retorna (labels, series, informações da página)."""
+    instantes = [segmentos_log.instante_do_timestamp(label) for label in labels]
+    if consulta['cursor'] is not None or consulta['limite'] is not None:
+        # O cursor é um instante: registros sem timestamp válido não têm lugar na paginação.
+        validos = [i for i, t in enumerate(instantes) if t is not None]
+        if len(validos) < len(instantes):
+            labels = [labels[i] for i in validos]
+            instantes = [instantes[i] for i in validos]
+            series = {campo: [valores[i] for i in validos] for campo, valores in series.items()}
+    inicio_pagina = 0
+    if consulta['cursor'] is not None:
+        # O cursor é (instante do último ponto entregue, quantos pontos desse instante já foram).
+        instante_cursor, repetidos = consulta['cursor']
+        while inicio_pagina < len(instantes) and instantes[inicio_pagina] < instante_cursor:
+            inicio_pagina += 1
+        while repetidos > 0 and inicio_pagina < len(instantes) and instantes[inicio_pagina] == instante_cursor:
+            inicio_pagina += 1
+            repetidos -= 1
+    fim_pagina = len(labels) if consulta['limite'] is None else min(len(labels), inicio_pagina + consulta['limite'])
+
+    proximo_cursor = None
+    if fim_pagina < len(labels) and fim_pagina > inicio_pagina:
+        ultimo = instantes[fim_pagina - 1]
+        repetidos = sum(1 for t in instantes[inicio_pagina:fim_pagina] if t == ultimo)
+        if consulta['cursor'] is not None and consulta['cursor'][0] == ultimo:
+            repetidos += consulta['cursor'][1]
+        proximo_cursor = f"{ultimo:.0f}:{repetidos}"
+
+    labels = labels[inicio_pagina:fim_pagina]
+    instantes = instantes[inicio_pagina:fim_pagina]
+    series = {campo: valores[inicio_pagina:fim_pagina] for campo, valores in series.items()}
+    pagina = {'pontos_originais': len(labels), 'proximo_cursor': proximo_cursor, 'amostragem': None}
+
+    if consulta['amostragem'] != 'none' and 0 < consulta['max_pontos'] < len(labels):
+        eixo = [t if t is not None else float(i) for i, t in enumerate(instantes)]
+        indices = amostragem.reduzir(eixo, series, consulta['max_pontos'], consulta['amostragem'])
+        labels = [labels[i] for i in indices]
+        series = {campo: [valores[i] for i in indices] for campo, valores in series.items()}
+        pagina['amostragem'] = consulta['amostragem']
+    return labels, series, pagina
 
 
 def get_lista_sensores_para_dropdown():
@@ -80,42 +211,22 @@ def api_salvar_config():
         return jsonify(success=False, error=str(e)), 500
 
 
-@app.route('/api/dados_sensor/<sensor_id>')
+@app.route('/api/dados_sensor/<int:sensor_id>')
 def api_dados_sensor(sensor_id):
-    """API para ler o log de APLICAÇÃO e retornar dados para o Chart.js."""
-    config = config_helper.ler_config()
-    log_filepath = get_log_filepath('aplicacao')
-
-    sensor_config = config.get('nivel1', {}).get(str(sensor_id))
-    if not sensor_config:
+    """API para ler o log de APLICAÇÃO e retornar dados para o Chart.js (parâmetros em ler_consulta())."""
+    campos_dados = campos_do_log('aplicacao', sensor_id)
+    if campos_dados is None:
         return jsonify(error="Sensor ID não encontrado na configuração."), 404
-    
-    # PONTO 5: 'mapeamento_pacote' define os campos (sem 'tipo_dados' aqui)
-    campos_dados = [m.get('campo') for m in sensor_config.get('mapeamento_pacote', []) if m.get('campo')]
-
-    labels = [] 
-    datasets_data = {campo: [] for campo in campos_dados}
-    ultimo_valor_por_campo = {campo: "--" for campo in campos_dados}
-
     try:
-        os.makedirs(os.path.dirname(log_filepath), exist_ok=True) # Garante que o dir exista
-        with open(log_filepath, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    log_entry = json.loads(line)
-                    if str(log_entry.get('id_sensor')) == str(sensor_id):
-                        labels.append(log_entry.get('timestamp', ''))
-                        dados = log_entry.get('dados', {})
-                        for campo in campos_dados:
-                            valor = dados.get(campo, None)
-                            datasets_data[campo].append(valor)
-                            if valor is not None:
-                                ultimo_valor_por_campo[campo] = valor
-                except json.JSONDecodeError:
-                    continue 
-    except FileNotFoundError:
-        print(f"Arquivo de log não encontrado: {log_filepath}")
-        return jsonify(labels=[], datasets=[], ultimos_valores={})
+        consulta = ler_consulta()
+    except ValueError as e:
+        return jsonify(error=f"Parâmetro inválido: {e}"), 400
+
+    labels, datasets_data, ultimo_id = ler_serie('aplicacao', sensor_id, campos_dados, consulta['inicio'], consulta['fim'],
+                                                 paginada=consulta['cursor'] is not None or consulta['limite'] is not None)
+    labels, datasets_data, pagina = recortar_serie(labels, datasets_data, consulta)
+    ultimo_valor_por_campo = {campo: next((v for v in reversed(datasets_data[campo]) if v is not None), "--")
+                              for campo in campos_dados}
 
     # Formata a saída para o Chart.js
     chart_datasets = []
@@ -126,6 +237,7 @@ def api_dados_sensor(sensor_id):
     for i, (campo, data) in enumerate(datasets_data.items()):
         color = colors[i % len(colors)]
         chart_datasets.append({
+            'campo': campo,
             'label': campo.replace('_', ' ').capitalize(),
             'data': data,
             'borderColor': color[0], 'backgroundColor': color[1],
@@ -135,52 +247,38 @@ def api_dados_sensor(sensor_id):
     return jsonify(
         labels=labels, 
         datasets=chart_datasets,
-        ultimos_valores=ultimo_valor_por_campo
+        ultimos_valores=ultimo_valor_por_campo,
+        ultimo_id=ultimo_id,
+        **pagina
     )
 
 
 # PONTO 2: Nova API para Dados de Rede
-@app.route('/api/dados_rede/<sensor_id>')
+@app.route('/api/dados_rede/<int:sensor_id>')
 def api_dados_rede(sensor_id):
-    """API para ler o log de REDE e retornar dados de RSSI para o Chart.js."""
-    log_filepath = get_log_filepath('rede')
-
-    labels = []
-    rssi_ul_data = []
-    rssi_dl_data = []
-    ultimos_valores = {"rssi_uplink_dbm": "--", "rssi_downlink_dbm": "--"}
-
+    """API para ler o log de REDE e retornar dados de RSSI para o Chart.js (parâmetros em ler_consulta())."""
+    campos = CAMPOS_REDE
     try:
-        os.makedirs(os.path.dirname(log_filepath), exist_ok=True) # Garante que o dir exista
-        with open(log_filepath, 'r', encoding='utf-8') as f:
-            for line in f:
-                try:
-                    log_entry = json.loads(line)
-                    if str(log_entry.get('id_sensor')) == str(sensor_id) and log_entry.get('status') == 'OK':
-                        labels.append(log_entry.get('timestamp', ''))
-                        
-                        ul_val = log_entry.get('rssi_uplink_dbm', None)
-                        dl_val = log_entry.get('rssi_downlink_dbm', None)
-                        
-                        rssi_ul_data.append(ul_val)
-                        rssi_dl_data.append(dl_val)
-                        
-                        if ul_val is not None: ultimos_valores['rssi_uplink_dbm'] = ul_val
-                        if dl_val is not None: ultimos_valores['rssi_downlink_dbm'] = dl_val
-                except json.JSONDecodeError:
-                    continue
-    except FileNotFoundError:
-        print(f"Arquivo de log de rede não encontrado: {log_filepath}")
-        return jsonify(labels=[], datasets=[], ultimos_valores={})
+        consulta = ler_consulta()
+    except ValueError as e:
+        return jsonify(error=f"Parâmetro inválido: {e}"), 400
+    labels, series, ultimo_id = ler_serie('rede', sensor_id, campos, consulta['inicio'], consulta['fim'],
+                                          paginada=consulta['cursor'] is not None or consulta['limite'] is not None)
+    labels, series, pagina = recortar_serie(labels, series, consulta)
+    rssi_ul_data = series['rssi_uplink_dbm']
+    rssi_dl_data = series['rssi_downlink_dbm']
+    ultimos_valores = {campo: next((v for v in reversed(series[campo]) if v is not None), "--") for campo in campos}
 
     chart_datasets = [
         {
+            'campo': 'rssi_uplink_dbm',
             'label': 'RSSI Uplink (dBm)',
             'data': rssi_ul_data,
             'borderColor': 'rgba(52, 152, 219, 1)', 'backgroundColor': 'rgba(52, 152, 219, 0.2)',
             'borderWidth': 2, 'fill': True, 'tension': 0.4
         },
         {
+            'campo': 'rssi_downlink_dbm',
             'label': 'RSSI Downlink (dBm)',
             'data': rssi_dl_data,
             'borderColor': 'rgba(231, 76, 60, 1)', 'backgroundColor': 'rgba(231, 76, 60, 0.2)',
@@ -191,9 +289,53 @@ def api_dados_rede(sensor_id):
     return jsonify(
         labels=labels,
         datasets=chart_datasets,
-        ultimos_valores=ultimos_valores
+        ultimos_valores=ultimos_valores,
+        ultimo_id=ultimo_id,
+        **pagina
     )
 
 
+@app.route('/api/stream/<log_type>/<int:sensor_id>')
+def api_stream(log_type, sensor_id):
+    """
+    Server-Sent Events: envia apenas os pontos NOVOS do sensor, assim que a Base os grava.
+    Cada evento 'pontos' traz {labels, series: {campo: valores}} e o 'id' (sequência do
+    buffer); o cliente continua de '?desde=<ultimo_id>' da API de dados, e o navegador
+    reenvia o último 'id' recebido (Last-Event-ID) ao reconectar.
+    """
+    if log_type not in leitura_logs.LOGS:
+        return jsonify(error="Log desconhecido. Use 'rede' ou 'aplicacao'."), 404
+    campos = campos_do_log(log_type, sensor_id)
+    if campos is None:
+        return jsonify(error="Sensor ID não encontrado na configuração."), 404
+    if buffer_do_log(config_helper.ler_config(), log_type) is None:
+        return jsonify(error="Atualização em tempo real disponível apenas no formato 'jsonl'."), 409
+    try:
+        desde = int(request.headers.get('Last-Event-ID') or request.args.get('desde'))
+    except (TypeError, ValueError):
+        desde = None
+
+    def eventos():
+        buffer, cursor = None, desde
+        while True:
+            atual = buffer_do_log(config_helper.ler_config(), log_type)
+            if atual is None:
+                return
+            if atual is not buffer:
+                # Buffer recriado (parâmetros alterados): as sequências antigas não valem mais.
+                if buffer is not None or cursor is None:
+                    cursor = atual.sequencia
+                buffer = atual
+            novos, cursor = buffer.esperar_novos(sensor_id, cursor, INTERVALO_KEEPALIVE_S)
+            labels, series = leitura_logs.serie_de_registros(novos, log_type, campos)
+            if labels:
+                yield f"id: {cursor}\nevent: pontos\ndata: {json.dumps({'labels': labels, 'series': series})}\n\n"
+            else:
+                yield ": keepalive\n\n"
+
+    return Response(stream_with_context(eventos()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
 if __name__ == '__main__':
     app.run(debug=True, port=5006)
@@ -0,0 +1,173 @@
+# Nivel6/buffer_sensores.py
+
+"""
+Buffers Circulares por Sensor (Nível 6 - Painéis)
+O servidor web mantém em memória os pontos recentes de cada sensor, para que os painéis
+sejam respondidos em O(janela) sem reler os logs a cada consulta.
+
+- Cada log JSON Lines (rede e aplicação) tem um BufferLog, alimentado por uma thread que
+  acompanha o arquivo incrementalmente (Comum/seguidor_log.py), inclusive através das
+  rotações. Se o log for truncado, o buffer é esvaziado e recarregado do início.
+- Na criação, o buffer é preenchido com o histórico: arquivo ativo e os segmentos
+  rotacionados que ainda cabem na janela de idade.
+- Descarte: cada sensor guarda no máximo 'max_pontos' registros, e registros mais de
+  'max_idade_s' segundos atrás do mais novo do log são removidos (0 desativa o critério).
+  A idade é medida pelo 'timestamp' dos registros, não pelo relógio do servidor, para que
+  logs de simulações (em tempo virtual) também sejam exibidos.
+- Cada registro recebe um número de sequência crescente. esperar_novos() bloqueia até
+  chegarem registros de um sensor depois de uma sequência, para o envio em tempo real
+  aos painéis (Server-Sent Events, ver app_web.py).
+
+Parâmetros em 'configuracoes.yaml', seção 'nivel6.buffer'.
+"""
+
+# --- Importação de Bibliotecas ---
+import os
+import sys
+import threading
+import collections
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'Comum'))
+import segmentos_log
+import seguidor_log
+
+PARAMETROS_PADRAO = {
+    'max_pontos': 2000,
+    'max_idade_s': 86400,
+    'intervalo_leitura_s': 0.25,
+}
+
+
+class BufferLog:
+
+    def __init__(self, caminho, parametros=None):
+        p = dict(PARAMETROS_PADRAO)
+        p.update(parametros or {})
+        self.caminho = caminho
+        self.max_pontos = int(p['max_pontos'] or 0) or None
+        self.max_idade_s = float(p['max_idade_s'] or 0) or None
+        self.por_sensor = {}
+        self.instante_mais_recente = None
+        # Por sensor, o instante do ponto mais novo já descartado: consultas que começam
+        # antes disso não podem ser respondidas só pelo buffer.
+        self.descartado_ate = {}
+        self.sequencia = 0
+        self._trava = threading.Lock()
+        self._novos = threading.Condition(self._trava)
+
+        self.inicio_historico = self._inicio_historico()
+        self.seguidor = seguidor_log.SeguidorLog(caminho, com_segmentos=True,
+                                                 inicio_segmentos=self.inicio_historico,
+                                                 ao_reiniciar=self._reiniciar)
+        # Primeira carga síncrona: a primeira consulta já encontra o buffer preenchido.
+        self._acrescentar(list(self.seguidor.ler_novos()))
+        self._parar = self.seguidor.em_segundo_plano(self._acrescentar, float(p['intervalo_leitura_s']))
+
+    def _inicio_historico(self):
+        """Instante a partir do qual os segmentos rotacionados ainda podem ter pontos na janela de idade."""
+        if self.max_idade_s is None:
+            return None
+        pasta, nome = os.path.split(self.caminho)
+        fins = [s['fim'] for s in segmentos_log.ler_manifesto(pasta) if s.get('log') == nome and s.get('fim') is not None]
+        return max(fins) - self.max_idade_s if fins else None
+
+    def _acrescentar(self, registros):
+        with self._trava:
+            for registro in registros:
+                instante = segmentos_log.instante_do_timestamp(registro.get('timestamp'))
+                chave = str(registro.get('id_sensor'))
+                pontos = self.por_sensor.get(chave)
+                if pontos is None:
+                    pontos = self.por_sensor[chave] = collections.deque(maxlen=self.max_pontos)
+                elif len(pontos) == self.max_pontos:
+                    self._marcar_descarte(chave, pontos[0][0])
+                self.sequencia += 1
+                pontos.append((instante, registro, self.sequencia))
+                if instante is not None and (self.instante_mais_recente is None or instante > self.instante_mais_recente):
+                    self.instante_mais_recente = instante
+            self._descartar_antigos()
+            if registros:
+                self._novos.notify_all()
+
+    def _reiniciar(self):
+        """O log foi truncado e será relido do início: descarta os pontos acumulados."""
+        with self._trava:
+            self.por_sensor.clear()
+            self.descartado_ate.clear()
+            self.instante_mais_recente = None
+
+    def _descartar_antigos(self):
+        if self.max_idade_s is None or self.instante_mais_recente is None:
+            return
+        limite = self.instante_mais_recente - self.max_idade_s
+        for chave, pontos in self.por_sensor.items():
+            while pontos and (pontos[0][0] is None or pontos[0][0] < limite):
+                self._marcar_descarte(chave, pontos.popleft()[0])
+
+    def _marcar_descarte(self, chave, instante):
+        if instante is not None and instante > self.descartado_ate.get(chave, float('-inf')):
+            self.descartado_ate[chave] = instante
+
+    def cobre(self, id_sensor, inicio):
+        """Indica se todos os pontos do sensor a partir de 'inicio' (None: desde o começo do log) ainda estão no buffer."""
+        with self._trava:
+            # Os segmentos anteriores ao início do histórico nem foram carregados.
+            limites = [t for t in (self.descartado_ate.get(str(id_sensor)), self.inicio_historico) if t is not None]
+            return not limites or (inicio is not None and inicio > max(limites))
+
+    def registros(self, id_sensor, inicio=None, fim=None):
+        """
+        Registros do sensor no buffer, do mais antigo ao mais recente, e a sequência atual.
+        'inicio'/'fim' (segundos desde a época) restringem a janela.
+        """
+        with self._trava:
+            pontos = self.por_sensor.get(str(id_sensor), ())
+            if inicio is None and fim is None:
+                return [registro for _, registro, _ in pontos], self.sequencia
+            return [registro for instante, registro, _ in pontos
+                    if instante is not None and (inicio is None or instante >= inicio) and (fim is None or instante <= fim)], self.sequencia
+
+    def esperar_novos(self, id_sensor, desde, timeout_s):
+        """
+        Registros do sensor com sequência maior que 'desde', esperando até 'timeout_s'
+        segundos se ainda não houver nenhum. Retorna (registros, sequência atual).
+        """
+        chave = str(id_sensor)
+        with self._novos:
+            # Sequência de outro buffer (servidor reiniciado ou parâmetros alterados): recomeça do atual.
+            desde = min(desde, self.sequencia)
+
+            def ha_novos():
+                pontos = self.por_sensor.get(chave)
+                return bool(pontos) and pontos[-1][2] > desde
+
+            self._novos.wait_for(ha_novos, timeout_s)
+            novos = []
+            for _, registro, sequencia in reversed(self.por_sensor.get(chave, ())):
+                if sequencia <= desde:
+                    break
+                novos.append(registro)
+            novos.reverse()
+            return novos, self.sequencia
+
+    def fechar(self):
+        self._parar.set()
+        self.seguidor.fechar()
+
+
+_buffers = {}
+_trava_buffers = threading.Lock()
+
+def obter_buffer(caminho, parametros=None):
+    """Buffer do log 'caminho' (criado na primeira consulta; recriado se os parâmetros mudarem)."""
+    chave = os.path.abspath(caminho)
+    assinatura = tuple(sorted((parametros or {}).items()))
+    with _trava_buffers:
+        existente = _buffers.get(chave)
+        if existente is not None and existente[0] == assinatura:
+            return existente[1]
+        if existente is not None:
+            existente[1].fechar()
+        buffer = BufferLog(caminho, parametros)
+        _buffers[chave] = (assinatura, buffer)
+        return buffer
@@ -1,6 +1,10 @@
 # Nivel6/config_helper.py
 import yaml
 import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'Comum'))
+from cache_yaml import ConfigYamlEmCache
 
 CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'Nivel4', 'Parametros', 'configuracoes.yaml')
 
@@ -11,7 +15,9 @@ def get_default_config():
             'ativo': True,
             'intervalo_leitura_s': 10,
             'id_base': 0,
-            'tempo_limite_resposta_s': 20
+            'tempo_limite_resposta_s': 20,
+            'politica_agendamento': 'round_robin',
+            'max_pendentes': 256
         },
         'nivel4': {
             'diretorio_logs': 'Nivel4/Tempo_Real',
@@ -35,33 +41,42 @@ def get_default_config():
         }
     }
 
+def completar_config(config):
+    """Preenche as seções e campos ausentes de uma configuração recém-lida."""
+    if not config:
+        return get_default_config()
+
+    # Garante que as chaves principais existam
+    if 'nivel3' not in config: config['nivel3'] = get_default_config()['nivel3']
+    if 'nivel4' not in config: config['nivel4'] = get_default_config()['nivel4']
+    if 'nivel1' not in config: config['nivel1'] = get_default_config()['nivel1']
+
+    # PONTO 3: Garante que 'descricao' exista (para compatibilidade)
+    for k, v in config['nivel1'].items():
+        if 'descricao' not in v:
+            v['descricao'] = v.get('tipo_dados', f"Nó Sensor ID {k}")
+
+    return config
+
+# Cada consulta dos painéis lê a configuração várias vezes: o YAML só é relido quando o
+# arquivo muda (inode, data de modificação ou tamanho; ver Comum/cache_yaml.py).
+cache_config = ConfigYamlEmCache(CONFIG_PATH, padrao=None, transformar=completar_config, nome="configuracoes.yaml")
+
 def ler_config():
-    """Lê o arquivo de configuração YAML."""
-    try:
-        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-            config = yaml.safe_load(f)
-            if not config:
-                return get_default_config()
-                
-            # Garante que as chaves principais existam
-            if 'nivel3' not in config: config['nivel3'] = get_default_config()['nivel3']
-            if 'nivel4' not in config: config['nivel4'] = get_default_config()['nivel4']
-            if 'nivel1' not in config: config['nivel1'] = get_default_config()['nivel1']
-            
-            # PONTO 3: Garante que 'descricao' exista (para compatibilidade)
-            for k, v in config['nivel1'].items():
-                if 'descricao' not in v:
-                    v['descricao'] = v.get('tipo_dados', f"Nó Sensor ID {k}")
-            
-            return config
-    except FileNotFoundError:
+    """
+    Lê o arquivo de configuração YAML (em cache). O dicionário retornado é compartilhado
+    entre as consultas: não deve ser alterado por quem o recebe.
+    """
+    if not os.path.exists(CONFIG_PATH):
         print("Arquivo de configuração não encontrado. Criando um padrão.")
         default_config = get_default_config()
         salvar_config(default_config) # Cria o arquivo padrão
         return default_config
-    except Exception as e:
-        print(f"Erro ao ler config: {e}. Usando padrão.")
+    config = cache_config.obter()
+    if config is None:
+        print("Erro ao ler config. Usando padrão.")
         return get_default_config()
+    return config
 
 def salvar_config(data):
     """Salva o dicionário de dados no arquivo de configuração YAML."""
@@ -108,8 +108,9 @@ document.addEventListener('DOMContentLoaded', () => {
     // FUNÇÃO 3: Coletar Dados (View -> Model) (ATUALIZADA)
     // =================================================================
     function collectDataFromForms() {
-        // Coleta Nível 3
+        // Coleta Nível 3 (mantém as chaves que não aparecem no formulário, ex: 'politica_agendamento')
         configData.nivel3 = {
+            ...(configData.nivel3 || {}),
             ativo: n3Ativo.checked,
             intervalo_leitura_s: parseInt(n3Intervalo.value) || 10,
             id_base: parseInt(n3IdBase.value) || 0,
@@ -118,6 +119,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
         // Coleta Nível 4
         configData.nivel4 = {
+            ...(configData.nivel4 || {}),
             diretorio_logs: n4Diretorio.value,
             nome_arquivo_rede: n4ArquivoRede.value,
             nome_arquivo_aplicacao: n4ArquivoApp.value
@@ -151,16 +153,13 @@ document.addEventListener('DOMContentLoaded', () => {
                 });
             });
 
+            // Mantém as chaves que não aparecem no formulário (ex: 'log_headers', 'prioridade')
             novoNivel1[sensorId] = {
+                ...(configData.nivel1[sensorId] || {}),
                 descricao: descricao,   // PONTO 3
                 tipo_dados: tipo_dados, // PONTO 5
                 mapeamento_pacote: mapeamento
             };
-            
-            // Adiciona de volta 'log_headers' se ele existia (para não perdê-lo)
-            if (configData.nivel1[sensorId] && configData.nivel1[sensorId].log_headers) {
-                novoNivel1[sensorId].log_headers = configData.nivel1[sensorId].log_headers;
-            }
         });
         configData.nivel1 = novoNivel1;
     }
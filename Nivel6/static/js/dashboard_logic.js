@@ -9,6 +9,12 @@ document.addEventListener('DOMContentLoaded', () => {
         return;
     }
 
+    // Máximo de pontos exibidos: ao receber pontos novos, os mais antigos saem do gráfico.
+    const JANELA_MAX_PONTOS = 2000;
+    // Sem stream (formato de log diferente de 'jsonl' ou navegador sem EventSource),
+    // o gráfico é recarregado por inteiro a cada intervalo.
+    const INTERVALO_RECARGA_MS = 10000;
+
     const sensorSelector = document.getElementById('sensor-selector');
     const latestValuesEl = document.getElementById('latest-values-span');
     const ctx = document.getElementById('sensorDataChart').getContext('2d');
@@ -28,8 +34,86 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     });
 
+    let stream = null;
+    let timerRecarga = null;
+
+    function pararAtualizacoes() {
+        if (stream) {
+            stream.close();
+            stream = null;
+        }
+        if (timerRecarga) {
+            clearInterval(timerRecarga);
+            timerRecarga = null;
+        }
+    }
+
+    // Formata os "Últimos Valores" (ex: 'rssi_uplink_dbm' -> 'Rssi Uplink (dBm)')
+    function renderLatestValues(ultimosValores) {
+        let latestValuesHTML = "";
+        if (ultimosValores && Object.keys(ultimosValores).length > 0) {
+            for (const [campo, valor] of Object.entries(ultimosValores)) {
+                const nomeCampo = campo.replace(/_/g, ' ')
+                                     .replace('dbm', ' (dBm)')
+                                     .replace(/\b\w/g, l => l.toUpperCase());
+                latestValuesHTML += `<div style="margin-bottom: 10px;">${nomeCampo}: <strong>${valor}</strong></div>`;
+            }
+        } else {
+            latestValuesHTML = "--";
+        }
+        latestValuesEl.innerHTML = latestValuesHTML;
+    }
+
+    // Acrescenta os pontos novos recebidos pelo stream (janela deslizante)
+    function appendPoints(pontos, ultimosValores) {
+        sensorDataChart.data.labels.push(...pontos.labels);
+        for (const dataset of sensorDataChart.data.datasets) {
+            const valores = pontos.series[dataset.campo] || [];
+            dataset.data.push(...valores);
+            for (let i = valores.length - 1; i >= 0; i--) {
+                if (valores[i] !== null) {
+                    ultimosValores[dataset.campo] = valores[i];
+                    break;
+                }
+            }
+        }
+        const excesso = sensorDataChart.data.labels.length - JANELA_MAX_PONTOS;
+        if (excesso > 0) {
+            sensorDataChart.data.labels.splice(0, excesso);
+            for (const dataset of sensorDataChart.data.datasets) {
+                dataset.data.splice(0, excesso);
+            }
+        }
+        sensorDataChart.update('none');
+        renderLatestValues(ultimosValores);
+    }
+
+    // Abre o stream de pontos novos a partir do último ponto já carregado
+    function iniciarAtualizacoes(sensorId, data) {
+        if (typeof STREAM_ENDPOINT === 'undefined' || typeof EventSource === 'undefined' || data.ultimo_id === null) {
+            timerRecarga = setInterval(() => updateDashboard(sensorId, false), INTERVALO_RECARGA_MS);
+            return;
+        }
+        const ultimosValores = Object.assign({}, data.ultimos_valores);
+        stream = new EventSource(`${STREAM_ENDPOINT}${sensorId}?desde=${data.ultimo_id}`);
+        stream.addEventListener('pontos', (evento) => {
+            appendPoints(JSON.parse(evento.data), ultimosValores);
+        });
+        stream.onerror = () => {
+            // Erros de rede são reconectados pelo navegador; se o servidor recusou o
+            // stream (conexão fechada), volta a recarregar periodicamente.
+            if (stream && stream.readyState === EventSource.CLOSED) {
+                stream = null;
+                timerRecarga = setInterval(() => updateDashboard(sensorId, false), INTERVALO_RECARGA_MS);
+            }
+        };
+    }
+
     // Função principal que busca dados e atualiza o gráfico
-    async function updateDashboard(sensorId) {
+    async function updateDashboard(sensorId, iniciar = true) {
+        if (iniciar) {
+            pararAtualizacoes();
+        }
         if (!sensorId) {
             // Limpa o gráfico se "Selecione um sensor" for escolhido
             sensorDataChart.data.labels = [];
@@ -61,19 +145,12 @@ document.addEventListener('DOMContentLoaded', () => {
             sensorDataChart.update();
 
             // 2. Atualiza o "Último Valor"
-            let latestValuesHTML = "";
-            if (data.ultimos_valores && Object.keys(data.ultimos_valores).length > 0) {
-                for (const [campo, valor] of Object.entries(data.ultimos_valores)) {
-                    // Formata o nome do campo (ex: 'rssi_uplink_dbm' -> 'Rssi Uplink (dBm)')
-                    const nomeCampo = campo.replace(/_/g, ' ')
-                                         .replace('dbm', ' (dBm)')
-                                         .replace(/\b\w/g, l => l.toUpperCase());
-                    latestValuesHTML += `<div style="margin-bottom: 10px;">${nomeCampo}: <strong>${valor}</strong></div>`;
-                }
-            } else {
-                latestValuesHTML = "--";
+            renderLatestValues(data.ultimos_valores);
+
+            // 3. A partir daqui, só os pontos novos (stream) ou recarga periódica
+            if (iniciar && sensorSelector.value === sensorId) {
+                iniciarAtualizacoes(sensorId, data);
             }
-            latestValuesEl.innerHTML = latestValuesHTML;
 
         } catch (error) {
             console.error("Erro ao buscar dados do sensor:", error);
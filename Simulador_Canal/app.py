@@ -376,8 +376,11 @@ class App(ctk.CTk):
         try:
             path = os.path.join(os.path.dirname(__file__), '..', 'Nivel2', 'canal_config.yml')
             os.makedirs(os.path.dirname(path), exist_ok=True)
-            with open(path, 'w', encoding='utf-8') as f:
+            # Escreve em um arquivo temporário e o troca de uma vez, para o Nível 2 nunca ler um arquivo pela metade.
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 yaml.dump(config_data, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
+            os.replace(tmp_path, path)
         except Exception as e: print(f"ERRO ao escrever arquivo do canal: {e}")
 
     def _write_sensores_config(self):
@@ -391,8 +394,11 @@ class App(ctk.CTk):
         try:
             path = os.path.join(os.path.dirname(__file__), '..', 'Nivel1', 'sensores_config.yml')
             os.makedirs(os.path.dirname(path), exist_ok=True)
-            with open(path, 'w', encoding='utf-8') as f:
+            # Mesma troca atômica do arquivo do canal: o Nível 1 nunca lê um arquivo pela metade.
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 yaml.dump(config_data, f, default_flow_style=False, sort_keys=False, allow_unicode=True)
+            os.replace(tmp_path, path)
         except Exception as e: print(f"ERRO ao escrever arquivo dos sensores: {e}")
         
     def _load_background_image(self):
@@ -0,0 +1,150 @@
+# Simulador_Eventos/componentes.py
+
+"""
+Componentes da Pilha TpM para o Núcleo de Eventos
+Cada nível vira um componente que troca pacotes de 52 bytes com os outros por meio de
+eventos agendados, em vez de arquivos ou sockets. A lógica é a MESMA dos scripts:
+- BaseSimulada (Nível 3): agendador.py para decidir quem consultar e borda.py para montar
+  Downlinks, decodificar Uplinks e gravar os logs.
+- CanalSimulado (Nível 2): injeta o RSSI do link (tabela do 'canal_config.yml') e, no
+  modo estocástico, sorteia perda e atraso com o motor de 'canal_estocastico.py'.
+- SensorSimulado (Nível 1): no_sensor.NoSensor para montar a resposta e fontes_dados.py
+  para obter as leituras no instante virtual.
+"""
+
+# --- Importação de Bibliotecas ---
+import os
+import sys
+
+PASTA_RAIZ = os.path.join(os.path.dirname(__file__), '..')
+for pasta in ('Comum', 'Nivel1', 'Nivel2', 'Nivel3'):
+    sys.path.append(os.path.join(PASTA_RAIZ, pasta))
+import agendador
+import borda
+import fontes_dados
+import no_sensor
+
+
+class CanalSimulado:
+    """Canal de uma célula (uma Base e seus sensores)."""
+
+    def __init__(self, nucleo, tabela_links, atraso_s=0.01, motor_estocastico=None):
+        self.nucleo = nucleo
+        self.tabela_links = tabela_links
+        self.atraso_s = atraso_s
+        self.motor = motor_estocastico
+        self.base = None
+        self.sensores = {}
+        self.perdidos = 0
+
+    def _transmitir(self, pacote, byte_id, byte_rssi, chave_rssi, direcao, entregar):
+        id_link = pacote[byte_id]
+        rssi_dbm = self.tabela_links.get(str(id_link), {}).get(chave_rssi, -120.0)
+        atraso_s = self.atraso_s
+        if self.motor is not None:
+            rssi, entregue, instantes = self.motor.processar_lote(direcao, [id_link], [rssi_dbm], self.nucleo.agora())
+            if not entregue[0]:
+                self.perdidos += 1
+                return
+            rssi_dbm, atraso_s = rssi[0], instantes[0] - self.nucleo.agora()
+        pacote = bytearray(pacote)
+        pacote[byte_rssi] = int(rssi_dbm) & 0xFF
+        self.nucleo.agendar(atraso_s, entregar, pacote)
+
+    def transmitir_downlink(self, Pacote_DL):
+        sensor = self.sensores.get(Pacote_DL[8])
+        if sensor is None:
+            # Nenhum sensor com esse ID na célula: o pedido se perde e a Base registra a falha no prazo.
+            return
+        self._transmitir(Pacote_DL, 8, 0, 'rssi_downlink_dbm', 0, sensor.receber)
+
+    def transmitir_uplink(self, Pacote_UL):
+        self._transmitir(Pacote_UL, 10, 2, 'rssi_uplink_dbm', 1, self.base.receber)
+
+
+class SensorSimulado:
+
+    def __init__(self, nucleo, canal, id_sensor, config_sensor, tempo_resposta_s=0.01):
+        self.nucleo = nucleo
+        self.canal = canal
+        self.no = no_sensor.NoSensor(id_sensor)
+        self.config_sensor = config_sensor
+        self.tempo_resposta_s = tempo_resposta_s
+
+    def receber(self, Pacote_DL):
+        arquivo_fonte = self.config_sensor.get('source_file')
+        dados = None
+        if arquivo_fonte:
+            try:
+                dados = fontes_dados.obter_dados_lote(arquivo_fonte, [self.no.id], self.nucleo.agora())[self.no.id]
+            except Exception as e:
+                print(f"[Nível 1 - Nó Sensor {self.no.id}] - APLICAÇÃO - ERRO: Falha ao executar '{arquivo_fonte}'. Erro: {e}")
+        Pacote_UL = self.no.montar_uplink(Pacote_DL, dados, self.config_sensor.get('mapeamento_pacote', {}))
+        self.nucleo.agendar(self.tempo_resposta_s, self.canal.transmitir_uplink, Pacote_UL)
+
+
+class BaseSimulada:
+
+    def __init__(self, nucleo, canal, config, salvar_logs=True):
+        self.nucleo = nucleo
+        self.canal = canal
+        self.config = config
+        self.salvar_logs = salvar_logs
+        self.id_base = config['nivel3']['id_base']
+        self.tempo_limite_s = config['nivel3']['tempo_limite_resposta_s']
+        self.max_pendentes = config['nivel3'].get('max_pendentes', 256)
+        self.agendador = agendador.criar_agendador(config['nivel3'], config.get('nivel1', {}), nucleo.agora())
+        # ID do sensor -> número do pedido pendente (para ignorar prazos de pedidos já respondidos).
+        self.pendentes = {}
+        self._numero_pedido = 0
+        self._ciclo_agendado_em = None
+        self.estatisticas = {'pedidos': 0, 'respostas': 0, 'sem_resposta': 0}
+
+    def iniciar(self):
+        self._agendar_ciclo(self.nucleo.agora())
+
+    def _agendar_ciclo(self, instante):
+        # Mantém no máximo um ciclo agendado: o mais próximo.
+        if self._ciclo_agendado_em is None or instante < self._ciclo_agendado_em:
+            self._ciclo_agendado_em = instante
+            self.nucleo.agendar_em(instante, self._ciclo, instante)
+
+    def _ciclo(self, instante):
+        if instante != self._ciclo_agendado_em:
+            return
+        self._ciclo_agendado_em = None
+        agora = self.nucleo.agora()
+        alvos = self.agendador.proximos(agora, limite=self.max_pendentes - len(self.pendentes), ignorar=self.pendentes)
+        for id_sensor in alvos:
+            self._numero_pedido += 1
+            self.pendentes[id_sensor] = self._numero_pedido
+            self.estatisticas['pedidos'] += 1
+            self.canal.transmitir_downlink(borda.montar_downlink(id_sensor, self.id_base))
+            self.nucleo.agendar(self.tempo_limite_s, self._verificar_prazo, id_sensor, self._numero_pedido)
+        proximo = self.agendador.proximo_instante(ignorar=self.pendentes)
+        # Se ainda há sensores vencidos, eles esperam uma vaga (resposta ou prazo vencido).
+        if proximo is not None and proximo > agora:
+            self._agendar_ciclo(proximo)
+
+    def _liberar_vaga(self, id_sensor):
+        del self.pendentes[id_sensor]
+        self._agendar_ciclo(self.nucleo.agora())
+
+    def receber(self, Pacote_UL):
+        resultado = borda.processar_uplink(Pacote_UL, self.config)
+        if resultado['id_sensor'] in self.pendentes:
+            self._liberar_vaga(resultado['id_sensor'])
+        self.estatisticas['respostas'] += 1
+        self.agendador.registrar_resultado(resultado['id_sensor'], resultado['status'] == 'OK', resultado.get('rssi_uplink_dbm'))
+        if self.salvar_logs:
+            borda.salvar_logs(resultado, self.config)
+
+    def _verificar_prazo(self, id_sensor, numero_pedido):
+        if self.pendentes.get(id_sensor) != numero_pedido:
+            return
+        self._liberar_vaga(id_sensor)
+        self.estatisticas['sem_resposta'] += 1
+        print(f"[Nível 3 - Borda] FALHA. Resposta do Sensor {id_sensor} não recebida em {self.tempo_limite_s} s.")
+        self.agendador.registrar_resultado(id_sensor, False)
+        if self.salvar_logs:
+            borda.salvar_logs(borda.resultado_sem_resposta(id_sensor), self.config)
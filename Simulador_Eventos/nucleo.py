@@ -0,0 +1,64 @@
+# Simulador_Eventos/nucleo.py
+
+"""
+Núcleo de Simulação por Eventos Discretos
+Uma fila de eventos (heap) ordenada pelo instante virtual. O núcleo retira o próximo
+evento, avança o relógio virtual (Comum/relogio.py, modo 'eventos') até o instante dele
+e o executa; nada dorme de verdade, então a simulação roda na velocidade da CPU.
+
+Determinismo: eventos no mesmo instante são executados na ordem em que foram agendados
+(um contador desempata a fila), e o relógio do processo é substituído pelo relógio
+virtual, para que os carimbos de tempo dos logs também sejam virtuais.
+"""
+
+# --- Importação de Bibliotecas ---
+import os
+import sys
+import heapq
+import itertools
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'Comum'))
+import relogio
+
+
+class NucleoEventos:
+
+    def __init__(self, inicio=None):
+        self.relogio = relogio.RelogioEventos(inicio)
+        relogio.definir_relogio(self.relogio)
+        self._fila = []
+        self._desempate = itertools.count()
+        self.eventos_executados = 0
+
+    def agora(self):
+        return self.relogio.agora()
+
+    def agendar_em(self, instante, funcao, *argumentos):
+        """Agenda 'funcao(*argumentos)' para o instante virtual informado (nunca no passado)."""
+        heapq.heappush(self._fila, (max(instante, self.agora()), next(self._desempate), funcao, argumentos))
+
+    def agendar(self, atraso_s, funcao, *argumentos):
+        """Agenda 'funcao(*argumentos)' para daqui a 'atraso_s' segundos virtuais."""
+        self.agendar_em(self.agora() + max(0.0, atraso_s), funcao, *argumentos)
+
+    def executar(self, ate=None, max_eventos=None):
+        """
+        Executa os eventos em ordem até a fila esvaziar, até o instante 'ate' ou até
+        'max_eventos' eventos. Retorna o número de eventos executados nesta chamada.
+        """
+        executados = 0
+        while self._fila and (max_eventos is None or executados < max_eventos):
+            instante, _, funcao, argumentos = self._fila[0]
+            if ate is not None and instante > ate:
+                break
+            heapq.heappop(self._fila)
+            self.relogio.avancar_para(instante)
+            funcao(*argumentos)
+            executados += 1
+        if ate is not None:
+            self.relogio.avancar_para(ate)
+        self.eventos_executados += executados
+        return executados
+
+    def pendentes(self):
+        return len(self._fila)
@@ -0,0 +1,146 @@
+# Simulador_Eventos/simular.py
+
+"""
+Simulação da Pilha TpM em um Único Processo
+Monta Base (Nível 3), Canal (Nível 2) e sensores (Nível 1) como componentes do núcleo
+de eventos discretos e executa o cenário em tempo virtual, na velocidade da CPU e de
+forma determinística (mesmos parâmetros e mesmo '--inicio' => mesmos logs).
+
+A rede vem dos mesmos arquivos usados pelos scripts:
+- Nivel4/Parametros/configuracoes.yaml: parâmetros da Base e decodificação ('nivel1');
+- Nivel1/sensores_config.yml: fonte de dados e mapeamento de cada sensor;
+- Nivel2/canal_config.yml: RSSI de cada link (e canal_estocastico.yml no modo estocástico).
+
+Para redes grandes:
+- '--sensores N' cria os sensores 1..N copiando a configuração do sensor '--modelo-sensor'
+  (decodificação, fonte de dados e link). IDs ocupam um byte, então N <= 255 por célula.
+- '--celulas K' replica a rede K vezes, cada célula com sua Base e seu canal; os logs de
+  cada célula ficam em um subdiretório próprio. Ex.: 8 células x 250 sensores = 2000 nós.
+
+Uso: python simular.py --duracao-s 86400 --sensores 200 --celulas 5 --fonte clima_sintetico.py
+"""
+
+# --- Importação de Bibliotecas ---
+import os
+import sys
+import copy
+import time
+import argparse
+import contextlib
+import yaml
+
+sys.path.append(os.path.dirname(__file__))
+from nucleo import NucleoEventos
+from componentes import PASTA_RAIZ, BaseSimulada, CanalSimulado, SensorSimulado
+import borda
+import no_sensor
+
+CAMINHO_CANAL_CONFIG = os.path.join(PASTA_RAIZ, 'Nivel2', 'canal_config.yml')
+CAMINHO_CANAL_ESTOCASTICO = os.path.join(PASTA_RAIZ, 'Nivel2', 'canal_estocastico.yml')
+PASTA_RESULTADOS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resultados')
+
+
+def ler_yaml(caminho, padrao):
+    try:
+        with open(caminho, 'r', encoding='utf-8') as f:
+            return yaml.safe_load(f) or padrao
+    except FileNotFoundError:
+        return padrao
+
+def montar_rede(args, config):
+    """Retorna (config_decodificacao, config_sensores, tabela_links) de uma célula."""
+    decodificacao = dict(config.get('nivel1') or {})
+    sensores = dict(no_sensor.cache_config_sensores.obter())
+    links = dict(ler_yaml(CAMINHO_CANAL_CONFIG, {}).get('links') or {})
+
+    if args.sensores:
+        modelo = str(args.modelo_sensor) if args.modelo_sensor else min(set(decodificacao) & set(sensores), key=int, default=None)
+        if modelo is None or modelo not in decodificacao or modelo not in sensores:
+            print(f"ERRO: O sensor modelo '{modelo}' precisa existir em 'configuracoes.yaml' (nivel1) e em 'sensores_config.yml'.")
+            sys.exit(1)
+        ids = [str(i) for i in range(1, args.sensores + 1)]
+        decodificacao = {i: decodificacao[modelo] for i in ids}
+        sensores = {i: dict(sensores[modelo], id_sensor=int(i)) for i in ids}
+        links = {i: links.get(modelo, {}) for i in ids}
+
+    if args.fonte:
+        sensores = {i: dict(s, source_file=args.fonte) for i, s in sensores.items()}
+    return decodificacao, sensores, links
+
+def criar_celula(nucleo, args, config, indice):
+    decodificacao, sensores, links = montar_rede(args, config)
+    config_celula = copy.deepcopy(config)
+    config_celula['nivel1'] = decodificacao
+    pasta_logs = os.path.abspath(args.diretorio_logs)
+    if args.celulas > 1:
+        pasta_logs = os.path.join(pasta_logs, f'celula_{indice:03d}')
+    config_celula['nivel4']['diretorio_logs'] = pasta_logs
+    if args.formato:
+        config_celula['nivel4']['formato'] = args.formato
+
+    motor = None
+    if args.canal == 'estocastico':
+        sys.path.append(os.path.join(PASTA_RAIZ, 'Nivel2'))
+        import canal_estocastico
+        parametros = ler_yaml(CAMINHO_CANAL_ESTOCASTICO, {})
+        motor = canal_estocastico.CanalEstocastico(semente=int(parametros.get('semente', 0)) + indice, parametros=parametros)
+
+    canal = CanalSimulado(nucleo, links, atraso_s=args.atraso_s, motor_estocastico=motor)
+    canal.base = BaseSimulada(nucleo, canal, config_celula, salvar_logs=not args.sem_logs)
+    for id_texto, config_sensor in sensores.items():
+        id_sensor = int(id_texto)
+        if 0 < id_sensor <= 255:
+            canal.sensores[id_sensor] = SensorSimulado(nucleo, canal, id_sensor, config_sensor, args.tempo_resposta_s)
+    return canal
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Simula a pilha TpM (Níveis 1 a 3) em um único processo, em tempo virtual.")
+    parser.add_argument("--duracao-s", type=float, default=3600, help="Duração simulada, em segundos.")
+    parser.add_argument("--inicio", type=float, default=None,
+                        help="Instante inicial simulado (segundos desde a época). Padrão: agora. Fixe-o para reproduzir uma execução.")
+    parser.add_argument("--sensores", type=int, choices=range(1, 256), metavar="N",
+                        help="Cria os sensores 1..N a partir do '--modelo-sensor'.")
+    parser.add_argument("--modelo-sensor", type=int, help="ID do sensor copiado por '--sensores' (padrão: o menor configurado).")
+    parser.add_argument("--celulas", type=int, default=1, help="Número de células (Base + canal + sensores) independentes.")
+    parser.add_argument("--fonte", help="Fonte de dados usada por todos os sensores (ex.: clima_sintetico.py).")
+    parser.add_argument("--canal", choices=['estatico', 'estocastico'], default='estatico',
+                        help="'estatico': RSSI do canal_config.yml. 'estocastico': desvanecimento, perda e atraso.")
+    parser.add_argument("--atraso-s", type=float, default=0.01, help="Atraso de propagação do canal estático (s).")
+    parser.add_argument("--tempo-resposta-s", type=float, default=0.01, help="Tempo de processamento do sensor (s).")
+    parser.add_argument("--diretorio-logs", default=PASTA_RESULTADOS, help="Diretório dos logs JSON Lines gerados.")
+    parser.add_argument("--formato", choices=borda.FORMATOS_LOG, help="Formato dos logs (padrão: 'nivel4.formato' da configuração).")
+    parser.add_argument("--sem-logs", action="store_true", help="Não grava logs (mede apenas a simulação).")
+    parser.add_argument("--verboso", action="store_true", help="Mostra as mensagens de cada pacote, como nos scripts.")
+    args = parser.parse_args()
+
+    print("--- [Simulador de Eventos] Iniciando Simulação.")
+    CONFIG = borda.carregar_configuracao_central()
+    nucleo = NucleoEventos(args.inicio if args.inicio is not None else float(int(time.time())))
+    inicio_simulado = nucleo.agora()
+    celulas = [criar_celula(nucleo, args, CONFIG, i) for i in range(args.celulas)]
+    total_sensores = sum(len(c.sensores) for c in celulas)
+    print(f"[Simulador de Eventos] {args.celulas} célula(s), {total_sensores} sensor(es), {args.duracao_s:.0f} s simulados.")
+    if not args.sem_logs:
+        print(f"[Simulador de Eventos] Logs em: {os.path.abspath(args.diretorio_logs)}")
+
+    inicio_real = time.perf_counter()
+    try:
+        with contextlib.ExitStack() as pilha:
+            if not args.verboso:
+                pilha.enter_context(contextlib.redirect_stdout(pilha.enter_context(open(os.devnull, 'w'))))
+            for celula in celulas:
+                celula.base.iniciar()
+            nucleo.executar(ate=inicio_simulado + args.duracao_s)
+            borda.fechar_logs()
+    except KeyboardInterrupt:
+        print("\n[Simulador de Eventos] Simulação interrompida pelo usuário.")
+    duracao_real = time.perf_counter() - inicio_real
+
+    totais = {chave: sum(c.base.estatisticas[chave] for c in celulas) for chave in ('pedidos', 'respostas', 'sem_resposta')}
+    perdidos = sum(c.perdidos for c in celulas)
+    simulado_s = nucleo.agora() - inicio_simulado
+    print(f"[Simulador de Eventos] {nucleo.eventos_executados} eventos em {duracao_real:.2f} s reais "
+          f"({simulado_s / max(duracao_real, 1e-9):.0f}x o tempo real).")
+    print(f"[Simulador de Eventos] Pedidos: {totais['pedidos']}, respostas: {totais['respostas']}, "
+          f"sem resposta: {totais['sem_resposta']}, pacotes perdidos no canal: {perdidos}.")